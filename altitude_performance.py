@@ -0,0 +1,206 @@
+# altitude_performance.py
+# off-design thrust, Isp and Cf over an ambient pressure profile (standard atmosphere),
+# batched over engines and altitudes, with a flow-separation flag
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+import engine_model as em
+
+#===================== standard atmosphere =====================#
+# US Standard Atmosphere 1976 up to 86 km: base geopotential altitude [m], lapse rate [K/m]
+_LAYERS = np.array([0.0, 11000.0, 20000.0, 32000.0, 47000.0, 51000.0, 71000.0, 84852.0])
+_LAPSE = np.array([-0.0065, 0.0, 0.001, 0.0028, 0.0, -0.0028, -0.002, 0.0])
+_R_AIR = 287.05287
+_G0 = em.g0
+_R_EARTH = 6356766.0
+
+
+def _layer_bases():
+    T, p = [288.15], [101325.0]
+    for i in range(len(_LAYERS) - 1):
+        dh = _LAYERS[i + 1] - _LAYERS[i]
+        if _LAPSE[i] == 0:
+            p.append(p[-1] * np.exp(-_G0 * dh / (_R_AIR * T[-1])))
+            T.append(T[-1])
+        else:
+            T.append(T[-1] + _LAPSE[i] * dh)
+            p.append(p[-1] * (T[-1] / T[-2])**(-_G0 / (_LAPSE[i] * _R_AIR)))
+    return np.array(T), np.array(p)
+
+
+_T_BASE, _P_BASE = _layer_bases()
+# above 86 km: exponential fit through the 1976 tables (0.3734 Pa at 86 km, 0.03201 Pa at 100 km)
+_H_TOP = 86000.0
+_SCALE_TOP = 14000.0 / np.log(0.3734 / 0.03201)
+
+
+def standard_atmosphere(h):
+    """
+    Ambient pressure and temperature of the standard atmosphere.
+
+    Args:
+    h (float or ndarray): Geometric altitude [m], 0-100 km.
+
+    Returns:
+    tuple: (pressure [Pa], temperature [K]) arrays shaped like h.
+    """
+    h = np.asarray(h, dtype=float)
+    H = _R_EARTH * h / (_R_EARTH + h)  # geopotential altitude
+    i = np.clip(np.searchsorted(_LAYERS, H, side='right') - 1, 0, len(_LAYERS) - 1)
+    dH = H - _LAYERS[i]
+    lapse, T_base, p_base = _LAPSE[i], _T_BASE[i], _P_BASE[i]
+    T = T_base + lapse * dH
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = np.where(lapse == 0,
+                     p_base * np.exp(-_G0 * dH / (_R_AIR * T_base)),
+                     p_base * (T / T_base)**(-_G0 / (np.where(lapse == 0, 1.0, lapse) * _R_AIR)))
+    top = h > _H_TOP
+    p = np.where(top, 0.3734 * np.exp(-(h - _H_TOP) / _SCALE_TOP), p)
+    T = np.where(top, 186.87, T)
+    return p, T
+
+
+#===================== performance =====================#
+
+@dataclass
+class AltitudeTable:
+    """Performance over altitude; arrays of shape (n_h,) or (engines, n_h), SI units."""
+    h: np.ndarray
+    Pa: np.ndarray
+    F: np.ndarray
+    Isp: np.ndarray       # [m/s]
+    Isp_sec: np.ndarray   # [s]
+    Cf: np.ndarray
+    separated: np.ndarray  # flow separated inside the nozzle, p_i < separation_ratio * Pa
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+def _evaluate(P, Cstar, R, kappa, epsilon_i, dkr, h, Pa, efficiency, separation_ratio):
+    # engines along axis 0, altitudes along axis 1
+    P, Cstar, R, kappa, epsilon_i, dkr, efficiency = (
+        np.asarray(v, dtype=float).reshape(-1, 1)
+        for v in np.broadcast_arrays(P, Cstar, R, kappa, epsilon_i, dkr, efficiency))
+    Pa = Pa[None, :]
+
+    Akr = em.throat_area(dkr)
+    m_dot = em.mass_flow(P, Akr, Cstar)
+    T = em.chamber_temperature(Cstar, em.temperature_function(kappa), R)
+    M_i = em.exit_mach(kappa, epsilon_i)
+    p_i = em.exit_pressure(P, kappa, M_i)
+    Ai = em.exit_area(epsilon_i, Akr)
+    Vi = em.exhaust_velocity(kappa, R, T, P, p_i)
+
+    # full-flowing nozzle: momentum plus pressure thrust at the exit
+    F = efficiency * m_dot * Vi + Ai * (p_i - Pa)
+
+    # separation (Summerfield-type criterion): the wall pressure falls below
+    # separation_ratio * Pa before the exit. The flow is taken as attached up to the
+    # station where p = separation_ratio * Pa and the jet leaves there at that pressure.
+    separated = p_i < separation_ratio * Pa
+    if separated.any():
+        p_sep = np.minimum(separation_ratio * Pa, P)
+        M_sep = em.optimal_exit_mach(P, p_sep, kappa)
+        A_sep = em.optimal_exit_area(em.optimal_expansion_ratio(kappa, M_sep), Akr)
+        V_sep = em.exhaust_velocity(kappa, R, T, P, p_sep)
+        F_sep = efficiency * m_dot * V_sep + A_sep * (p_sep - Pa)
+        F = np.where(separated, F_sep, F)
+
+    Isp = F / m_dot
+    return F, Isp, Isp / em.g0, F / (P * Akr), separated
+
+
+def _key(value):
+    value = np.asarray(value, dtype=float)
+    return (value.shape, value.tobytes())
+
+
+class AltitudePerformance:
+    """
+    Memoized altitude performance, one table per (engine set, atmosphere profile).
+
+    Example:
+    performance = AltitudePerformance()
+    table = performance(P=180e5, Cstar=1892.5, R=433.5, kappa=1.1716, epsilon_i=7.0,
+                        dkr=0.03104, h=np.linspace(0, 100e3, 2001))
+    table.F, table.Isp_sec, table.separated
+
+    Args:
+    max_entries (int): Tables kept (least recently used are dropped).
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._tables = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, P, Cstar, R, kappa, epsilon_i, dkr, h=None, Pa=None,
+                 efficiency=1.0, separation_ratio=0.4):
+        """
+        Thrust, Isp and Cf over altitude.
+
+        Args:
+        P, Cstar, R, kappa, epsilon_i, dkr (float or ndarray): Engine(s) as in
+            `engine_model.EngineModel` (SI units), broadcast against each other.
+        h (ndarray, optional): Altitudes [m]; 0-100 km in 2001 steps by default.
+        Pa (ndarray, optional): Ambient pressure profile [Pa] for `h`; standard atmosphere if None.
+        efficiency (float or ndarray): Factor on the momentum thrust for delivered
+            performance (e.g. RPA's divergence x drag efficiency); 1 for ideal.
+        separation_ratio (float): Separation when exit pressure < ratio * Pa (Summerfield ~0.4).
+
+        Returns:
+        AltitudeTable: Arrays over h, with a leading engine axis for array inputs.
+        """
+        h = np.linspace(0.0, 100e3, 2001) if h is None else np.asarray(h, dtype=float).ravel()
+        Pa = standard_atmosphere(h)[0] if Pa is None else np.asarray(Pa, dtype=float).ravel()
+        engine = (P, Cstar, R, kappa, epsilon_i, dkr, efficiency, separation_ratio)
+        key = (tuple(_key(v) for v in engine), _key(h), _key(Pa))
+
+        table = self._tables.get(key)
+        if table is not None:
+            self.hits += 1
+            self._tables.move_to_end(key)
+            return table
+        self.misses += 1
+
+        F, Isp, Isp_sec, Cf, separated = _evaluate(P, Cstar, R, kappa, epsilon_i, dkr, h, Pa,
+                                                   efficiency, separation_ratio)
+        if np.ndim(np.broadcast(P, Cstar, R, kappa, epsilon_i, dkr, efficiency)) == 0:
+            F, Isp, Isp_sec, Cf, separated = F[0], Isp[0], Isp_sec[0], Cf[0], separated[0]
+        table = AltitudeTable(h, Pa, F, Isp, Isp_sec, Cf, separated)
+        for value in table.__dict__.values():
+            value.flags.writeable = False  # shared by every caller of the memo
+        self._tables[key] = table
+        if len(self._tables) > self.max_entries:
+            self._tables.popitem(last=False)
+        return table
+
+
+altitude_performance = AltitudePerformance()
+
+
+if __name__ == "__main__":
+    import time
+
+    hydra = dict(P=180e5, Cstar=1892.5, R=433.5, kappa=1.1716, epsilon_i=7.0, dkr=0.03104)
+    table = altitude_performance(**hydra)
+    for h in (0, 10e3, 30e3, 100e3):
+        i = np.searchsorted(table.h, h)
+        print(f"h = {h / 1e3:5.1f} km: Pa = {table.Pa[i]:9.2f} Pa, F = {table.F[i] / 1e3:6.2f} kN, "
+              f"Isp = {table.Isp_sec[i]:6.1f} s, Cf = {table.Cf[i]:.4f}")
+    print(f"separated at sea level with epsilon 40: "
+          f"{altitude_performance(**{**hydra, 'epsilon_i': 40.0}).separated[0]}")
+
+    n = 5000
+    rng = np.random.default_rng(0)
+    batch = {k: v * rng.uniform(0.9, 1.1, n) for k, v in hydra.items()}
+    batch['epsilon_i'] = rng.uniform(4, 60, n)
+    for label in ('computed', 'memoized'):
+        t0 = time.perf_counter()
+        table = altitude_performance(**batch)
+        print(f"{label}: {n} engines x {table.h.size} altitudes in {time.perf_counter() - t0:.3f} s, "
+              f"{table.separated.mean():.1%} of points separated")
@@ -0,0 +1,335 @@
+# benchmarks.py
+# benchmark suite for the hot paths of the app, with a baseline of this machine
+#
+#   python benchmarks.py                       run all, compare with benchmark_baseline.json
+#   python benchmarks.py -k parse -k mach      only benchmarks whose name contains a pattern
+#   python benchmarks.py --save-baseline       run and store the results as the baseline
+#   python benchmarks.py --out results.json    also write this run to a file
+#   python benchmarks.py --no-fail             report regressions without failing
+#
+# exits with status 1 on a regression: a median slower than baseline * (1 + tolerance) that
+# reproduces in `--confirm` reruns of that benchmark. Baselines are per machine and not in git;
+# CI records one on the benchmark runner from the main branch and keeps it as an artifact:
+#
+#   git checkout main && python benchmarks.py --save-baseline --baseline baseline/benchmark_baseline.json
+#   git checkout $BRANCH && python benchmarks.py --baseline baseline/benchmark_baseline.json
+#
+# a baseline from other hardware (CPU count or processor, MACHINE_KEYS) is reported, not enforced
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, 'benchmark_baseline.json')
+
+# machine fields a baseline must match to be enforced; OS, kernel and library versions may
+# change under a runner, a regression they cause is a regression
+MACHINE_KEYS = ('cpus', 'processor')
+
+# name -> (setup, items per call, item name); setup() returns the function to time
+BENCHMARKS = {}
+
+
+def benchmark(name, units=1, unit='call'):
+    """Register `setup`; the callable it returns is timed, `units` items per call."""
+    def register(setup):
+        BENCHMARKS[name] = (setup, units, unit)
+        return setup
+    return register
+
+
+def _path(*parts):
+    return os.path.join(HERE, *parts)
+
+
+#===================== fixtures =====================#
+
+def _reports(n=200):
+    from rpa_parser import synthetic_reports
+    return synthetic_reports(n, seed=1)
+
+
+def _engine_inputs(n):
+    rng = np.random.default_rng(0)
+    scale = (lambda v, spread=0.2: v * rng.uniform(1 - spread, 1 + spread, n)) if n > 1 else (lambda v, spread=0: v)
+    return dict(P=scale(180e5), Pa=101325.0, F=scale(22e3), epsilon_i=scale(7.0), d_dkdr=scale(3.0),
+                Lstar=scale(1.0), Cstar=scale(1892.5), R=scale(433.5), kappa=scale(1.1716, 0.05),
+                OF=scale(0.848), dkr=scale(0.03104))
+
+
+#===================== parsing =====================#
+
+@benchmark('parse.extract_values', units=200, unit='report')
+def _():
+    import main  # the page functions, streamlit is only imported
+    from rpa_parser import parse_rpa_output
+    reports = _reports()
+    return lambda: [main.extract_values(parse_rpa_output(text)) for text in reports]
+
+
+@benchmark('parse.validate_rpa_output', units=200, unit='report')
+def _():
+    import main
+    reports = _reports()
+    return lambda: [main.validate_rpa_output(text) for text in reports]
+
+
+@benchmark('parse.rpa_csv', unit='file')
+def _():
+    from rpa_csv import read_csv
+    return lambda: list(read_csv(_path('rpa', 'hydra2_final.csv')))
+
+
+@benchmark('parse.rpa_cfg', units=2, unit='file')
+def _():
+    from rpa_cfg import loads
+    texts = [open(_path('rpa', name), encoding='utf-8').read() for name in ('hail_hydra2.cfg', 'RD-0146.cfg')]
+    return lambda: [loads(text) for text in texts]
+
+
+#===================== exit Mach =====================#
+
+@benchmark('mach.fsolve', units=100, unit='solve')
+def _():
+    from scipy.optimize import fsolve
+
+    def equation(Mi, kappa, epsilon_i):  # per-point solve as main.py did before mach_solver
+        exponent = (kappa + 1) / (2 * (kappa - 1))
+        return (1 + (kappa - 1) / 2 * Mi**2)**exponent / (Mi * ((kappa + 1) / 2)**exponent) - epsilon_i
+
+    epsilon = np.linspace(3, 15, 100)
+    return lambda: [fsolve(equation, 2.8, args=(1.1716, e)) for e in epsilon]
+
+
+@benchmark('mach.solve_exit_mach.scalar', unit='solve')
+def _():
+    from mach_solver import solve_exit_mach
+    return lambda: solve_exit_mach(1.1716, 7.0)
+
+
+@benchmark('mach.solve_exit_mach.1e6', units=10**6, unit='solve')
+def _():
+    from mach_solver import solve_exit_mach
+    rng = np.random.default_rng(0)
+    kappa, epsilon = rng.uniform(1.1, 1.4, 10**6), rng.uniform(2, 100, 10**6)
+    return lambda: solve_exit_mach(kappa, epsilon)
+
+
+#===================== analytical chain =====================#
+
+@benchmark('chain.scalar', unit='engine')
+def _():
+    from engine_model import EngineModel
+    model = EngineModel(**_engine_inputs(1))
+    return model.evaluate
+
+
+@benchmark('chain.array.1e5', units=10**5, unit='engine')
+def _():
+    from engine_model import EngineModel
+    model = EngineModel(**_engine_inputs(10**5))
+    return model.evaluate
+
+
+@benchmark('chain.graph.rerun', unit='rerun')
+def _():
+    # a page rerun with unchanged inputs: every node is a memo hit
+    from compute_graph import engine_graph
+    graph = engine_graph()
+    inputs = {**_engine_inputs(1), 'F_kN': 22.0, 'rpa_response': _reports(1)[0], 'M_i': 2.963}
+    del inputs['F']
+    graph.evaluate(inputs)
+    return lambda: graph.evaluate(inputs)
+
+
+#===================== HTML =====================#
+
+@benchmark('html.parse.hydra2', unit='file')
+def _():
+    from rpa_cache import parse_html_tables
+    text = open(_path('rpa', 'hydra2.html'), encoding='utf-8').read()
+    return lambda: parse_html_tables(text)
+
+
+@benchmark('html.read_tables.cached', units=4, unit='file')
+def _():
+    from rpa_cache import read_tables
+    paths = [_path('rpa', name) for name in ('1_propellant_specification.html', '2_thermodynamic_properties.html',
+                                              '3_fractions_combustion.html', '4_performance.html')]
+    return lambda: [read_tables(path) for path in paths]
+
+
+#===================== page =====================#
+
+@benchmark('page.apptest', unit='run')
+def _():
+    # headless run of main() in a fresh session, artifacts already cached by the process
+    from streamlit.testing.v1 import AppTest
+
+    def run():
+        at = AppTest.from_file(_path('main.py'), default_timeout=60).run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+    return run
+
+
+@benchmark('startup.import_main', unit='process')
+def _():
+    # fresh interpreter, as after every auto-restart; heavy modules must stay lazy (warmup.py)
+    import subprocess
+    return lambda: subprocess.run([sys.executable, '-c', 'import main'], cwd=HERE, check=True)
+
+
+#===================== runner =====================#
+
+def measure(func, repeat=9, min_time=0.3):
+    """Seconds per call: median and min over `repeat` rounds of an auto-ranged loop count."""
+    func()  # warm-up (imports, caches)
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or loops >= 10**6:
+            break
+        loops *= max(2, int(min_time / max(elapsed, 1e-9)))
+    rounds = [elapsed / loops]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            func()
+        rounds.append((time.perf_counter() - t0) / loops)
+    return {'median': statistics.median(rounds), 'min': min(rounds), 'loops': loops, 'rounds': len(rounds)}
+
+
+def _calibration_workload(data=np.random.default_rng(0).random(50_000)):
+    # fixed mix of interpreter and numpy work; timings are compared relative to it
+    total = 0
+    for i in range(5000):
+        total += i * i
+    return total, np.sort(data)
+
+
+def run(patterns=None, repeat=9, min_time=0.3, verbose=True):
+    """
+    Run the registered benchmarks.
+
+    Args:
+    patterns (list, optional): Run only benchmarks whose name contains one of these.
+    repeat (int): Timed rounds per benchmark.
+    min_time (float): Minimum duration of one round [s].
+    verbose (bool): Print one line per benchmark.
+
+    Returns:
+    dict: Run metadata and per-benchmark timings.
+    """
+    results = {}
+    for name, (setup, units, unit) in BENCHMARKS.items():
+        if patterns and not any(p in name for p in patterns):
+            continue
+        func = setup()
+        timing = measure(func, repeat, min_time)
+        # calibrated right after each benchmark, machine speed drifts within a run
+        timing['calibration'] = measure(_calibration_workload, repeat, min_time / 4)['median']
+        timing['throughput'] = units / timing['median']
+        timing['unit'] = unit
+        results[name] = timing
+        if verbose:
+            print(f"{name:32s} {timing['median'] * 1e3:12.4f} ms   {timing['throughput']:>14,.1f} {unit}/s")
+    return {
+        'machine': {'python': platform.python_version(), 'numpy': np.__version__,
+                    'platform': platform.platform(), 'processor': platform.processor(),
+                    'cpus': os.cpu_count()},
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerance=0.5):
+    """
+    Benchmarks slower than baseline by more than `tolerance`.
+
+    Timings are compared on the median round, relative to the calibration workload
+    timed in the same run, so a uniformly slower (or busier) machine does not read as
+    a regression.
+
+    Returns:
+    list: (name, baseline seconds, current seconds, ratio) per regression.
+    """
+    regressions = []
+    for name, timing in current['results'].items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            continue
+        ratio = (timing['median'] / timing['calibration']) / (reference['median'] / reference['calibration'])
+        if ratio > 1 + tolerance:
+            regressions.append((name, reference['median'], timing['median'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite with baseline comparison.")
+    parser.add_argument('-k', dest='patterns', action='append', help="name substring, repeatable")
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--out', help="write this run as JSON")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="allowed relative slowdown")
+    parser.add_argument('--repeat', type=int, default=9, help="timed rounds per benchmark")
+    parser.add_argument('--min-time', type=float, default=0.3, help="minimum duration of one round [s]")
+    parser.add_argument('--confirm', type=int, default=2, help="reruns a regression must reproduce in")
+    parser.add_argument('--no-fail', action='store_true', help="report regressions, exit with status 0")
+    parser.add_argument('--list', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print('\n'.join(BENCHMARKS))
+        return 0
+    current = run(args.patterns, args.repeat, args.min_time)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as file:
+            json.dump(current, file, indent=2)
+    if args.save_baseline:
+        if os.path.exists(args.baseline) and args.patterns:
+            with open(args.baseline, encoding='utf-8') as file:
+                stored = json.load(file)
+            stored['results'].update(current['results'])
+            current = {**current, 'results': stored['results']}
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump(current, file, indent=2)
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}, run with --save-baseline")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)
+    regressions = compare(current, baseline, args.tolerance)
+    # one slow run is noise on a shared machine; keep what every rerun reproduces
+    for _ in range(args.confirm):
+        if not regressions:
+            break
+        rerun = run([name for name, *_ in regressions], args.repeat, args.min_time, verbose=False)
+        confirmed = {name for name, *_ in compare(rerun, baseline, args.tolerance)}
+        regressions = [regression for regression in regressions if regression[0] in confirmed]
+    for name, before, after, ratio in regressions:
+        print(f"REGRESSION {name}: {before * 1e3:.4f} ms -> {after * 1e3:.4f} ms ({ratio:.2f}x)")
+    if not regressions:
+        print(f"no regressions against {os.path.basename(args.baseline)} (tolerance {args.tolerance:.0%})")
+        return 0
+    machine = {key: baseline['machine'].get(key) for key in MACHINE_KEYS}
+    if machine != {key: current['machine'][key] for key in MACHINE_KEYS}:
+        print(f"baseline recorded on other hardware ({machine}), not failing")
+        return 0
+    return 0 if args.no_fail else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+# chamber_sizing.py
+# combustion chamber sized from the characteristic length the way RPA does it: the chamber
+# volume L* * At includes the converging section (R2 arc, cone at angle b, R1 arc), and the
+# cylinder takes the rest; vectorized over grids of L*, contraction ratio and throat size
+#
+#   steps 3-4 of main.py use Dk/dkr (diameter ratio) and a cylinder of the whole volume;
+#   RPA takes Ac/At (area ratio, contractionAreaRatio in the .cfg), so Dk = dkr * sqrt(Ac/At)
+#
+#   injector -> cylinder (Lcyl) -> R2 arc -> cone -> R1 arc -> throat, Lc = Lcyl + Lconv
+from dataclasses import dataclass, asdict
+
+import numpy as np
+
+# thin-wall mass estimate: Inconel 718 near wall temperature; mass_factor scales the
+# pressure-bearing wall to the whole structure (jacket, flanges), calibrated on a known engine
+DEFAULT_MATERIAL = dict(density=8190.0, allowable_stress=250e6, safety_factor=1.5, min_thickness=1e-3,
+                        mass_factor=1.0)
+
+
+@dataclass
+class ChamberDesign:
+    """Sized chamber(s), SI units; arrays for array inputs."""
+    contraction: np.ndarray  # Ac / At
+    dc: np.ndarray           # chamber diameter
+    r1: np.ndarray
+    r2: np.ndarray
+    Vc: np.ndarray           # chamber volume L* * At, injector to throat
+    Vconv: np.ndarray        # converging section
+    Vcyl: np.ndarray
+    Lconv: np.ndarray
+    Lcyl: np.ndarray
+    Lc: np.ndarray           # injector to throat
+    area: np.ndarray         # inner wall surface, chamber (and nozzle when sized)
+    thickness: np.ndarray    # chamber wall
+    mass: np.ndarray         # chamber (and nozzle when sized)
+    feasible: np.ndarray     # False where the converging section alone exceeds L* * At (Lcyl < 0),
+                             # or the contraction is too small for R1 and b (r2 <= 0, Lconv < 0)
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def converging_length(rc, rt, r1, r2, b):
+    """Axial length of R2 arc + cone + R1 arc between radii rc and rt [b in rad]."""
+    return (r2 + r1) * np.sin(b) + (rc - rt - (r1 + r2) * (1 - np.cos(b))) / np.tan(b)
+
+
+def _arc(cr, sr, radius, b):
+    # volume and surface of revolution of x = R sin(phi), r = cr + sr * R cos(phi), phi in [0, b]
+    sin_b, cos_b = np.sin(b), np.cos(b)
+    volume = np.pi * radius * (cr**2 * sin_b + cr * sr * radius * (b + sin_b * cos_b)
+                               + radius**2 * (sin_b - sin_b**3 / 3))
+    surface = 2 * np.pi * radius * (cr * b + sr * radius * sin_b)
+    return volume, surface
+
+
+def _frustum(ra, rb, length):
+    volume = np.pi * length / 3 * (ra**2 + ra * rb + rb**2)
+    surface = np.pi * (ra + rb) * np.hypot(length, ra - rb)
+    return volume, surface
+
+
+def size_chamber(dkr, Lstar=1.0, contraction=None, d_dkdr=None, b=30.0, R1_to_Rt=1.5,
+                 R2_to_R2max=0.5, P=None, epsilon_i=None, Le=None, material=None):
+    """
+    Size the chamber from the characteristic length, with the converging section.
+
+    R2 is a fraction of R2max, the radius at which the arcs meet without a cone (RPA's
+    R2_to_R2max_ratio). Inputs broadcast, e.g. `np.meshgrid` over L*, contraction and
+    throat diameter sizes thousands of chambers per call.
+
+    Example:
+    chamber = size_chamber(dkr=0.03104, Lstar=1.0, contraction=6.7, P=180e5)
+    chamber.Lc, chamber.Lcyl  # ~0.1773 m, ~0.1068 m (RPA: 177.26 mm, 106.81 mm)
+
+    Args:
+    dkr (float or ndarray): Throat diameter [m].
+    Lstar (float or ndarray): Characteristic length [m].
+    contraction (float or ndarray, optional): Contraction area ratio Ac/At, as in RPA.
+    d_dkdr (float or ndarray, optional): Chamber / throat diameter ratio, as in main.py.
+    b (float or ndarray): Contraction angle [deg].
+    R1_to_Rt (float or ndarray): Throat upstream radius of curvature / throat radius.
+    R2_to_R2max (float or ndarray): Chamber-to-cone radius of curvature / its maximum.
+    P (float or ndarray, optional): Chamber pressure [Pa], for the wall thickness; minimum thickness if omitted.
+    epsilon_i (float or ndarray, optional): Expansion ratio; adds the nozzle (conical, length Le) to area and mass.
+    Le (float or ndarray, optional): Nozzle length [m]; 80 % of a 15 deg cone by default.
+    material (dict, optional): Overrides of `DEFAULT_MATERIAL` (density, allowable_stress,
+        safety_factor, min_thickness, mass_factor).
+
+    Returns:
+    ChamberDesign: Geometry, volumes and mass per chamber.
+    """
+    if (contraction is None) == (d_dkdr is None):
+        raise ValueError("give contraction (area ratio) or d_dkdr (diameter ratio)")
+    if contraction is None:
+        contraction = np.asarray(d_dkdr, dtype=float)**2
+    material = {**DEFAULT_MATERIAL, **(material or {})}
+    dkr, Lstar, contraction, b, R1_to_Rt, R2_to_R2max = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (dkr, Lstar, contraction, b, R1_to_Rt, R2_to_R2max)))
+    b = np.radians(b)
+
+    rt = dkr / 2
+    rc = rt * np.sqrt(contraction)
+    r1 = R1_to_Rt * rt
+    r2 = R2_to_R2max * ((rc - rt) / (1 - np.cos(b)) - r1)
+    Lconv = converging_length(rc, rt, r1, r2, b)
+
+    # R2 arc from the cylinder, cone, R1 arc into the throat
+    y2 = rc - r2 * (1 - np.cos(b))
+    y3 = rt + r1 * (1 - np.cos(b))
+    v2, s2 = _arc(rc - r2, 1.0, r2, b)
+    v_cone, s_cone = _frustum(y2, y3, Lconv - (r1 + r2) * np.sin(b))
+    v1, s1 = _arc(rt + r1, -1.0, r1, b)
+    Vconv = v2 + v_cone + v1
+
+    Vc = Lstar * np.pi * rt**2
+    Vcyl = Vc - Vconv
+    Lcyl = Vcyl / (np.pi * rc**2)
+    area = 2 * np.pi * rc * np.maximum(Lcyl, 0) + s2 + s_cone + s1
+
+    # thin wall, hoop stress at the chamber radius
+    thickness = np.full(rc.shape, material['min_thickness'])
+    if P is not None:
+        hoop = material['safety_factor'] * np.asarray(P, dtype=float) * rc / material['allowable_stress']
+        thickness = np.maximum(thickness, hoop)
+    mass = material['density'] * area * thickness
+
+    if epsilon_i is not None:
+        re = rt * np.sqrt(np.asarray(epsilon_i, dtype=float))
+        if Le is None:
+            Le = 0.8 * (re - rt) / np.tan(np.radians(15))
+        nozzle = _frustum(rt, re, np.asarray(Le, dtype=float))[1]
+        area = area + nozzle
+        mass = mass + material['density'] * nozzle * material['min_thickness']
+    mass = mass * material['mass_factor']
+
+    design = ChamberDesign(contraction, 2 * rc, r1, r2, Vc, Vconv, Vcyl, Lconv, Lcyl, Lconv + Lcyl,
+                           area, np.broadcast_to(thickness, rc.shape), mass,
+                           (Lcyl >= 0) & (r2 > 0) & (Lconv >= 0))
+    if dkr.ndim == 0:
+        design = ChamberDesign(*(np.asarray(value)[()] for value in design.__dict__.values()))
+    return design
+
+
+if __name__ == "__main__":
+    import time
+
+    import engine_model as em
+    from rpa_parser import RPA_RESPONSE_DEFAULT, parse_rpa_output
+
+    rpa = parse_rpa_output(RPA_RESPONSE_DEFAULT)
+    dkr, P = rpa.dt / 1000, 180e5
+    as_rpa = size_chamber(dkr, 1.0, contraction=(rpa.dc / rpa.dt)**2, P=P, epsilon_i=7.0, Le=rpa.le / 1000)
+    as_page = size_chamber(dkr, 1.0, d_dkdr=3.0, P=P)
+    print(f"RPA            : Dc = {rpa.dc:.2f} mm, Lcyl = {rpa.lcyl:.2f} mm, Lc = {rpa.lc:.2f} mm, "
+          f"R2 = {rpa.r2:.2f} mm, mass = {rpa.mass} kg")
+    print(f"Ac/At of RPA   : Dc = {as_rpa.dc * 1000:.2f} mm, Lcyl = {as_rpa.Lcyl * 1000:.2f} mm, "
+          f"Lc = {as_rpa.Lc * 1000:.2f} mm, R2 = {as_rpa.r2 * 1000:.2f} mm, mass = {as_rpa.mass:.2f} kg")
+    page_lk = em.chamber_length(em.chamber_volume(1.0, em.throat_area(dkr)), em.chamber_diameter(dkr, 3.0))
+    print(f"Dk/dkr = 3     : Dc = {as_page.dc * 1000:.2f} mm, Lcyl = {as_page.Lcyl * 1000:.2f} mm, "
+          f"Lc = {as_page.Lc * 1000:.2f} mm (page, cylinder only: lk = {page_lk * 1000:.2f} mm)")
+
+    Lstar, contraction, dkr = np.meshgrid(np.linspace(0.5, 2.0, 40), np.linspace(2, 10, 50),
+                                          np.linspace(0.01, 0.2, 500), indexing='ij')
+    t0 = time.perf_counter()
+    chambers = size_chamber(dkr, Lstar, contraction=contraction, P=np.linspace(50e5, 250e5, 500))
+    print(f"{chambers.Lc.size} chambers in {time.perf_counter() - t0:.3f} s, "
+          f"{chambers.feasible.mean():.1%} with a cylindrical section")
+
+    # the thin wall is the structural minimum; scale to RPA's estimate for this engine
+    factor = rpa.mass / as_rpa.mass
+    calibrated = size_chamber(dkr, Lstar, contraction=contraction, P=P, epsilon_i=7.0,
+                              material={'mass_factor': factor})
+    print(f"mass_factor = {factor:.2f} (RPA {rpa.mass} kg / thin wall {as_rpa.mass:.2f} kg): "
+          f"grid mass {calibrated.mass.min():.2f} - {calibrated.mass.max():.1f} kg")
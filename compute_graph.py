@@ -0,0 +1,200 @@
+# compute_graph.py
+# dependency-tracked, memoized evaluation of the analytical chain (no streamlit import)
+import inspect
+from collections import OrderedDict
+
+import numpy as np
+
+import engine_model as em
+from derivation import SECTIONS
+from rpa_parser import parse_rpa_output
+
+
+def _key(value):
+    # hashable memo key, arrays by content
+    if isinstance(value, np.ndarray):
+        return (value.shape, value.dtype.str, value.tobytes())
+    return value
+
+
+class ComputeGraph:
+    """
+    Memoized evaluation graph.
+
+    Each node is a function of named inputs or other nodes; dependencies are the
+    argument names unless given explicitly. A node is recomputed only when the
+    values of its dependencies differ from every cached evaluation, so changing
+    e.g. `Lstar` re-evaluates `Vkom` and `lk` and nothing else.
+
+    Args:
+    nodes (dict): name -> function, or name -> (function, dependency names).
+    memo_size (int): Cached evaluations kept per node.
+    """
+
+    def __init__(self, nodes, memo_size=16):
+        self.nodes = {}
+        for name, spec in nodes.items():
+            func, deps = spec if isinstance(spec, tuple) else (spec, None)
+            if deps is None:
+                deps = tuple(inspect.signature(func).parameters)
+            self.nodes[name] = (func, tuple(deps))
+        self.memo_size = memo_size
+        self._memo = {name: OrderedDict() for name in self.nodes}
+        self.values = {}
+        self.recomputed = []  # nodes evaluated since begin_run()
+        self.calls = {name: 0 for name in self.nodes}
+        self.hits = {name: 0 for name in self.nodes}
+
+    def dependencies(self, name):
+        return self.nodes[name][1]
+
+    def dependents(self, names):
+        """All nodes downstream of the given inputs/nodes."""
+        affected, changed = set(), True
+        names = set(names)
+        while changed:
+            changed = False
+            for node, (_, deps) in self.nodes.items():
+                if node not in affected and names.union(affected).intersection(deps):
+                    affected.add(node)
+                    changed = True
+        return affected
+
+    def begin_run(self):
+        """Reset the per-run instrumentation (call once per Streamlit rerun)."""
+        self.recomputed = []
+
+    def evaluate(self, inputs, targets=None):
+        """
+        Evaluate `targets` (default: every node) and their ancestors.
+
+        Args:
+        inputs (dict): Input values by name; merged with inputs from earlier calls.
+        targets (list, optional): Nodes to evaluate.
+
+        Returns:
+        dict: Current values of all inputs and evaluated nodes.
+        """
+        self.values.update(inputs)
+        for name in self._order(targets or list(self.nodes)):
+            func, deps = self.nodes[name]
+            args = [self.values[dep] for dep in deps]
+            key = tuple(_key(arg) for arg in args)
+            memo = self._memo[name]
+            if key in memo:
+                memo.move_to_end(key)
+                self.hits[name] += 1
+            else:
+                memo[key] = func(*args)
+                self.calls[name] += 1
+                self.recomputed.append(name)
+                if len(memo) > self.memo_size:
+                    memo.popitem(last=False)
+            self.values[name] = memo[key]
+        return self.values
+
+    def upstream(self, targets):
+        """`targets` and the nodes they depend on, in evaluation order."""
+        return self._order(targets)
+
+    def inputs_of(self, targets):
+        """Inputs (names that are not nodes) that `targets` depend on."""
+        order = self._order(targets)
+        return sorted({dep for name in order for dep in self.nodes[name][1] if dep not in self.nodes})
+
+    def preload(self, values):
+        """
+        Seed the memo with node values computed elsewhere (another session, see
+        result_cache.py), so evaluating the same inputs is a hit instead of a recompute.
+
+        Args:
+        values (dict): Input and node values by name; a node is seeded when all its dependencies are given.
+        """
+        for name in self._order([name for name in values if name in self.nodes]):
+            func, deps = self.nodes[name]
+            if name not in values or any(dep not in values for dep in deps):
+                continue
+            memo = self._memo[name]
+            key = tuple(_key(values[dep]) for dep in deps)
+            memo[key] = values[name]
+            memo.move_to_end(key)
+            if len(memo) > self.memo_size:
+                memo.popitem(last=False)
+
+    def _order(self, targets):
+        # depth-first topological order of targets and their ancestors
+        order, seen = [], set()
+
+        def visit(name):
+            if name in seen or name not in self.nodes:
+                return
+            seen.add(name)
+            for dep in self.nodes[name][1]:
+                visit(dep)
+            order.append(name)
+
+        for target in targets:
+            visit(target)
+        return order
+
+
+def _solve_exit_mach(kappa, epsilon_i):
+    return float(em.exit_mach(kappa, epsilon_i))
+
+
+def _seconds(Isp):
+    return Isp / em.g0
+
+
+def _kilonewtons_to_newtons(F_kN):
+    return F_kN * 1000
+
+
+# analytical chain of main.py; inputs: rpa_response, dkr, P, Pa, F_kN, epsilon_i, d_dkdr,
+# Lstar, Cstar, R, kappa, OF and the (possibly hand-edited) exit Mach number M_i
+ENGINE_NODES = {
+    'rpa': parse_rpa_output,
+    'Akr': em.throat_area,
+    'm_dot': em.mass_flow,
+    'mg': em.fuel_flow,
+    'mox': em.oxidizer_flow,
+    'Vkom': em.chamber_volume,
+    'dk': em.chamber_diameter,
+    'lk': em.chamber_length,
+    'Ai': em.exit_area,
+    'di': em.exit_diameter,
+    'Mi_solution': _solve_exit_mach,
+    'p_i': em.exit_pressure,
+    'Mi_opt': em.optimal_exit_mach,
+    'e_i_opt': em.optimal_expansion_ratio,
+    'Aiopt': em.optimal_exit_area,
+    'diopt': em.optimal_exit_diameter,
+    'Gamma_kappa': em.temperature_function,
+    'T': em.chamber_temperature,
+    'Vi': em.exhaust_velocity,
+    'Vi_opt': em.optimal_exhaust_velocity,
+    'F': _kilonewtons_to_newtons,
+    'Fopt': em.optimal_thrust,
+    'Cf': em.thrust_coefficient,
+    'Isp': em.specific_impulse,
+    'Isp_sec': _seconds,
+    'Isp_opt': (em.specific_impulse, ('Fopt', 'mox', 'mg')),
+    'Isp_opt_sec': (_seconds, ('Isp_opt',)),
+}
+
+# numbered derivation steps in main.py that display each node
+ENGINE_SECTIONS = {
+    'Akr': 1, 'm_dot': 2, 'mg': 2, 'mox': 2, 'Vkom': 3, 'dk': 4, 'lk': 4, 'Ai': 5, 'di': 5,
+    'Mi_solution': 6, 'p_i': 7, 'Mi_opt': 8, 'e_i_opt': 8, 'Aiopt': 8, 'diopt': 8,
+    'Gamma_kappa': 9, 'T': 9, 'Vi': 10, 'Vi_opt': 10, 'F': 11, 'Fopt': 11, 'Cf': 12,
+    'Isp': 13, 'Isp_sec': 13, 'Isp_opt': 13, 'Isp_opt_sec': 13,
+}
+
+
+# LaTeX of each derivation section (derivation.py), rebuilt only when its values change
+DERIVATION_NODES = {f'derivation_{key}': builder for key, builder in SECTIONS.items()}
+
+
+def engine_graph(memo_size=16):
+    """New graph over `ENGINE_NODES` and `DERIVATION_NODES`, one per session."""
+    return ComputeGraph({**ENGINE_NODES, **DERIVATION_NODES}, memo_size=memo_size)
@@ -0,0 +1,316 @@
+# derivation.py
+# LaTeX of the analytical derivation (steps 1-13 of main.py) as structured records,
+# built from the values of the compute graph; no streamlit import
+from dataclasses import dataclass
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)  # batch reports repeat many inputs (report_export.py)
+def format_scientific_latex(number, precision=3):
+    """
+    Format a number into scientific notation with LaTeX formatting.
+
+    Args:
+    number (float): The number to format.
+    precision (int): The number of decimal places.
+
+    Returns:
+    str: Formatted string in scientific notation.
+    """
+    # Format to scientific notation with specified precision
+    formatted_number = f"{number:.{precision}e}"
+
+    # Split at 'e' and reconstruct with LaTeX-friendly format
+    number_parts = formatted_number.split('e')
+    return f"{number_parts[0]} \\times 10^{{{number_parts[1]}}}"
+
+
+@dataclass(frozen=True)
+class Step:
+    """One derivation step; each field is a markdown line with inline LaTeX, '' if absent."""
+    symbol: str
+    formula: str = ''      # symbolic equation
+    substituted: str = ''  # equation with the numbers filled in
+    result: str = ''       # highlighted result line
+    help: str = None       # tooltip on the substituted line
+
+
+@dataclass(frozen=True)
+class Section:
+    key: str
+    title: str
+    steps: tuple
+
+
+#===================== sections =====================#
+# argument names are compute graph inputs/nodes, so each section is rebuilt only
+# when one of its values changes (see compute_graph.DERIVATION_NODES)
+
+def section_1(dkr, Akr):
+    dkr_sci = format_scientific_latex(dkr)
+    Akr_sci = format_scientific_latex(Akr)
+    return Section('1', '1. Kriticni presek i precnik mlaznika:', (
+        Step('d_kr',
+             substituted=f'$ d_{{kr}} = {dkr:.4f} \\, \\text{{m}} $',
+             result=f'> $ d_{{kr}} = {dkr_sci} \\, \\text{{m}} $',
+             help='vrednost iz RPA izlaza'),
+        Step('A_kr',
+             formula='$ A_{kr} = d_{kr}^2 \\cdot \\frac{\\pi}{4}$',
+             substituted=f'$ A_{{kr}} = {dkr:.5f}^2 \\cdot \\frac{{\\pi}}{{4}} = {Akr:.5f} \\, m^2 $',
+             result=f'> $ A_{{kr}} = {Akr_sci} \\, m^2 $'),
+    ))
+
+
+def section_2(P, Cstar, Akr, m_dot, OF, mg, mox):
+    P_sci = format_scientific_latex(P)
+    return Section('2', '2. Maseni protoci:', (
+        Step('Cstar', substituted=f'$ C_{{star}} = {Cstar:.2f} \\, \\text{{m/s}} $'),
+        Step('m_dot',
+             formula='$\\dot{m} = \\frac{P \\cdot A_{kr}} { C_{star} } $',
+             substituted=f'$\\dot{{m}} = \\frac{{{P_sci} \\cdot \\, {Akr:.5f}}} {{ {Cstar:.2f} }} = {m_dot:.3f} \\, \\text{{kg/s}} $'),
+        Step('mg', substituted=f'$ m_{{g}} = \\dot{{m}} \\cdot \\frac{{1}}{{OF + 1}} = {m_dot:.3f} \\cdot \\frac{{1}}{{{OF:.3f} + 1}} = {mg:.3f} \\, \\text{{kg/s}} $'),
+        Step('mox', substituted=f'$ m_{{ox}} = \\dot{{m}} - m_{{g}} = {m_dot:.3f} - {mg:.3f} = {mox:.3f} \\, \\text{{kg/s}} $'),
+    ))
+
+
+def section_3(Lstar, Akr, Vkom):
+    Akr_sci = format_scientific_latex(Akr)
+    Vkom_sci = format_scientific_latex(Vkom)
+    return Section('3', '3. Zapremina komore:', (
+        Step('Vkom',
+             formula='$V_{kom} = L_{kar} \\cdot A_{kr}$',
+             substituted=f'$ V_{{kom}} = {Lstar:.3f} \\, \\cdot \\, {Akr_sci} = {Vkom:.5f} \\, m^3 $',
+             result=f'> $ V_{{kom}} = {Vkom_sci} \\, m^3 $'),
+    ))
+
+
+def section_4(dkr, d_dkdr, dk, Vkom, lk):
+    lk_sci = format_scientific_latex(lk)
+    return Section('4', '4. Precnik i duzina komore', (
+        Step('dk',
+             formula='$d_{k} = d_{kr} \\cdot \\frac{D_k}{d_{kr}}$',
+             substituted=f'$ d_{{k}} = {dkr:.3f} \\, \\cdot \\, {d_dkdr:.3f} = {dk:.3f} \\, \\text{{m}} $'),
+        Step('lk',
+             formula='$l_{k} = \\frac{V_{kom}}{\\frac{d_{k}^2 \\cdot \\pi}{4}}$',
+             substituted=f'$ l_{{k}} = \\frac{{ {Vkom:.5f} }}{{ \\frac{{ {dk:.3f}^2 \\cdot \\pi }}{{ 4 }} }} = {lk:.3f} \\, \\text{{m}} $',
+             result=f'> $ l_{{k}} = {lk_sci} \\, \\text{{m}} $'),
+    ))
+
+
+def section_5(epsilon_i, Akr, Ai, di):
+    di_sci = format_scientific_latex(di)
+    return Section('5', '5. Izlazni presek i precnik mlaznika', (
+        Step('Ai',
+             formula='$A_{i} = \\epsilon_i \\cdot A_{kr}$',
+             substituted=f'$ A_{{i}} = {epsilon_i:.3f} \\cdot {Akr:.5f} = {Ai:.5f} \\, \\text{{m}}^{{2}} $'),
+        Step('di',
+             formula='$d_{i} = \\sqrt{\\frac{A_{i} \\cdot 4}{\\pi}}$',
+             substituted=f'$ d_{{i}} = \\sqrt{{\\frac{{{Ai:.3f} \\cdot 4}}{{\\pi}}}} = {di:.3f} \\, \\text{{m}} $',
+             result=f'> $ d_{{i}} = {di_sci} \\, \\text{{m}} $'),
+    ))
+
+
+def section_6(epsilon_i):
+    return Section('6', '6. Odredjivanje Mahovog broja na izlazu mlaznika', (
+        Step('epsilon_i',
+             substituted=f'$\\epsilon_{{i}} = {epsilon_i:.2f}$',
+             help='zadati stepen sirenja mlaznika, izmeniti u sidebar-u'),
+        Step('M_i', formula=r'''
+        $ \epsilon_{i} = \frac{
+        \left(1 + \frac{\kappa - 1}{2} \cdot M_{iter}^2\right)^{\frac{\kappa + 1}{2(\kappa - 1)}}
+        }{
+        M_{iter} \left(\frac{\kappa + 1}{2}\right)^{\frac{\kappa + 1}{2(\kappa - 1)}}
+        } $
+    '''),
+    ))
+
+
+def section_7(P, kappa, M_i, p_i):
+    pi_sci = format_scientific_latex(p_i)
+    return Section('7', '7. Statički pritisak na izlazu iz mlaznika:', (
+        Step('p_i',
+             formula=r'''
+        $ p_i = \frac{P}{
+        \left(1 + \frac{\kappa - 1}{2} \cdot M_i^2\right)^{\frac{\kappa}{\kappa - 1}}
+        } $
+    ''',
+             substituted=f'''
+    $ p_i = \\frac{{{P:.2e}}}{{\\left(1 + \\frac{{{kappa} - 1}}{{2}} \\cdot {M_i:.3f}^2\\right)^{{\\frac{{{kappa}}}{{{kappa} - 1}}}}}} = {p_i:.3f} \\, \\text{{Pa}} $
+    ''',
+             result=f'> $ p_{{i}} = {pi_sci} \\, \\text{{Pa}} $'),
+    ))
+
+
+def section_8(P, Pa, kappa, Akr, Mi_opt, e_i_opt, Aiopt):
+    Aiopt_sci = format_scientific_latex(Aiopt)
+    return Section('8', '8. Optimalni stepen sirenja mlaznika (do atmosferskog P od 1 bar)', (
+        Step('Mi_opt',
+             formula=r'''
+    $$ M_{i \text{ opt}} = \sqrt{\left[\left(\frac{P}{P_a}\right)^{\frac{\kappa - 1}{\kappa}} - 1\right] \cdot \frac{2}{\kappa - 1}} $$
+    ''',
+             substituted=f'$ M_{{i opt}} = \\sqrt{{\\left[\\left(\\frac{{{P:.2e}}}{{{Pa:.2e}}}\\right)^{{\\frac{{{kappa} - 1}}{{{kappa}}}}} - 1\\right] \\cdot \\frac{{2}}{{{kappa} - 1}}}} = {Mi_opt:.3f} $',
+             result=f'> $ M_{{i opt}} = {Mi_opt:.3f} $'),
+        Step('e_i_opt',
+             formula=r'''
+    $ \epsilon_{i opt} = \frac{
+    \left(1 + \frac{\kappa - 1}{2} \cdot M_{i opt}^2\right)^{\frac{\kappa + 1}{2(\kappa - 1)}}
+    }{
+    M_{i opt} \left(\frac{\kappa + 1}{2}\right)^{\frac{\kappa + 1}{2(\kappa - 1)}}
+    } $
+    ''',
+             substituted=f'''
+        $ \\epsilon_{{i opt}} = \\frac{{
+        \\left(1 + \\frac{{{kappa} - 1}}{{2}} \\cdot {Mi_opt:.3f}^2\\right)^{{\\frac{{{kappa} + 1}}{{2({kappa} - 1)}}}}
+        }}{{
+        {Mi_opt:.3f} \\cdot \\left(\\frac{{{kappa} + 1}}{{2}}\\right)^{{\\frac{{{kappa} + 1}}{{2({kappa} - 1)}}}}
+        }} = {e_i_opt:.3f} $
+    ''',
+             result=f'> $ \\epsilon_{{i opt}} = {e_i_opt:.3f} $'),
+        Step('Aiopt',
+             formula=r'''
+    $$ A_{i_{opt}} = \epsilon_{i opt} \cdot A_{kr} $$
+    ''',
+             substituted=f'''
+        $ A_{{i_{{opt}}}} = {e_i_opt:.3f} \\cdot {Akr:.3f} = {Aiopt:.5f} \\, \\text{{m}}^2 $
+    ''',
+             result=f'> $ A_{{i{{opt}}}} = {Aiopt_sci} \\, \\text{{m}}^2 $'),
+    ))
+
+
+def section_8_diameter(Aiopt, diopt):
+    diopt_sci = format_scientific_latex(diopt)
+    return Section('8d', 'izlazni precnik', (
+        Step('diopt',
+             formula=r'''
+    $$ d_{i_{opt}} = \sqrt{A_{i_{opt}} \cdot \frac{4}{\pi}} $$
+    ''',
+             substituted=f'''
+        $ d_{{i_{{opt}}}} = \\sqrt{{ {Aiopt:.4f} \\cdot \\frac{{4}}{{\\pi}} }} = {diopt:.3f} \\, \\text{{m}}^2 $
+    ''',
+             result=f'> $ d_{{iopt}} = {diopt_sci} \\, \\text{{m}} $'),
+    ))
+
+
+def section_9(kappa, Gamma_kappa, Cstar, R, T):
+    T_sci = format_scientific_latex(T)
+    return Section('9', '9. Totalna temperatura u komori', (
+        Step('Gamma_kappa',
+             formula=r'''
+    $$ \Gamma(\kappa) = \sqrt{\kappa} \left( \frac{2}{\kappa + 1} \right)^{\frac{\kappa + 1}{2(\kappa - 1)}} $$
+    ''',
+             substituted=f'''
+    $ \\Gamma(\\kappa) = \\sqrt{{ {kappa} }} \\left( \\frac{{2}}{{ {kappa} + 1 }} \\right)^{{\\frac{{ {kappa} + 1 }}{{2( {kappa} - 1)}}}} = {Gamma_kappa:.3f} $
+    '''),
+        Step('T',
+             formula=r'''
+    $$ T = \frac{(C_{star} \cdot \Gamma(k))^2}{R} $$
+    ''',
+             substituted=f'''
+        $ T = \\frac{{({Cstar:.3f} \\cdot {Gamma_kappa:.3f})^2}}{{{R:.3f}}} = {T:.3f} \\, \\text{{K}} $
+    ''',
+             result=f'> $ T = {T_sci} \\, \\text{{K}} $'),
+    ))
+
+
+def section_10(kappa, R, T, P, p_i, Pa, Vi, Vi_opt):
+    Vi_sci = format_scientific_latex(Vi)
+    Vi_opt_sci = format_scientific_latex(Vi_opt)
+    return Section('10', '10. Brzina isticanja pri zadanom i optimalnom stepenu sirenja', (
+        Step('Vi',
+             formula=r'''
+        $$ V_i = \sqrt{ \frac{2 \kappa}{\kappa - 1} \cdot R \cdot T \cdot \left[ 1 - \frac{1}{\left(\frac{P}{p_i}\right)^{\frac{\kappa - 1}{\kappa}}} \right] } $$
+    ''',
+             substituted=f'''
+        $ V_i = \\sqrt{{ \\frac{{2 \\cdot {kappa}}}{{ {kappa} - 1 }} \\cdot {R} \\cdot {T:.3f} \\cdot \\left[ 1 - \\frac{{1}}{{\\left(\\frac{{ {P} }}{{ {p_i:.3f} }}\\right)^{{\\frac{{ {kappa} - 1 }}{{ {kappa} }}}}}} \\right] }}  = {Vi:.3f} \\, \\text{{m/s}} $
+    ''',
+             result=f'> $ V_{{i}} = {Vi_sci} \\, \\text{{m/s}} $'),
+        Step('Vi_opt',
+             formula=r'''
+        $$ V_{iopt} = \sqrt{ \frac{2 \kappa}{\kappa - 1} \cdot R \cdot T \cdot \left[ 1 - \frac{1}{\left(\frac{P}{p_a}\right)^{\frac{\kappa - 1}{\kappa}}} \right] } $$
+    ''',
+             substituted=f'''
+        $ V_{{iopt}} = \\sqrt{{ \\frac{{2 \\cdot {kappa}}}{{ {kappa} - 1 }} \\cdot {R} \\cdot {T:.3f} \\cdot \\left[ 1 - \\frac{{1}}{{\\left(\\frac{{ {P} }}{{ {Pa:.3f} }}\\right)^{{\\frac{{ {kappa} - 1 }}{{ {kappa} }}}}}} \\right] }}  = {Vi_opt:.3f} \\, \\text{{m/s}} $
+    ''',
+             result=f'> $ V_{{iopt}} = {Vi_opt_sci} \\, \\text{{m/s}} $'),
+    ))
+
+
+def section_11(F, mox, mg, Vi_opt, Fopt):
+    F_sci = format_scientific_latex(F)
+    Fopt_sci = format_scientific_latex(Fopt)
+    return Section('11', '11. Zadata sila potiska', (
+        Step('F',
+             substituted=f'$ F = {F:.2f} \\, \\text{{N}} $',
+             result=f'> $ F = {F_sci} \\, \\text{{N}} $'),
+        Step('Fopt',
+             formula=r'''
+        $$ F_{opt} = (m_{ox} + m_{g}) \cdot V_{iopt} $$
+    ''',
+             substituted=f'''
+        $ F_{{opt}} = ({mox:.3f} + {mg:.3f}) \\cdot {Vi_opt:.3f} = {Fopt:.3f} \\, \\text{{N}} $
+    ''',
+             result=f'> $ F_{{opt}} = {Fopt_sci} \\, \\text{{N}} $'),
+    ))
+
+
+def section_12(F, P, Akr, Cf):
+    F_sci = format_scientific_latex(F)
+    P_sci = format_scientific_latex(P)
+    Akr_sci = format_scientific_latex(Akr)
+    return Section('12', '12. Koeficijent potiska', (
+        Step('Cf',
+             formula=r'''
+        $$ C_f = \frac{F}{P \cdot A_{kr}} $$
+    ''',
+             substituted=f'''
+        $ C_f = \\frac{{ {F_sci} }}{{ {P_sci} \\cdot {Akr_sci} }} = {Cf:.3f} $
+    ''',
+             result=f'> $ C_f = {Cf:.3f} $'),
+    ))
+
+
+def section_13(F, mox, mg, Isp, Isp_sec):
+    return Section('13', '13. Specifični impuls pri zadanom stepenu sirenja', (
+        Step('Isp',
+             formula=r'''
+        $$ I_{sp} = \frac{F}{(m_{ox} + m_{g})} $$
+    ''',
+             substituted=f'''
+        $ I_{{sp}} = \\frac{{ {F:.3f} }}{{ ({mox:.3f} + {mg:.3f}) }} = {Isp:.2f} \\, \\text{{Ns/Kg}} = {Isp_sec:.2f} \\, \\text{{s}}$
+    ''',
+             result=f'> $ I_{{sp}} = {Isp:.2f} \\, \\text{{Ns/Kg}} $'),
+    ))
+
+
+def section_13_optimal(Fopt, mox, mg, Isp_opt, Isp_opt_sec):
+    return Section('13o', 'Specifični impuls pri optimalnom stepenu sirenja:', (
+        Step('Isp_opt',
+             formula=r'''
+        $$ I_{sp_{opt}} = \frac{F_{opt}}{(m_{ox} + m_{g})} $$
+    ''',
+             substituted=f'''
+        $ I_{{sp_{{opt}}}} = \\frac{{ {Fopt:.3f} }}{{ ({mox:.3f} + {mg:.3f}) }} = {Isp_opt:.3f} \\, \\text{{Ns/kg}}  = {Isp_opt_sec:.2f} \\, \\text{{s}}$
+    ''',
+             result=f'> $ I_{{sp_{{opt}}}} = {Isp_opt:.2f} \\, \\text{{Ns/Kg}} $',
+             help='Isp/g = value in seconds'),
+    ))
+
+
+# section key -> builder, in page order
+SECTIONS = {
+    '1': section_1,
+    '2': section_2,
+    '3': section_3,
+    '4': section_4,
+    '5': section_5,
+    '6': section_6,
+    '7': section_7,
+    '8': section_8,
+    '8d': section_8_diameter,
+    '9': section_9,
+    '10': section_10,
+    '11': section_11,
+    '12': section_12,
+    '13': section_13,
+    '13o': section_13_optimal,
+}
@@ -0,0 +1,145 @@
+# engine_comparison.py
+# side-by-side comparison of several engines / RPA runs: the analytical chain is evaluated
+# for all of them in one vectorized pass, RPA - analytical differences are kept as arrays
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import numpy as np
+
+from engine_model import EngineModel, g0
+from rpa_parser import RpaEngineDesign, parse_rpa_output
+
+# key -> (label, unit, RPA value, analytical value); rows of the comparison table in main.py
+QUANTITIES = {
+    'Isp': ('Isp — Specifični impuls (Vac)', 'Ns/kg',
+            lambda rpa: rpa['isp'] * g0, lambda result: result.Isp),
+    'Cf': ('Cf – Koeficijent potiska (Vac)', '-',
+           lambda rpa: rpa['cf'], lambda result: result.Cf),
+    'F': ('F - Potisak komore (Vac)', 'kN',
+          lambda rpa: rpa['thrust_vac'], lambda result: result.F / 1000),
+    'Fopt': ('Fopt - Potisak komore (Opt)', 'kN',
+             lambda rpa: rpa['thrust_opt'], lambda result: result.Fopt / 1000),
+    'Isp_opt': ('Isp_opt - Specifični impuls (Opt)', 'Ns/kg',
+                lambda rpa: rpa['isp_opt'] * g0, lambda result: result.Isp_opt),
+    'OF': ('OF - Odnos oksidator/gorivo (OF)', '-',
+           lambda rpa: rpa['ox_flow_rate'] / rpa['fuel_flow_rate'], lambda result: result.OF),
+    'Dc': ('Dc - Prečnik komore', 'mm',
+           lambda rpa: rpa['dc'], lambda result: result.dk * 1000),
+    'Dt': ('Dt - Prečnik grla mlaznika', 'mm',
+           lambda rpa: rpa['dt'], lambda result: result.dkr * 1000),
+    'De': ('De - Izlazni prečnik (presek)', 'mm',
+           lambda rpa: rpa['de'], lambda result: result.di * 1000),
+    'Lc': ('Lc - Dužina komore', 'mm',
+           lambda rpa: rpa['lc'], lambda result: result.lk * 1000),
+}
+
+
+def rpa_arrays(reports):
+    """
+    Fields of several RPA reports as arrays.
+
+    Args:
+    reports (list): RPA report texts or parsed `RpaEngineDesign` records.
+
+    Returns:
+    dict: Field name -> float array over the reports (NaN where a field is missing).
+    """
+    parsed = [report if isinstance(report, RpaEngineDesign) else parse_rpa_output(report)
+              for report in reports]
+    names = RpaEngineDesign.__dataclass_fields__
+    table = np.array([[np.nan if v is None else v for v in (getattr(p, name) for name in names)]
+                      for p in parsed], dtype=float).reshape(len(parsed), len(names))
+    return dict(zip(names, table.T))
+
+
+def rpa_inputs(rpa):
+    """Analytical inputs the page takes from the RPA report: Cstar, OF and dkr [m]."""
+    return {
+        'Cstar': rpa['thrust_vac'] * 1000 / ((rpa['ox_flow_rate'] + rpa['fuel_flow_rate']) * rpa['cf']),
+        'OF': rpa['ox_flow_rate'] / rpa['fuel_flow_rate'],
+        'dkr': rpa['dt'] / 1000,
+    }
+
+
+@dataclass
+class Comparison:
+    """RPA vs analytical values, arrays of shape (engines, quantities)."""
+    names: list
+    quantities: list  # keys of QUANTITIES
+    rpa: np.ndarray
+    analytical: np.ndarray
+    difference: np.ndarray  # rpa - analytical
+    percent: np.ndarray     # difference / analytical * 100
+
+    def to_frame(self):
+        """Long table, one row per (engine, quantity), for st.dataframe."""
+        import pandas as pd
+        n, m = self.rpa.shape
+        labels = [QUANTITIES[key][0] for key in self.quantities]
+        units = [QUANTITIES[key][1] for key in self.quantities]
+        return pd.DataFrame({
+            'Motor': np.repeat(np.asarray(self.names, dtype=object), m),
+            'Parametar': np.tile(np.asarray(labels, dtype=object), n),
+            'Jedinica': np.tile(np.asarray(units, dtype=object), n),
+            'RPA': self.rpa.ravel(),
+            'Analitički': self.analytical.ravel(),
+            'Razlika': self.difference.ravel(),
+            '% Razlika': self.percent.ravel(),
+        })
+
+
+def compare(reports, names=None, quantities=None, M_i=None, **inputs):
+    """
+    Compare RPA runs with the analytical model, all engines in one evaluation.
+
+    Example:
+    comparison = compare([hydra_report, variant_report], names=['hydra2', 'variant'],
+                         P=180e5, Pa=101325.0, F=[22e3, 30e3], epsilon_i=7.0,
+                         d_dkdr=3.0, Lstar=1.0, R=433.5, kappa=1.1716)
+    comparison.percent  # (2, 10)
+
+    Args:
+    reports (list): RPA report texts or parsed `RpaEngineDesign` records, one per engine.
+    names (list, optional): Engine names; numbered from 1 by default.
+    quantities (list, optional): Keys of `QUANTITIES`; all by default.
+    M_i (float or ndarray, optional): Exit Mach override per engine.
+    **inputs: `EngineModel` inputs (SI units), scalars or arrays over the engines.
+        Cstar, OF and dkr default to the values derived from each report, as on the page.
+
+    Returns:
+    Comparison: Value, difference and percent-difference arrays.
+    """
+    rpa = rpa_arrays(reports)
+    n = len(reports)
+    names = [str(i + 1) for i in range(n)] if names is None else list(names)
+    quantities = list(QUANTITIES) if quantities is None else list(quantities)
+
+    values = {**rpa_inputs(rpa), **inputs}
+    values = {key: np.broadcast_to(np.asarray(value, dtype=float), (n,)) for key, value in values.items()}
+    result = EngineModel(**values).evaluate(M_i)
+    result = SimpleNamespace(**result.__dict__, OF=values['OF'])  # OF is an input, not a result
+
+    rpa_values = np.column_stack([QUANTITIES[key][2](rpa) for key in quantities]).reshape(n, -1)
+    analytical = np.column_stack([np.broadcast_to(QUANTITIES[key][3](result), (n,))
+                                  for key in quantities]).reshape(n, -1)
+    difference = rpa_values - analytical
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percent = difference / analytical * 100
+    return Comparison(names, quantities, rpa_values, analytical, difference, percent)
+
+
+if __name__ == "__main__":
+    import time
+
+    from rpa_parser import synthetic_reports
+
+    inputs = dict(P=180e5, Pa=101325.0, F=22e3, epsilon_i=7.0, d_dkdr=3.0, Lstar=1.0,
+                  R=433.5, kappa=1.1716)
+    reports = synthetic_reports(1000, seed=0)
+    parsed = [parse_rpa_output(text) for text in reports]
+    comparison = compare(parsed[:1], names=['hydra2'], **inputs)
+    print(comparison.to_frame().to_string(index=False))
+
+    t0 = time.perf_counter()
+    frame = compare(parsed, **inputs).to_frame()
+    print(f"{len(parsed)} engines, {len(frame)} rows in {time.perf_counter() - t0:.3f} s")
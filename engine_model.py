@@ -0,0 +1,211 @@
+# engine_model.py
+# headless analytical model of the thrust chamber, steps 1-13 of the derivation in main.py
+# (no streamlit import, inputs may be floats or numpy arrays for design sweeps)
+from dataclasses import dataclass, asdict, fields
+
+import numpy as np
+
+from mach_solver import area_ratio, solve_exit_mach
+
+PI = 3.14159  # same value as in the derivation shown on the page
+g0 = 9.80665
+
+
+#===================== formulas =====================#
+# argument names match the symbols in main.py so the chain can be wired by name
+
+def throat_area(dkr):
+    return dkr**2 * PI / 4
+
+def mass_flow(P, Akr, Cstar):
+    return P * Akr / Cstar
+
+def fuel_flow(m_dot, OF):
+    return m_dot / (1 + OF)
+
+def oxidizer_flow(m_dot, mg):
+    return m_dot - mg
+
+def chamber_volume(Lstar, Akr):
+    return Lstar * Akr
+
+def chamber_diameter(dkr, d_dkdr):
+    return dkr * d_dkdr
+
+def chamber_length(Vkom, dk):
+    return Vkom / (dk**2 * PI / 4)
+
+def exit_area(epsilon_i, Akr):
+    return epsilon_i * Akr
+
+def exit_diameter(Ai):
+    return (Ai * 4 / PI)**0.5
+
+def exit_mach(kappa, epsilon_i):
+    return solve_exit_mach(kappa, epsilon_i)
+
+def exit_pressure(P, kappa, M_i):
+    return P / ((1 + (kappa - 1) / 2 * M_i**2)**(kappa / (kappa - 1)))
+
+def optimal_exit_mach(P, Pa, kappa):
+    return (((P/Pa)**((kappa - 1)/kappa) - 1) * (2/(kappa - 1)))**0.5
+
+def optimal_expansion_ratio(kappa, Mi_opt):
+    return area_ratio(Mi_opt, kappa)
+
+def optimal_exit_area(e_i_opt, Akr):
+    return e_i_opt * Akr
+
+def optimal_exit_diameter(Aiopt):
+    return (Aiopt * 4 / PI)**0.5
+
+def temperature_function(kappa):
+    return (kappa**0.5) * ((2 / (kappa + 1))**((kappa + 1)/(2 * (kappa - 1))))
+
+def chamber_temperature(Cstar, Gamma_kappa, R):
+    return (Cstar * Gamma_kappa)**2 / R
+
+def exhaust_velocity(kappa, R, T, P, p_i):
+    return (2*kappa/(kappa-1) * R * T * (1 - 1/((P/p_i)**((kappa-1)/kappa))))**0.5
+
+def optimal_exhaust_velocity(kappa, R, T, P, Pa):
+    return (2*kappa/(kappa-1) * R * T * (1 - 1/((P/Pa)**((kappa-1)/kappa))))**0.5
+
+def optimal_thrust(mox, mg, Vi_opt):
+    return (mox + mg) * Vi_opt
+
+def thrust_coefficient(F, P, Akr):
+    return F / (P * Akr)
+
+def specific_impulse(F, mox, mg):
+    return F / (mox + mg)
+
+
+#===================== model =====================#
+
+@dataclass
+class EngineResult:
+    """Result record of one (or an array of) analytical evaluations, SI units."""
+    dkr: np.ndarray
+    Akr: np.ndarray
+    m_dot: np.ndarray
+    mg: np.ndarray
+    mox: np.ndarray
+    Vkom: np.ndarray
+    dk: np.ndarray
+    lk: np.ndarray
+    Ai: np.ndarray
+    di: np.ndarray
+    M_i: np.ndarray
+    p_i: np.ndarray
+    Mi_opt: np.ndarray
+    e_i_opt: np.ndarray
+    Aiopt: np.ndarray
+    diopt: np.ndarray
+    Gamma_kappa: np.ndarray
+    T: np.ndarray
+    Vi: np.ndarray
+    Vi_opt: np.ndarray
+    F: np.ndarray
+    Fopt: np.ndarray
+    Cf: np.ndarray
+    Isp: np.ndarray
+    Isp_sec: np.ndarray
+    Isp_opt: np.ndarray
+    Isp_opt_sec: np.ndarray
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass
+class EngineModel:
+    """
+    Analytical engine model with the sidebar inputs of main.py.
+
+    All values are SI (P and Pa in Pa, F in N, lengths in m). Any input may be a
+    numpy array; arrays are broadcast against each other so a single
+    `evaluate()` call covers a whole design sweep.
+
+    Args:
+    P (float or ndarray): Chamber pressure [Pa].
+    Pa (float or ndarray): Ambient pressure [Pa].
+    F (float or ndarray): Thrust [N].
+    epsilon_i (float or ndarray): Nozzle expansion ratio.
+    d_dkdr (float or ndarray): Chamber / throat diameter ratio.
+    Lstar (float or ndarray): Characteristic length [m].
+    Cstar (float or ndarray): Characteristic velocity [m/s].
+    R (float or ndarray): Gas constant [J/kg K].
+    kappa (float or ndarray): Ratio of specific heats.
+    OF (float or ndarray): Oxidizer/fuel mixture ratio.
+    dkr (float or ndarray): Throat diameter [m], taken from RPA in main.py.
+    """
+    P: float
+    Pa: float
+    F: float
+    epsilon_i: float
+    d_dkdr: float
+    Lstar: float
+    Cstar: float
+    R: float
+    kappa: float
+    OF: float
+    dkr: float
+
+    def inputs(self):
+        """Input values broadcast to a common shape, as a dict."""
+        names = [f.name for f in fields(self)]
+        values = np.broadcast_arrays(*(np.asarray(getattr(self, n), dtype=float) for n in names))
+        return dict(zip(names, values))
+
+    def evaluate(self, M_i=None):
+        """
+        Run the full analytical chain.
+
+        Args:
+        M_i (float or ndarray, optional): Exit Mach override (the manual input in main.py);
+            solved from (kappa, epsilon_i) when omitted.
+
+        Returns:
+        EngineResult: All derived quantities; floats for scalar inputs, arrays otherwise.
+        """
+        x = self.inputs()
+        P, Pa, F, kappa, R, Cstar = x['P'], x['Pa'], x['F'], x['kappa'], x['R'], x['Cstar']
+        dkr = x['dkr']
+
+        Akr = throat_area(dkr)
+        m_dot = mass_flow(P, Akr, Cstar)
+        mg = fuel_flow(m_dot, x['OF'])
+        mox = oxidizer_flow(m_dot, mg)
+        Vkom = chamber_volume(x['Lstar'], Akr)
+        dk = chamber_diameter(dkr, x['d_dkdr'])
+        lk = chamber_length(Vkom, dk)
+        Ai = exit_area(x['epsilon_i'], Akr)
+        di = exit_diameter(Ai)
+        if M_i is None:
+            M_i = exit_mach(kappa, x['epsilon_i'])
+        M_i = np.broadcast_to(np.asarray(M_i, dtype=float), P.shape)
+        p_i = exit_pressure(P, kappa, M_i)
+        Mi_opt = optimal_exit_mach(P, Pa, kappa)
+        e_i_opt = optimal_expansion_ratio(kappa, Mi_opt)
+        Aiopt = optimal_exit_area(e_i_opt, Akr)
+        diopt = optimal_exit_diameter(Aiopt)
+        Gamma_kappa = temperature_function(kappa)
+        T = chamber_temperature(Cstar, Gamma_kappa, R)
+        Vi = exhaust_velocity(kappa, R, T, P, p_i)
+        Vi_opt = optimal_exhaust_velocity(kappa, R, T, P, Pa)
+        Fopt = optimal_thrust(mox, mg, Vi_opt)
+        Cf = thrust_coefficient(F, P, Akr)
+        Isp = specific_impulse(F, mox, mg)
+        Isp_opt = specific_impulse(Fopt, mox, mg)
+
+        values = dict(
+            dkr=dkr, Akr=Akr, m_dot=m_dot, mg=mg, mox=mox, Vkom=Vkom, dk=dk, lk=lk,
+            Ai=Ai, di=di, M_i=M_i, p_i=p_i, Mi_opt=Mi_opt, e_i_opt=e_i_opt,
+            Aiopt=Aiopt, diopt=diopt, Gamma_kappa=Gamma_kappa, T=T, Vi=Vi, Vi_opt=Vi_opt,
+            F=F, Fopt=Fopt, Cf=Cf, Isp=Isp, Isp_sec=Isp / g0,
+            Isp_opt=Isp_opt, Isp_opt_sec=Isp_opt / g0,
+        )
+        if P.ndim == 0:
+            values = {k: float(v) for k, v in values.items()}
+        return EngineResult(**values)
@@ -0,0 +1,170 @@
+# flow_field.py
+# quasi-1D isentropic flow along the nozzle axis for an area distribution A(x),
+# vectorized over stations and engines (same kappa / R / T model as main.py)
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+import engine_model as em
+from mach_solver import refine_exit_mach, solve_exit_mach
+
+_TABLE_POINTS = 4096
+_TABLE_EPS_MAX = 1000.0
+_MAX_TABLES = 64  # more distinct kappas than this are solved directly
+
+
+@lru_cache(maxsize=_MAX_TABLES)
+def _mach_table(kappa):
+    # ln M of both branches on a grid of u = sqrt(ln epsilon); M - 1 ~ u near the throat,
+    # so the table is smooth there where a grid in epsilon would not be
+    u = np.linspace(0.0, np.sqrt(np.log(_TABLE_EPS_MAX)), _TABLE_POINTS)
+    M_sup, M_sub = solve_exit_mach(kappa, np.exp(u**2), subsonic=True)
+    return u, np.log(M_sup), np.log(M_sub)
+
+
+def mach_from_area_ratio(kappa, epsilon, supersonic, polish=1):
+    """
+    Mach number from the area ratio, by cached table lookup per kappa plus Newton polish.
+
+    Args:
+    kappa (float or ndarray): Ratio of specific heats.
+    epsilon (float or ndarray): Local area ratio A/A_kr (>= 1), broadcast against kappa.
+    supersonic (bool or ndarray): Branch per point.
+    polish (int): Newton steps after the table lookup (one gives ~1e-13 relative error).
+
+    Returns:
+    ndarray: Mach number, NaN where epsilon < 1.
+    """
+    kappa, epsilon, supersonic = np.broadcast_arrays(
+        np.asarray(kappa, dtype=float), np.asarray(epsilon, dtype=float), np.asarray(supersonic))
+    valid = epsilon >= 1
+    eps = np.where(valid, epsilon, 1.0)
+    if kappa.size and kappa.min() == kappa.max():  # common case, skips sorting
+        values, inverse = kappa.ravel()[:1], np.zeros(kappa.shape, dtype=int)
+    else:
+        values, inverse = np.unique(kappa, return_inverse=True)
+        inverse = inverse.reshape(kappa.shape)
+
+    if len(values) > _MAX_TABLES:
+        M_sup, M_sub = solve_exit_mach(kappa, eps, subsonic=True)
+        M = np.where(supersonic, M_sup, M_sub)
+    else:
+        log_M = np.empty(eps.shape)
+        u = np.sqrt(np.log(eps))
+        for i, k in enumerate(values):
+            grid, log_sup, log_sub = _mach_table(float(k))
+            for branch, table in ((True, log_sup), (False, log_sub)):
+                mask = (inverse == i) & (supersonic == branch)
+                log_M[mask] = np.interp(u[mask], grid, table)
+        M = refine_exit_mach(kappa, eps, np.exp(log_M), 0.0, polish)
+        beyond = eps > _TABLE_EPS_MAX
+        if beyond.any():
+            M[beyond] = np.where(supersonic[beyond],
+                                 *solve_exit_mach(kappa[beyond], eps[beyond], subsonic=True))
+    return np.where(valid, M, np.nan)
+
+
+@dataclass
+class FlowField:
+    """Station values, arrays of shape (stations,) or (engines, stations); SI units."""
+    epsilon: np.ndarray  # A / A_kr
+    M: np.ndarray
+    p: np.ndarray        # static pressure [Pa]
+    T: np.ndarray        # static temperature [K]
+    rho: np.ndarray      # density [kg/m^3]
+    V: np.ndarray        # velocity [m/s]
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+def flow_field(A, P, T, R, kappa, throat=None):
+    """
+    Isentropic flow at every station of an area distribution.
+
+    Stations upstream of the throat are subsonic, the throat and downstream supersonic.
+
+    Args:
+    A (ndarray): Cross-section areas, (stations,) or (engines, stations); any unit.
+    P (float or ndarray): Chamber pressure [Pa], scalar or per engine.
+    T (float or ndarray): Chamber temperature [K] (`engine_model.chamber_temperature`).
+    R (float or ndarray): Gas constant [J/kg K].
+    kappa (float or ndarray): Ratio of specific heats.
+    throat (int or ndarray, optional): Throat station index per engine; the smallest area by default.
+
+    Returns:
+    FlowField: Mach, p, T, rho and V at each station.
+    """
+    A = np.asarray(A, dtype=float)
+    single = A.ndim == 1
+    A = np.atleast_2d(A)
+    P, T, R, kappa = (np.asarray(v, dtype=float).reshape(-1, 1) for v in (P, T, R, kappa))
+
+    if throat is None:
+        throat = np.argmin(A, axis=1)
+    throat = np.broadcast_to(np.asarray(throat), (A.shape[0],))
+    epsilon = A / np.take_along_axis(A, throat[:, None], 1)
+    supersonic = np.arange(A.shape[1]) >= throat[:, None]
+
+    kappa_full = np.broadcast_to(kappa, A.shape)
+    M = mach_from_area_ratio(kappa_full, epsilon, supersonic)
+    ratio = 1 + (kappa - 1) / 2 * M**2
+    T_static = T / ratio
+    p = P * ratio**(-kappa / (kappa - 1))
+    rho = p / (R * T_static)
+    V = M * np.sqrt(kappa * R * T_static)
+
+    field = FlowField(epsilon, M, p, np.broadcast_to(T_static, A.shape).copy(), rho, V)
+    if single:
+        field = FlowField(*(value[0] for value in field.__dict__.values()))
+    return field
+
+
+def flow_field_from_contour(r, P, Cstar, R, kappa):
+    """
+    Flow along a wall contour (`nozzle_contour.contour`), gas model as in main.py.
+
+    Args:
+    r (ndarray): Wall radius per station, (stations,) or (engines, stations).
+    P, Cstar, R, kappa (float or ndarray): Chamber pressure [Pa], characteristic
+        velocity [m/s], gas constant [J/kg K] and ratio of specific heats.
+
+    Returns:
+    FlowField: See `flow_field`.
+    """
+    kappa = np.asarray(kappa, dtype=float)
+    T = em.chamber_temperature(Cstar, em.temperature_function(kappa), R)
+    return flow_field(em.PI * np.asarray(r, dtype=float)**2, P, T, R, kappa)
+
+
+if __name__ == "__main__":
+    import time
+
+    from nozzle_contour import contour
+
+    hydra = dict(dc=80.32, dt=31.04, de=82.12, lc=177.26, lcyl=106.81, le=98.33,
+                 b=30.0, r1=23.28, r2=80.33, rn=5.93, tn=22.42, te=8.0)
+    gas = dict(P=180e5, Cstar=1892.5, R=433.5, kappa=1.1716)
+    x, r = contour(**hydra, points=1000)
+    field = flow_field_from_contour(r, **gas)
+    M_i = em.exit_mach(gas['kappa'], field.epsilon[-1])
+    print(f"exit: epsilon = {field.epsilon[-1]:.3f}, M = {field.M[-1]:.6f} (solve_exit_mach {M_i:.6f}), "
+          f"p = {field.p[-1] / 1e5:.3f} bar, V = {field.V[-1]:.1f} m/s")
+    print(f"chamber: M = {field.M[0]:.4f}, throat: M = {field.M[np.argmin(r)]:.4f}")
+
+    n = 10_000
+    rng = np.random.default_rng(0)
+    x, r = contour(**{k: v * rng.uniform(0.95, 1.05, n) for k, v in hydra.items()}, points=1000)
+    _mach_table.cache_clear()
+    for label in ('cold table', 'cached table'):
+        t0 = time.perf_counter()
+        field = flow_field_from_contour(r, **gas)
+        print(f"{label}: {n} engines x 1000 stations in {time.perf_counter() - t0:.2f} s")
+    t0 = time.perf_counter()
+    eps = field.epsilon
+    M_direct = solve_exit_mach(gas['kappa'], eps)
+    elapsed = time.perf_counter() - t0
+    downstream = np.arange(eps.shape[1]) >= np.argmin(r, axis=1)[:, None]
+    print(f"direct Newton (supersonic only): {elapsed:.2f} s, "
+          f"max |dM| = {np.nanmax(np.abs(M_direct - field.M)[downstream]):.1e}")
@@ -0,0 +1,184 @@
+# inverse_design.py
+# engine sizing from a thrust target: F -> Cf -> Akr -> m_dot -> geometry, the reverse of
+# the chain in main.py (which takes the throat diameter from RPA); vectorized over designs
+from dataclasses import dataclass, asdict
+
+import numpy as np
+
+import engine_model as em
+from mach_solver import refine_exit_mach
+
+
+def thrust_coefficient(P, Pa, kappa, epsilon_i, M_i=None):
+    """
+    Ideal thrust coefficient of the gas model of main.py.
+
+    F = m_dot * Vi + Ai * (p_i - Pa) with m_dot = P * Akr / Cstar and T = (Cstar * Gamma)^2 / R
+    gives Cf = F / (P * Akr) independent of Cstar and R.
+
+    Args:
+    P (float or ndarray): Chamber pressure [Pa].
+    Pa (float or ndarray): Ambient pressure [Pa].
+    kappa (float or ndarray): Ratio of specific heats.
+    epsilon_i (float or ndarray): Nozzle expansion ratio.
+    M_i (float or ndarray, optional): Exit Mach number of epsilon_i, solved if omitted.
+
+    Returns:
+    tuple: (Cf, M_i, p_i) arrays.
+    """
+    P, Pa, kappa, epsilon_i = (np.asarray(v, dtype=float) for v in (P, Pa, kappa, epsilon_i))
+    if M_i is None:
+        M_i = em.exit_mach(kappa, epsilon_i)
+    p_i = em.exit_pressure(P, kappa, M_i)
+    momentum = em.temperature_function(kappa) * np.sqrt(
+        2 * kappa / (kappa - 1) * (1 - (p_i / P)**((kappa - 1) / kappa)))
+    return momentum + epsilon_i * (p_i - Pa) / P, M_i, p_i
+
+
+@dataclass
+class Design:
+    """Sized engine(s), SI units; arrays for array inputs."""
+    Cf: np.ndarray
+    epsilon_i: np.ndarray
+    M_i: np.ndarray
+    p_i: np.ndarray
+    Akr: np.ndarray
+    dkr: np.ndarray
+    m_dot: np.ndarray
+    mg: np.ndarray
+    mox: np.ndarray
+    Vkom: np.ndarray
+    dk: np.ndarray
+    lk: np.ndarray
+    Ai: np.ndarray
+    di: np.ndarray
+    T: np.ndarray
+    Vi: np.ndarray
+    Isp: np.ndarray
+    converged: np.ndarray  # False where the exit-diameter iteration stopped at max_iter (the
+                           # design of the last iterate), or `de` is smaller than the throat
+                           # the thrust needs (those designs are NaN)
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def size_engine(F, P, Pa, kappa, R, Cstar, OF=0.848, d_dkdr=3.0, Lstar=1.0,
+                epsilon_i=None, de=None, tol=1e-12, max_iter=100):
+    """
+    Size the thrust chamber for a target thrust.
+
+    The expansion ratio is given (`epsilon_i`), optimal for Pa (p_i = Pa) when neither
+    `epsilon_i` nor `de` is given, or follows from a fixed exit diameter `de`. The first
+    two are closed form; with `de` the ratio depends on the throat being sized, so
+    epsilon = Ae / Akr(Cf(epsilon)) is iterated (|d ln Akr / d ln epsilon| << 1, a few steps).
+
+    Example:
+    design = size_engine(F=22e3, P=180e5, Pa=101325.0, kappa=1.1716, R=433.5,
+                         Cstar=1892.5, epsilon_i=7.0)
+    design.dkr  # ~0.0305 m (RPA: 0.03104 m)
+
+    Args:
+    F (float or ndarray): Target thrust at Pa [N].
+    P (float or ndarray): Chamber pressure [Pa].
+    Pa (float or ndarray): Ambient pressure [Pa].
+    kappa (float or ndarray): Ratio of specific heats.
+    R (float or ndarray): Gas constant [J/kg K].
+    Cstar (float or ndarray): Characteristic velocity [m/s].
+    OF (float or ndarray): Oxidizer/fuel mixture ratio.
+    d_dkdr (float or ndarray): Chamber / throat diameter ratio.
+    Lstar (float or ndarray): Characteristic length [m].
+    epsilon_i (float or ndarray, optional): Expansion ratio.
+    de (float or ndarray, optional): Exit diameter [m], instead of epsilon_i; designs whose exit
+        would be smaller than the throat are NaN with `converged` False.
+    tol (float): Relative tolerance on epsilon for the `de` iteration.
+    max_iter (int): Maximum iterations for `de`; designs still outside `tol` then keep the
+        last iterate, with `converged` False.
+
+    Returns:
+    Design: Throat, mass flows, chamber and nozzle geometry per design.
+    """
+    if epsilon_i is not None and de is not None:
+        raise ValueError("give epsilon_i or de, not both")
+    mode = 'de' if de is not None else 'epsilon_i' if epsilon_i is not None else 'optimal'
+    # NaN stands in for the one not given, so the expansion input broadcasts with the rest
+    F, P, Pa, kappa, R, Cstar, OF, d_dkdr, Lstar, epsilon_i, de = np.broadcast_arrays(
+        *(np.asarray(np.nan if v is None else v, dtype=float)
+          for v in (F, P, Pa, kappa, R, Cstar, OF, d_dkdr, Lstar, epsilon_i, de)))
+    converged = np.ones(F.shape, dtype=bool)
+
+    if mode == 'de':
+        Ae = em.throat_area(de)
+        epsilon = np.full(F.shape, 10.0)
+        M = em.exit_mach(kappa, epsilon)
+        converged = np.zeros(F.shape, dtype=bool)
+        active = np.flatnonzero(~converged)
+        for _ in range(max_iter):
+            k = kappa.flat[active]
+            Cf = thrust_coefficient(P.flat[active], Pa.flat[active], k, epsilon.flat[active], M.flat[active])[0]
+            updated = Ae.flat[active] * P.flat[active] * Cf / F.flat[active]
+            # an exit smaller than the throat the thrust needs has no design (epsilon < 1)
+            infeasible = updated < 1
+            updated = np.maximum(updated, 1.0)
+            done = (np.abs(updated / epsilon.flat[active] - 1) <= tol) | infeasible
+            epsilon.flat[active] = updated
+            # warm-started Newton, the Mach number moves little between iterations
+            M.flat[active] = refine_exit_mach(k, updated, M.flat[active], 1e-14, 3)
+            converged.flat[active[done & ~infeasible]] = True
+            epsilon.flat[active[infeasible]] = np.nan
+            active = active[~done]
+            if not active.size:
+                break
+        epsilon_i = epsilon
+    elif mode == 'optimal':
+        epsilon_i = em.optimal_expansion_ratio(kappa, em.optimal_exit_mach(P, Pa, kappa))
+
+    Cf, M_i, p_i = thrust_coefficient(P, Pa, kappa, epsilon_i)
+    Akr = F / (Cf * P)
+    dkr = (Akr * 4 / em.PI)**0.5
+    m_dot = em.mass_flow(P, Akr, Cstar)
+    mg = em.fuel_flow(m_dot, OF)
+    mox = em.oxidizer_flow(m_dot, mg)
+    Vkom = em.chamber_volume(Lstar, Akr)
+    dk = em.chamber_diameter(dkr, d_dkdr)
+    lk = em.chamber_length(Vkom, dk)
+    Ai = em.exit_area(epsilon_i, Akr)
+    di = em.exit_diameter(Ai)
+    T = em.chamber_temperature(Cstar, em.temperature_function(kappa), R)
+    Vi = em.exhaust_velocity(kappa, R, T, P, p_i)
+    design = Design(Cf, epsilon_i, M_i, p_i, Akr, dkr, m_dot, mg, mox, Vkom, dk, lk,
+                    Ai, di, T, Vi, F / m_dot, converged)
+    if F.ndim == 0:
+        design = Design(*(value[()] for value in design.__dict__.values()))
+    return design
+
+
+if __name__ == "__main__":
+    import time
+
+    gas = dict(Pa=101325.0, kappa=1.1716, R=433.5, Cstar=1892.5)
+    design = size_engine(F=22e3, P=180e5, epsilon_i=7.0, **gas)
+    print(f"F = 22 kN, P = 180 bar, epsilon = 7: Cf = {design.Cf:.4f}, dkr = {design.dkr * 1000:.2f} mm "
+          f"(RPA 31.04 mm), m_dot = {design.m_dot:.3f} kg/s, dk = {design.dk * 1000:.2f} mm, "
+          f"lk = {design.lk * 1000:.1f} mm, di = {design.di * 1000:.2f} mm")
+
+    # round trip through the forward model: the sized throat delivers the target thrust
+    result = em.EngineModel(P=180e5, F=22e3, epsilon_i=7.0, d_dkdr=3.0, Lstar=1.0, OF=0.848,
+                            dkr=design.dkr, **gas).evaluate()
+    print(f"forward check: m_dot * Vi + Ai * (p_i - Pa) = "
+          f"{(result.m_dot * result.Vi + result.Ai * (result.p_i - gas['Pa'])) / 1e3:.6f} kN")
+
+    optimal = size_engine(F=22e3, P=180e5, **gas)
+    fixed_exit = size_engine(F=22e3, P=180e5, de=design.di, **gas)
+    print(f"optimal expansion: epsilon = {optimal.epsilon_i:.3f}, dkr = {optimal.dkr * 1000:.2f} mm; "
+          f"exit diameter {design.di * 1000:.2f} mm: epsilon = {fixed_exit.epsilon_i:.6f}")
+
+    n = 10**6
+    rng = np.random.default_rng(0)
+    F, P = rng.uniform(5e3, 100e3, n), rng.uniform(50e5, 250e5, n)
+    for label, kwargs in (('epsilon_i', dict(epsilon_i=rng.uniform(4, 40, n))),
+                          ('optimal', {}), ('de', dict(de=rng.uniform(0.05, 0.2, n)))):
+        t0 = time.perf_counter()
+        designs = size_engine(F=F, P=P, **kwargs, **gas)
+        print(f"{label:9s}: {n} designs in {time.perf_counter() - t0:.2f} s, "
+              f"{designs.converged.mean():.1%} converged")
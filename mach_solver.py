@@ -0,0 +1,147 @@
+# mach_solver.py
+# vectorized exit Mach number from the area ratio (kappa, epsilon) relation
+import time
+
+import numpy as np
+
+
+def area_ratio(M, kappa):
+    """
+    Area ratio A/A_kr for a given Mach number, same form as `equation()` in main.py.
+
+    Args:
+    M (float or ndarray): Mach number.
+    kappa (float or ndarray): Ratio of specific heats.
+
+    Returns:
+    ndarray: epsilon = A/A_kr.
+    """
+    M = np.asarray(M, dtype=float)
+    kappa = np.asarray(kappa, dtype=float)
+    exponent = (kappa + 1) / (2 * (kappa - 1))
+    numerator = (1 + (kappa - 1) / 2 * M**2)**exponent
+    denominator = M * ((kappa + 1) / 2)**exponent
+    return numerator / denominator
+
+
+def refine_exit_mach(kappa, epsilon, M, tol=1e-12, max_iter=50):
+    """
+    Solve the area-Mach relation by Newton iterations from a given Mach number (warm start),
+    e.g. from a tabulated guess or from the solution at a nearby epsilon; stays on the branch
+    of `M` (supersonic or subsonic).
+
+    Newton runs on g(ln M) = ln(epsilon(M)) - ln(epsilon), which is convex in ln M on both
+    branches, so starting where g >= 0 the iterates approach the root monotonically.
+
+    Example:
+    M = refine_exit_mach(kappa, epsilon_new, M_previous, max_iter=3)
+
+    Args:
+    kappa (float or ndarray): Ratio of specific heats.
+    epsilon (float or ndarray): Area ratio A/A_kr; 1 gives M = 1, below 1 NaN.
+    M (float or ndarray): Starting Mach number (not 1).
+    tol (float): Convergence tolerance on the ln M step, per point; 0 iterates until the step vanishes.
+    max_iter (int): Maximum number of iterations.
+
+    Returns:
+    ndarray: Mach number, shape of the broadcast inputs.
+    """
+    kappa, epsilon, M = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (kappa, epsilon, M)))
+    log_M = np.array(np.log(M))  # a new array, also for scalars
+    # M = 1 is a double root at epsilon = 1, where Newton only converges linearly
+    log_M[epsilon == 1] = 0.0
+    log_M[epsilon < 1] = np.nan
+    # iterate on the unconverged points only, as in inverse_design.size_engine
+    active = np.flatnonzero(epsilon > 1)
+    kappa, log_eps = kappa.ravel()[active], np.log(epsilon.ravel()[active])
+    half_km1 = (kappa - 1) / 2
+    exponent = (kappa + 1) / (2 * (kappa - 1))
+    log_offset = exponent * np.log((kappa + 1) / 2) + log_eps
+    flat = log_M.ravel()  # view
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        x = flat[active]
+        M2 = np.exp(2 * x)
+        base = 1 + half_km1 * M2
+        g = exponent * np.log(base) - x - log_offset
+        dg = (M2 - 1) / base
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = np.where(dg != 0, g / dg, 0.0)
+        flat[active] = x - step
+        keep = np.abs(step) > tol  # NaN steps drop out too
+        active, half_km1, exponent, log_offset = (
+            active[keep], half_km1[keep], exponent[keep], log_offset[keep])
+    return np.exp(log_M)
+
+
+def solve_exit_mach(kappa, epsilon, subsonic=False, tol=1e-12, max_iter=50):
+    """
+    Solve the area-Mach relation for many (kappa, epsilon) pairs at once.
+
+    Replaces the per-point `fsolve(equation, Mi_guess, args=(kappa, epsilon_i))`
+    call in main.py; the initial guess is computed from the asymptotic forms of
+    the relation, so no `Mi_guess` is needed.
+
+    Args:
+    kappa (float or ndarray): Ratio of specific heats, broadcast against epsilon.
+    epsilon (float or ndarray): Area ratio A/A_kr (>= 1).
+    subsonic (bool): Also return the subsonic solution.
+    tol (float): Tolerance on ln(M), i.e. relative tolerance on M.
+    max_iter (int): Maximum number of iterations.
+
+    Returns:
+    ndarray or tuple: Supersonic Mach array, or (supersonic, subsonic) if `subsonic` is set.
+    Points with epsilon < 1 are NaN.
+    """
+    kappa, epsilon = np.broadcast_arrays(np.asarray(kappa, dtype=float),
+                                         np.asarray(epsilon, dtype=float))
+    valid = epsilon >= 1
+    eps = np.where(valid, epsilon, 1.0)
+    exponent = (kappa + 1) / (2 * (kappa - 1))
+
+    # supersonic: asymptotic form underestimates epsilon, so its root is an upper bound
+    M_hi = (eps * ((kappa + 1) / (kappa - 1))**exponent)**((kappa - 1) / 2)
+    M_hi = np.maximum(M_hi, 1.0 + 1e-9)
+    M_sup = refine_exit_mach(kappa, eps, M_hi, tol, max_iter)
+    M_sup = np.where(valid, M_sup, np.nan)
+    if not subsonic:
+        return M_sup
+
+    # subsonic: low-Mach form epsilon ~ (2 / (kappa + 1))^exponent / M is a lower bound
+    M_guess = np.clip((2 / (kappa + 1))**exponent / eps, 1e-12, 1 - 1e-9)
+    M_sub = refine_exit_mach(kappa, eps, M_guess, tol, max_iter)
+    M_sub = np.where(valid, M_sub, np.nan)
+    return M_sup, M_sub
+
+
+# benchmark against the fsolve path in main.py
+if __name__ == "__main__":
+    from scipy.optimize import fsolve
+
+    def equation(Mi, kappa, epsilon_i):
+        epsilon_i_opt_numerator = (1 + (kappa - 1) / 2 * Mi**2)**((kappa + 1) / (2 * (kappa - 1)))
+        epsilon_i_opt_denominator = Mi * ((kappa + 1) / 2)**((kappa + 1) / (2 * (kappa - 1)))
+        return epsilon_i_opt_numerator / epsilon_i_opt_denominator - epsilon_i
+
+    kappa_grid, epsilon_grid = np.meshgrid(np.linspace(1.1, 1.4, 1000), np.linspace(2, 100, 1000))
+    kappa_grid, epsilon_grid = kappa_grid.ravel(), epsilon_grid.ravel()
+
+    t0 = time.perf_counter()
+    M_vec = solve_exit_mach(kappa_grid, epsilon_grid)
+    t_vec = time.perf_counter() - t0
+
+    sample = np.random.default_rng(0).choice(kappa_grid.size, 2000, replace=False)
+    t0 = time.perf_counter()
+    reference = [fsolve(equation, 2.8, args=(kappa_grid[i], epsilon_grid[i]), full_output=True)
+                 for i in sample]
+    t_fsolve = (time.perf_counter() - t0) / sample.size * kappa_grid.size
+    # compare only where fsolve itself converged from the fixed guess
+    converged = np.array([ier == 1 for _, _, ier, _ in reference])
+    M_ref = np.array([solution[0] for solution, _, _, _ in reference])
+
+    print(f"vectorized: {t_vec:.3f} s for {kappa_grid.size} points")
+    print(f"fsolve (extrapolated): {t_fsolve:.1f} s")
+    print(f"speedup: {t_fsolve / t_vec:.0f}x")
+    print(f"max |dM| vs fsolve ({converged.sum()}/{sample.size} converged): "
+          f"{np.max(np.abs(M_vec[sample][converged] - M_ref[converged])):.2e}")
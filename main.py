@@ -1,66 +1,37 @@
 import streamlit as st
-from utils import spacer
-from scipy.optimize import fsolve
-import re
+from utils import spacer, display_rpa_tables, display_derivation, display_profiling
+from rpa_cache import artifact_cache, read_bytes, read_tables, read_text
+from compute_graph import engine_graph, ENGINE_NODES, ENGINE_SECTIONS
+from result_cache import result_cache, shared_evaluate
+from rpa_parser import RPA_RESPONSE_DEFAULT, parse_rpa_output
+from engine_comparison import compare
+from monte_carlo import DEFAULT_SPEC, propagate
+from inverse_design import size_engine
+from chamber_sizing import size_chamber
+from rpa_runner import rpa_runner
+from species_store import SPECIES_STATIONS, SpeciesStore
+from profiling import mark, profile_run
+from mach_solver import area_ratio
 import inspect
+import os
+from types import SimpleNamespace
 
-def format_scientific_latex(number, precision=3):
-    """
-    Format a number into scientific notation with LaTeX formatting.
-
-    Args:
-    number (float): The number to format.
-    precision (int): The number of decimal places.
-
-    Returns:
-    str: Formatted string in scientific notation.
-    """
-    # Format to scientific notation with specified precision
-    formatted_number = f"{number:.{precision}e}"
-
-    # Split at 'e' and reconstruct with LaTeX-friendly format
-    number_parts = formatted_number.split('e')
-    return f"{number_parts[0]} \\times 10^{{{number_parts[1]}}}"
-
-
-# regex patterns for extracting values from RPA response
-patterns = {
-    'isp': r"Specific impulse \(vac\):\s+([\d.]+)\s+s",
-    'cf': r"Thrust coefficient:\s+([\d.]+)\s+",
-    'thrust_vac': r"Chamber thrust \(vac\):\s+([\d.]+)\s+kN",
-    'thrust_opt': r"Chamber thrust \(opt\):\s+([\d.]+)\s+kN",
-    'isp_opt': r"Specific impulse \(opt\):\s+([\d.]+)\s+s",
-    'ox_flow_rate': r"Oxidizer mass flow rate:\s+([\d.]+)\s+kg/s",
-    'fuel_flow_rate': r"Fuel mass flow rate:\s+([\d.]+)\s+kg/s",
-    'dc': r"Dc =\s+([\d.]+)\s+mm",
-    'dt': r"Dt =\s+([\d.]+)\s+mm",
-    'de': r"De =\s+([\d.]+)\s+mm",
-    'lc': r"Lc =\s+([\d.]+)\s+mm",
-    'le': r"Le =\s+([\d.]+)\s+mm"
-}
-
-# extract RPA values with regex patterns
-def extract_values(rpa_response):
-    values = {}
-    for key, pattern in patterns.items():
-        match = re.search(pattern, rpa_response)
-        if match:
-            values[key] = float(match.group(1))
-        else:
-            st.error(f"Could not find the value for {key.replace('_', ' ').title()}.")
-            return None
-    return values
+# sidebar defaults; the page for these inputs is pre-solved at server start (warmup.py)
+SIDEBAR_DEFAULTS = dict(Pa_atm=1, P_bar=180, F=22, epsilon_i=7.0, d_dkdr=3.0, Lstar=1.0, R=433.5, kappa=1.1716)
+
+# RPA jobs listed per session (rpa_runner.py), oldest dropped first
+RPA_SESSION_JOBS = 50
+
+
+# extract RPA values from the parsed report (single regex pass, see rpa_parser.py)
+def extract_values(parsed):
+    for key in parsed.missing:
+        st.error(f"Could not find the value for {key.replace('_', ' ').title()}.")
+    return parsed.values()
 
 # validate user-submitted RPA output
 def validate_rpa_output(output):
-    validation_results = {}
-    for key, pattern in patterns.items():
-        match = re.search(pattern, output)
-        if match:
-            validation_results[key] = True
-        else:
-            validation_results[key] = False
-    return validation_results
+    return parse_rpa_output(output).validation()
 
 
 #===========================================================#
@@ -69,8 +40,9 @@ def validate_rpa_output(output):
 
 def main():
 
+    mark('uvod')
     # intro
-    st.image('./assets/Logo_masinski_fakultet.jpg', width=100)
+    st.image(read_bytes('./assets/Logo_masinski_fakultet.jpg'), width=100)
     st.markdown("### Raketni motori")
     st.markdown("# Seminarski rad")
     spacer()
@@ -88,7 +60,7 @@ def main():
     st.markdown('***')
     
     #===================== RPA =====================#
-    # TODO - call RPA scripts/API to load output
+    mark('1.1 ulazni podaci')
 
     # title with tooltip
     tooltip_message = "U budućim verzijama programa, planira se direktna integracija sa API-jem ili skriptom programa RPA."
@@ -106,11 +78,11 @@ Ova Python aplikacija koristi podatka iz programa [RPA Rocket Propulsion Analysi
     if st.button("Screenshot-ovi iz RPA"):
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.image('./assets/engine_definition.png', width=200)
+            st.image(read_bytes('./assets/engine_definition.png'), width=200)
         with col2:
-            st.image('./assets/engine_definition.png', width=200)
+            st.image(read_bytes('./assets/engine_definition.png'), width=200)
         with col3:
-            st.image('./assets/propellant_specification.png', width=200)
+            st.image(read_bytes('./assets/propellant_specification.png'), width=200)
     
     # RADIO options    
     
@@ -118,18 +90,42 @@ Ova Python aplikacija koristi podatka iz programa [RPA Rocket Propulsion Analysi
     selected_propellant = st.selectbox("Gorivo/Oksidator", propellant_options)
         
     if st.button("🖼️ Screenshot izbora goriva/oksidatora"):
-        st.image('./assets/propellant_specification.png')
+        st.image(read_bytes('./assets/propellant_specification.png'))
 
     st.markdown("#### Opcija 1: Iskopirati ")
 
 
     # download .cfg
-    st.download_button('💾 Preuzmi RPA konfiguraciju (.cfg)', './rpa/hail_hydra2.cfg', 'hail_hydra2.cfg', 'text/plain')
+    st.download_button('💾 Preuzmi RPA konfiguraciju (.cfg)', read_text('./rpa/hail_hydra2.cfg'), 'hail_hydra2.cfg', 'text/plain')
+
+    # run engine definitions in the background (rpa_runner.py); RPA_COMMAND selects the
+    # RPA console, the local stand-in (rpa_standin.py) is used otherwise
+    st.markdown("#### Opcija 2: Pokrenuti RPA")
+    with st.expander("RPA poslovi (.cfg)"):
+        bundled = st.multiselect('Konfiguracije iz projekta', ['hail_hydra2.cfg', 'RD-0146.cfg'], default=['hail_hydra2.cfg'])
+        uploaded = st.file_uploader('Dodatne konfiguracije', type='cfg', accept_multiple_files=True)
+        if st.button('▶️ Pokreni', key='rpa_submit'):
+            configs = {name: read_text(f'./rpa/{name}') for name in bundled}
+            configs.update({file.name: file.getvalue().decode('utf-8') for file in uploaded or []})
+            # returns at once, the table below shows progress; the runner is shared by all
+            # sessions, each lists (and loads) only the jobs it submitted itself
+            jobs = st.session_state.get('rpa_jobs', []) + rpa_runner.submit(configs)
+            st.session_state['rpa_jobs'] = jobs[-RPA_SESSION_JOBS:]
+        jobs = st.session_state.get('rpa_jobs')
+        if jobs:
+            st.button('🔄 Osveži', key='rpa_refresh')
+            st.dataframe([job.row() for job in jobs], hide_index=True)
+            done = {f'{job.name} ({job.key[:12]})': job for job in jobs if job.status == 'done'}
+            if done:
+                selected_job = st.selectbox('Izlaz posla', list(done))
+                if st.button('Koristi izlaz posla', key='rpa_use'):
+                    st.session_state['rpa_response'] = done[selected_job].report
 
     st.markdown('***')  
     #==========================================================#
     #===================== 2. OUTPUT DATA =====================#
     #==========================================================#
+    mark('1.2.1 RPA izlaz')
     
     st.header("1.2. Performanse idealnog raketnog motora")
     st.markdown("""
@@ -141,39 +137,9 @@ U ovoj sekciji aplikacije prikazani su izlazni podaci iz programa RPA. Izvlačen
     
     #===================== regex output =====================#
     
-    # RPA output        
-    rpa_response_default = """Thrust and mass flow rates
-------------------------------------------
-   Chamber thrust (vac):   22.53665     kN
- Specific impulse (vac):  320.80146      s
-   Chamber thrust (opt):   20.58303     kN
- Specific impulse (opt):  292.99241      s
-   Total mass flow rate:    7.16362   kg/s
-Oxidizer mass flow rate:    3.28718   kg/s
-    Fuel mass flow rate:    3.87644   kg/s
-
-Geometry of thrust chamber with parabolic nozzle
-------------------------------------------
-    Dc =   80.32  mm       b =   30.00 deg
-    R2 =   80.33  mm      R1 =   23.28  mm
-    L* = 1000.00  mm
-    Lc =  177.26  mm    Lcyl =  106.81  mm
-    Dt =   31.04  mm
-    Rn =    5.93  mm      Tn =   22.42 deg
-    Le =   98.33  mm      Te =    8.00 deg
-    De =   82.12  mm
- Ae/At =    7.00    
- Le/Dt =    3.17    
-Le/c15  =  102.33 % (relative to length of cone nozzle with Te=15 deg)
-
-  Mass =    9.99  kg
-
-  Divergence efficiency:    0.99157       
-        Drag efficiency:    0.96223       
-     Thrust coefficient:    1.66234  (vac)
-"""
+    # RPA output (default in RPA_RESPONSE_DEFAULT)
     if 'rpa_response' not in st.session_state:
-        st.session_state['rpa_response'] = rpa_response_default
+        st.session_state['rpa_response'] = RPA_RESPONSE_DEFAULT
     
     if st.button("📋 Kopiraj RPA izlaz"):
         rpa_output = st.text_area("Paste RPA output here", height=300)
@@ -195,8 +161,16 @@ Le/c15  =  102.33 % (relative to length of cone nozzle with Te=15 deg)
     rpa_response = st.session_state['rpa_response']
     st.code(rpa_response)
 
+    # memoized analytical chain, only nodes whose inputs changed are recomputed; values
+    # another session already computed for the same inputs come from the shared cache
+    if 'engine_graph' not in st.session_state:
+        st.session_state['engine_graph'] = engine_graph()
+    graph = st.session_state['engine_graph']
+    graph.begin_run()
+
     # regex pattern for extracting values from RPA response
-    values = extract_values(rpa_response)
+    parsed = shared_evaluate(graph, {'rpa_response': rpa_response}, targets=['rpa'])['rpa']
+    values = extract_values(parsed)
 
     st.write("Ovaj program izvlaci vrednosti iz RPA izlaza koristeci REGEX pattern za svaku vrednost. Vrednosti se mogu naci u sidebar-u levo i izmeniti po potrebi.")
     st.markdown("##### Podaci izvučeni REGEX-om:")
@@ -259,21 +233,22 @@ Le/c15  =  102.33 % (relative to length of cone nozzle with Te=15 deg)
         st.markdown('***')
     
     #===================== sidebar =====================#
+    mark('sidebar')
     with st.sidebar:
         # Inputs for the variables
         st.title("Zadati ulazni podaci")
         
-        Pa_atm = st.number_input('Atmosferski pritisak `Pa` [atm]', value=1)
+        Pa_atm = st.number_input('Atmosferski pritisak `Pa` [atm]', value=SIDEBAR_DEFAULTS['Pa_atm'])
         Pa = Pa_atm * 101325
         st.text(f'P = {Pa} = {Pa:.1e} Pa')
-        P_bar = st.number_input('Pritisak u komori `P` [bar]', value=180)
+        P_bar = st.number_input('Pritisak u komori `P` [bar]', value=SIDEBAR_DEFAULTS['P_bar'])
         P = P_bar * 100000
         st.text(f'P = {P} Pa = {P:.1e} Pa')  # Display chamber pressure in Pascals with both formats
 
-        F = st.number_input('Sila potiska `F` [kN]', value = 22)
-        epsilon_i = st.number_input('Stepen sirenja mlaznika `epsilon_i`', value=7.0)
-        d_dkdr = st.number_input('Precnik komore / grla mlaznika `d_dkdr`', value=3.0)
-        Lstar = st.number_input('Karakteristicna duzina `Lstar` [m]', value=1.0, step=1.0)
+        F = st.number_input('Sila potiska `F` [kN]', value=SIDEBAR_DEFAULTS['F'])
+        epsilon_i = st.number_input('Stepen sirenja mlaznika `epsilon_i`', value=SIDEBAR_DEFAULTS['epsilon_i'])
+        d_dkdr = st.number_input('Precnik komore / grla mlaznika `d_dkdr`', value=SIDEBAR_DEFAULTS['d_dkdr'])
+        Lstar = st.number_input('Karakteristicna duzina `Lstar` [m]', value=SIDEBAR_DEFAULTS['Lstar'], step=1.0)
         
         st.markdown('***') # ------------
         
@@ -285,34 +260,26 @@ Le/c15  =  102.33 % (relative to length of cone nozzle with Te=15 deg)
         mox = st.number_input('Maseni protok oksidatora `mox` [Kg/s]', value=ox_flow_rate_rpa, step=1.0)
         # propellant.components.ratio.value = 5.9
         Cstar = st.number_input('Karakteristicna brzina `Cstar` [m/s]', value=Cstar_rpa, step=100.0)
-        R = st.number_input('Gasna konstanta `R` [J/Kg·K]', value=433.5, step=1.0, help="hidrazin/tečni kiseonik u komori, 'nozzle inlet' u RPA")
-        kappa = st.number_input('Odnos specificnih toplota pri konstantnom pritisku i zapremini `kappa`', value=1.1716, format='%.4f', step=0.01, help="kappa u komori, 'nozzle inlet' u RPA")
+        R = st.number_input('Gasna konstanta `R` [J/Kg·K]', value=SIDEBAR_DEFAULTS['R'], step=1.0, help="hidrazin/tečni kiseonik u komori, 'nozzle inlet' u RPA")
+        kappa = st.number_input('Odnos specificnih toplota pri konstantnom pritisku i zapremini `kappa`', value=SIDEBAR_DEFAULTS['kappa'], format='%.4f', step=0.01, help="kappa u komori, 'nozzle inlet' u RPA")
     
     #===================== 1.2.2 PERFORMANCE =====================#
+    mark('1.2.2 performanse (HTML)')
     st.subheader("1.2.2. Analiza performansi")
     
     st.markdown("Ovde su prikazane specifikacije goriva korišćenog u raketnom motoru.")
-    html_file_path = './rpa/1_propellant_specification.html'
-    with open(html_file_path, 'r', encoding='utf-8') as file:
-        html_content = file.read()
-    st.markdown(html_content, unsafe_allow_html=True)
+    display_rpa_tables('./rpa/1_propellant_specification.html')
 
     spacer()
 
     if st.button('⚠️ Prikaži ceo HTML', key='full_html', help='⚠️ Pažnja! velika HTML tabela, zauzima mnogo mesta na ekranu'):
-        html_file_path = './rpa/hydra2.html'
-        with open(html_file_path, 'r', encoding='utf-8') as file:
-            html_content = file.read()
-        st.markdown(html_content, unsafe_allow_html=True)
+        display_rpa_tables('./rpa/hydra2.html')
 
     # thermal
     st.markdown("#### a) Termička Analiza")
     st.markdown("Prikaz termičkih svojstava motora, uključujući temperature i toplotne tokove.")
     if st.button('Prikaži RPA Podatke - Termička Analiza', key='thermal'):
-        html_file_path = './rpa/2_thermodynamic_properties.html'
-        with open(html_file_path, 'r', encoding='utf-8') as file:
-            html_content = file.read()
-        st.markdown(html_content, unsafe_allow_html=True)
+        display_rpa_tables('./rpa/2_thermodynamic_properties.html')
 
     spacer()
 
@@ -320,10 +287,12 @@ Le/c15  =  102.33 % (relative to length of cone nozzle with Te=15 deg)
     st.markdown("#### b) Sastavi Sagorevanja")
     st.markdown("Detalji o sastavima proizvoda sagorevanja i njihovim frakcijama.")
     if st.button('Prikaži RPA Podatke - Sastavi Sagorevanja', key='combustion'):
-        html_file_path = './rpa/3_fractions_combustion.html'
-        with open(html_file_path, 'r', encoding='utf-8') as file:
-            html_content = file.read()
-        st.markdown(html_content, unsafe_allow_html=True)
+        display_rpa_tables('./rpa/3_fractions_combustion.html')
+        # Table 2 as arrays (species_store.py): mean molecular weight of the products per station
+        species = SpeciesStore(capacity=1)
+        species.add_table(read_tables('./rpa/3_fractions_combustion.html')[0][1], 'hail_hydra2')
+        st.markdown("**Srednja molarna masa produkata sagorevanja**")
+        st.dataframe({'stanica': SPECIES_STATIONS, 'M [g/mol]': species.mean_molecular_weight()[:, 0]}, hide_index=True)
 
     spacer()
 
@@ -331,20 +300,19 @@ Le/c15  =  102.33 % (relative to length of cone nozzle with Te=15 deg)
     st.markdown("#### c) Performanse")
     st.markdown("Analiza performansi motora, uključujući specifični impuls i koeficijent potiska.")
     if st.button('Prikaži RPA Podatke - Performanse', key='performance'):
-        html_file_path = './rpa/4_performance.html'
-        with open(html_file_path, 'r', encoding='utf-8') as file:
-            html_content = file.read()
-        st.markdown(html_content, unsafe_allow_html=True)
+        display_rpa_tables('./rpa/4_performance.html')
     
     st.markdown('***')
     
     #===================== 1.2.3 GEOMETRY =====================#
+    mark('1.2.3 geometrija')
     st.subheader("1.2.3. Geometrija mlaznika")
-    st.image('./assets/geometry.png')
+    st.image(read_bytes('./assets/geometry.png'))
     
     #======================================================#
     #===================== ANALYTICAL =====================#
     #======================================================#
+    mark('analitika: ulazi')
     st.markdown('***')
     
     st.title('Analitičko rešenje')
@@ -359,117 +327,73 @@ Le/c15  =  102.33 % (relative to length of cone nozzle with Te=15 deg)
 #    Protok mase oksidatora = {ox_flow_rate_rpa} kg/s
 #         Protok mase goriva = {fuel_flow_rate_rpa
 
-    # 1. Akr ==============================
-    st.code('1. Kriticni presek i precnik mlaznika:')
-    dkr = dt_rpa/1000 # throat area in meters
-    dkr_sci = format_scientific_latex(dkr)
-    
-    col1, col2 = st.columns([3,4])
-    with col1:
-        st.markdown(f'$ d_{{kr}} = {dkr:.4f} \\, \\text{{m}} $')
-        st.markdown(f'> $ d_{{kr}} = {dkr_sci} \\, \\text{{m}} $')
-    with col2:
-        st.text('vrednost iz RPA izlaza')
-    
-    spacer('2em')
-    
-    Akr = dkr**2 * 3.14159 / 4
-    st.markdown('$ A_{kr} = d_{kr}^2 \cdot \\frac{\\pi}{4}$')
-    st.markdown(f'$ A_{{kr}} = {dkr:.5f}^2 \cdot \\frac{{\\pi}}{{4}} = {Akr:.5f} \\, m^2 $')
-    Akr_sci = format_scientific_latex(Akr)
-    st.markdown(f'> $ A_{{kr}} = {Akr_sci} \\, m^2 $')
-    
-    # Akr = 0.00070519
+    # throat diameter from RPA, or sized for the sidebar thrust (inverse_design.py)
+    with st.sidebar:
+        size_from_thrust = st.toggle('Prečnik grla iz potiska `F`', help='inverzni proračun: F → Cf → Akr umesto prečnika grla iz RPA')
+    dkr_input = dt_rpa/1000 # throat diameter in meters
+    if size_from_thrust:
+        dkr_input = float(size_engine(F*1000, P, Pa, kappa, R, Cstar, epsilon_i=epsilon_i).dkr)
+        st.info(f'dkr = {dkr_input*1000:.3f} mm iz potiska F = {F} kN (RPA: {dt_rpa} mm)')
+
+    # the page only renders values from the graph (formulas in engine_model.py)
+    inputs = dict(P=P, Pa=Pa, F_kN=F, epsilon_i=epsilon_i, d_dkdr=d_dkdr, Lstar=Lstar,
+                  Cstar=Cstar, R=R, kappa=kappa, OF=OF,
+                  dkr=dkr_input)
+    result = SimpleNamespace(**shared_evaluate(graph, inputs, targets=['lk', 'mox', 'di', 'Mi_solution']))
+
+    # derivation sections are built in the graph (derivation.py) and rendered collapsed
+    # unless toggled, so unchanged LaTeX is neither rebuilt nor re-sent on every rerun
+    with st.sidebar:
+        show_all = st.toggle('Prikaži sva izvođenja', help='sve formule sa zamenjenim vrednostima')
+
+    def derivation(*keys):
+        for key in keys:
+            mark(f'analitika: korak {key}')
+            section = shared_evaluate(graph, {}, targets=[f'derivation_{key}'])[f'derivation_{key}']
+            display_derivation(section, True if show_all else None)
+            spacer()
+
+    dkr = result.dkr
+    Akr = result.Akr
+    derivation('1')
     st.warning(f'**Akr = {Akr:.8f} m^2**')
-    
-    spacer()
 
-    # mass flow rates ==============================
-    # mox = OF * mg
-    st.code('2. Maseni protoci:')
-    
-    P_sci = format_scientific_latex(P)
-    st.markdown(f'$ C_{{star}} = {Cstar:.2f} \\, \\text{{m/s}} $')
-   
-    spacer('1em') 
-    m_dot = P * Akr / Cstar # total mass flow rate
-    st.markdown(f'$\dot{{m}} = \\frac{{P \cdot A_{{kr}}}} {{ C_{{star}} }} $')
-    st.markdown(f'$\dot{{m}} = \\frac{{{P_sci} \cdot \\, {Akr:.5f}}} {{ {Cstar:.2f} }} = {m_dot:.3f} \\, \\text{{kg/s}} $')
-
-    spacer('1em')
-    mg = m_dot / (1 + OF) # fuel mass flow rate
-    mox = m_dot - mg # oxidizer mass flow rate
-    st.markdown(f'$ m_{{g}} = \dot{{m}} \cdot \\frac{{1}}{{OF + 1}} = {m_dot:.3f} \cdot \\frac{{1}}{{{OF:.3f} + 1}} = {mg:.3f} \\, \\text{{kg/s}} $')
-    st.markdown(f'$ m_{{ox}} = \dot{{m}} - m_{{g}} = {m_dot:.3f} - {mg:.3f} = {mox:.3f} \\, \\text{{kg/s}} $')
-    
-    spacer()
-
-    # Vkom ==============================
-    Vkom = Lstar * Akr
-    st.code('3. Zapremina komore:')
-    st.markdown('$V_{kom} = L_{kar} \cdot A_{kr}$')
-    st.markdown(f'$ V_{{kom}} = {Lstar:.3f} \, \cdot \, {Akr_sci} = {Vkom:.5f} \\, m^3 $')
-    Vkom_sci = format_scientific_latex(Vkom)
-    st.markdown(f'> $ V_{{kom}} = {Vkom_sci} \\, m^3 $')
-    
-    spacer()
-
-    # 4. Chamber Diameter and Length ==============================
-    # TODO numbers???
-    dk = dkr * d_dkdr
-    st.code('4. Precnik i duzina komore')
-    st.markdown('$d_{k} = d_{kr} \cdot \\frac{D_k}{d_{kr}}$')
-    st.markdown(f'$ d_{{k}} = {dkr:.3f} \, \cdot \, {d_dkdr:.3f} = {dk:.3f} \\, \\text{{m}} $')
-    
-    # lk - chamber length ==============================
-    lk = Vkom / (dk**2 * 3.14159 / 4)
-    st.markdown('$l_{k} = \\frac{V_{kom}}{\\frac{d_{k}^2 \cdot \\pi}{4}}$')
-    # st.markdown(f'$ l_{{k}} = \\frac{{{Vkom:.3f}}}{{\\frac{{{dk:.3f}}^2 \cdot \\pi}}{{4}}}} = {lk:.3f} \\, \\text{{m}} $')
-    st.markdown(f'$ l_{{k}} = \\frac{{ {Vkom:.5f} }}{{ \\frac{{ {dk:.3f}^2 \cdot \\pi }}{{ 4 }} }} = {lk:.3f} \\, \\text{{m}} $')
-    lk_sci = format_scientific_latex(lk)
-    st.markdown(f'> $ l_{{k}} = {lk_sci} \\, \\text{{m}} $')
-    spacer()
+    derivation('2', '3', '4', '5')
+    dk = result.dk
+    lk = result.lk
+    di = result.di
+
+    # RPA takes the contraction area ratio and counts the converging section in L* * At (chamber_sizing.py)
+    with st.expander("Komora kao u RPA: odnos preseka i konvergentni deo"):
+        by_diameter = size_chamber(dkr, Lstar, d_dkdr=d_dkdr, P=P, epsilon_i=epsilon_i)
+        by_area = size_chamber(dkr, Lstar, contraction=d_dkdr, P=P, epsilon_i=epsilon_i)
+        rows = [('Dc', 'mm', 'dc', 1000, parsed.dc), ('Lcyl', 'mm', 'Lcyl', 1000, parsed.lcyl),
+                ('Lc', 'mm', 'Lc', 1000, parsed.lc), ('R2', 'mm', 'r2', 1000, parsed.r2),
+                ('Vkonv', 'cm³', 'Vconv', 1e6, None), ('masa (tanki zid)', 'kg', 'mass', 1, parsed.mass)]
+        st.dataframe({
+            'Veličina': [row[0] for row in rows],
+            'Jedinica': [row[1] for row in rows],
+            f'Dk/dkr = {d_dkdr:g}': [float(getattr(by_diameter, row[2])) * row[3] for row in rows],
+            f'Ac/At = {d_dkdr:g}': [float(getattr(by_area, row[2])) * row[3] for row in rows],
+            'RPA': [row[4] for row in rows],
+        }, hide_index=True)
+        st.caption(f"analitički (korak 4, samo cilindar): dk = {dk*1000:.2f} mm, lk = {lk*1000:.2f} mm; "
+                   "masa je samo zid pod pritiskom, RPA procenjuje celu konstrukciju")
+
+    # -----------------mach solver---------------------#
+    st.markdown('***')
+    derivation('6')
+    Mi_solution = result.Mi_solution
 
-    # 5. Nozzle Exit Area and Diameter
-    st.code('5. Izlazni presek i precnik mlaznika')
-    Ai = epsilon_i * Akr
-    di = (Ai * 4 / 3.14159)**0.5
-    st.markdown('$A_{i} = \\epsilon_i \cdot A_{kr}$')
-    st.markdown(f'$ A_{{i}} = {epsilon_i:.3f} \\cdot {Akr:.5f} = {Ai:.5f} \\, \\text{{m}}^{{2}} $')
-    st.markdown('$d_{i} = \\sqrt{\\frac{A_{i} \cdot 4}{\\pi}}$')
-    st.markdown(f'$ d_{{i}} = \\sqrt{{\\frac{{{Ai:.3f} \\cdot 4}}{{\\pi}}}} = {di:.3f} \\, \\text{{m}} $')
-    di_sci = format_scientific_latex(di)
-    st.markdown(f'> $ d_{{i}} = {di_sci} \\, \\text{{m}} $')
-    
-    # -----------------fsolve---------------------#
-    # mach
-    st.markdown('***') 
-    st.code('6. Odredjivanje Mahovog broja na izlazu mlaznika')
-
-    st.markdown(f'$\epsilon_{{i}} = {epsilon_i:.2f}$', help='zadati stepen sirenja mlaznika, izmeniti u sidebar-u')
-    st.markdown(r'''
-        $ \epsilon_{i} = \frac{
-        \left(1 + \frac{\kappa - 1}{2} \cdot M_{iter}^2\right)^{\frac{\kappa + 1}{2(\kappa - 1)}}
-        }{
-        M_{iter} \left(\frac{\kappa + 1}{2}\right)^{\frac{\kappa + 1}{2(\kappa - 1)}}
-        } $
-    ''')
-    
     col1, col2 = st.columns([1,3])
     with col1:
         Mi_guess = st.number_input("M iterativni izbor", value=2.8, step=0.1)
     with col2:
         spacer('2em')
-        st.markdown(f"$ M_{{iter}} = {Mi_guess:.3f}$")
+        st.markdown(f"$ M_{{iter}} = {Mi_guess:.3f}, \\; \\epsilon(M_{{iter}}) = {float(area_ratio(Mi_guess, kappa)):.3f}$")
 
-    # fsolve
-    def equation(Mi, kappa, epsilon_i):
-        epsilon_i_opt_numerator = (1 + (kappa - 1) / 2 * Mi**2)**((kappa + 1) / (2 * (kappa - 1)))
-        epsilon_i_opt_denominator = Mi * ((kappa + 1) / 2)**((kappa + 1) / (2 * (kappa - 1)))
-        return epsilon_i_opt_numerator / epsilon_i_opt_denominator - epsilon_i
-
-    Mi_solution = fsolve(equation, Mi_guess, args=(kappa, epsilon_i))
-    
+    # the solver as taught (fsolve from the guess); the page itself solves with mach_solver,
+    # which needs no guess and keeps scipy out of the page run
     st.code(f"""from scipy.optimize import fsolve
 def equation(Mi, kappa, epsilon_i):
     epsilon_i_opt_numerator = (1 + (kappa - 1) / 2 * Mi**2)**((kappa + 1) / (2 * (kappa - 1)))
@@ -477,230 +401,106 @@ def equation(Mi, kappa, epsilon_i):
     return epsilon_i_opt_numerator / epsilon_i_opt_denominator - epsilon_i
 Mi_guess = {Mi_guess:.1f}
 Mi_solution = fsolve(equation, Mi_guess, args=(kappa, epsilon_i))
-Mi_solution = {Mi_solution[0]:.4f}
+Mi_solution = {Mi_solution:.4f}
+
+# isto, vektorizovan Njutnov metod (mach_solver.py), bez pocetne vrednosti
+from mach_solver import solve_exit_mach
+Mi_solution = solve_exit_mach(kappa, epsilon_i)
 """)
     col1, col2 = st.columns([1,3])
     with col1:
-        M_i = st.number_input("M_i ručna izmena", value=Mi_solution[0], step=1.00)
+        M_i = st.number_input("M_i ručna izmena", value=Mi_solution, step=1.00)
     with col2:
         spacer('2em')
         st.markdown(fr"$M_i = {M_i:.3f}$")
 
-    # 7. Static Pressure at Nozzle Exit
-    pi = P / ((1 + (kappa - 1) / 2 * M_i**2)**(kappa / (kappa - 1)))
-    st.code('7. Statički pritisak na izlazu iz mlaznika:')
-    st.markdown(r'''
-        $ p_i = \frac{P}{
-        \left(1 + \frac{\kappa - 1}{2} \cdot M_i^2\right)^{\frac{\kappa}{\kappa - 1}}
-        } $
-    ''')
-    st.markdown(f'''
-    $ p_i = \\frac{{{P:.2e}}}{{\\left(1 + \\frac{{{kappa} - 1}}{{2}} \cdot {M_i:.3f}^2\\right)^{{\\frac{{{kappa}}}{{{kappa} - 1}}}}}} = {pi:.3f} \\, \\text{{Pa}} $
-    ''')
-    pi_sci = format_scientific_latex(pi)
-    st.markdown(f'> $ p_{{i}} = {pi_sci} \\, \\text{{Pa}} $')
-    
-    spacer()
+    # steps 7-13 depend on the (possibly edited) exit Mach number
+    result = SimpleNamespace(**shared_evaluate(graph, {'M_i': M_i}, targets=list(ENGINE_NODES)))
 
-    # Optimalni stepen sirenja mlaznika
-    Mi_opt = (((P/Pa)**((kappa - 1)/kappa) - 1) * (2/(kappa - 1)))**0.5
+    derivation('7', '8', '8d', '9')
+    diopt = result.diopt
+    st.success(f'T = {result.T:.3f} K')
 
-    st.code('8. Optimalni stepen sirenja mlaznika (do atmosferskog P od 1 bar)')
-    st.markdown(r'''
-    $$ M_{i \text{ opt}} = \sqrt{\left[\left(\frac{P}{P_a}\right)^{\frac{\kappa - 1}{\kappa}} - 1\right] \cdot \frac{2}{\kappa - 1}} $$
-    ''')
-    st.markdown(f'$ M_{{i opt}} = \\sqrt{{\\left[\\left(\\frac{{{P:.2e}}}{{{Pa:.2e}}}\\right)^{{\\frac{{{kappa} - 1}}{{{kappa}}}}} - 1\\right] \\cdot \\frac{{2}}{{{kappa} - 1}}}} = {Mi_opt:.3f} $')
-    st.markdown(f'> $ M_{{i opt}} = {Mi_opt:.3f} $')
-    spacer()
-
-    # 9. Calculate the optimal expansion ratio (e_i opt)
-    e_i_opt = (1 + (kappa - 1)/2 * Mi_opt**2)**((kappa + 1)/(2 * (kappa - 1))) / Mi_opt / ((kappa + 1)/2)**((kappa + 1)/(2 * (kappa - 1)))
-    st.markdown(r'''
-    $ \epsilon_{i opt} = \frac{
-    \left(1 + \frac{\kappa - 1}{2} \cdot M_{i opt}^2\right)^{\frac{\kappa + 1}{2(\kappa - 1)}}
-    }{
-    M_{i opt} \left(\frac{\kappa + 1}{2}\right)^{\frac{\kappa + 1}{2(\kappa - 1)}}
-    } $
-    ''')
-    st.markdown(f'''
-        $ \epsilon_{{i opt}} = \\frac{{
-        \\left(1 + \\frac{{{kappa} - 1}}{{2}} \cdot {Mi_opt:.3f}^2\\right)^{{\\frac{{{kappa} + 1}}{{2({kappa} - 1)}}}}
-        }}{{
-        {Mi_opt:.3f} \cdot \\left(\\frac{{{kappa} + 1}}{{2}}\\right)^{{\\frac{{{kappa} + 1}}{{2({kappa} - 1)}}}}
-        }} = {e_i_opt:.3f} $
-    ''')
-    st.markdown(f'> $ \epsilon_{{i opt}} = {e_i_opt:.3f} $')
-
-    spacer()
-
-    # Calculate optimal nozzle exit area
-    Aiopt = e_i_opt * Akr
-    st.markdown(r'''
-    $$ A_{i_{opt}} = \epsilon_{i opt} \cdot A_{kr} $$
-    ''')
-    st.markdown(f'''
-        $ A_{{i_{{opt}}}} = {e_i_opt:.3f} \cdot {Akr:.3f} = {Aiopt:.5f} \\, \\text{{m}}^2 $
-    ''')
-    Aiopt_sci = format_scientific_latex(Aiopt)
-    st.markdown(f'> $ A_{{i{{opt}}}} = {Aiopt_sci} \\, \\text{{m}}^2 $')
-    spacer()
-
-    # Calculate optimal nozzle exit diameter
-    st.code('izlazni precnik')
-    diopt = (Aiopt * 4 / 3.14159)**0.5
-    st.markdown(r'''
-    $$ d_{i_{opt}} = \sqrt{A_{i_{opt}} \cdot \frac{4}{\pi}} $$
-    ''')
-    st.markdown(f'''
-        $ d_{{i_{{opt}}}} = \sqrt{{ {Aiopt:.4f} \\cdot \\frac{{4}}{{\\pi}} }} = {diopt:.3f} \\, \\text{{m}}^2 $
-    ''')
-    diopt_sci = format_scientific_latex(diopt)
-    st.markdown(f'> $ d_{{iopt}} = {diopt_sci} \\, \\text{{m}} $')
-    spacer()
-
-    # Calculation of the temperature function Gamma(kappa)
-    st.code('9. Totalna temperatura u komori')
-    st.markdown(r'''
-    $$ \Gamma(\kappa) = \sqrt{\kappa} \left( \frac{2}{\kappa + 1} \right)^{\frac{\kappa + 1}{2(\kappa - 1)}} $$
-    ''')
-    Gamma_kappa = (kappa**0.5) * ((2 / (kappa + 1))**((kappa + 1)/(2 * (kappa - 1))))
-    st.markdown(f'''
-    $ \Gamma(\kappa) = \sqrt{{ {kappa} }} \\left( \\frac{{2}}{{ {kappa} + 1 }} \\right)^{{\\frac{{ {kappa} + 1 }}{{2( {kappa} - 1)}}}} = {Gamma_kappa:.3f} $
-    ''')
-
-    # Calculation of the total temperature in the chamber T
-    T = (Cstar * Gamma_kappa)**2 / R
-    st.markdown(r'''
-    $$ T = \frac{(C_{star} \cdot \Gamma(k))^2}{R} $$
-    ''')
-    st.markdown(f'''
-        $ T = \\frac{{({Cstar:.3f} \\cdot {Gamma_kappa:.3f})^2}}{{{R:.3f}}} = {T:.3f} \\, \\text{{K}} $
-    ''')
-    T_sci = format_scientific_latex(T)
-    st.markdown(f'> $ T = {T_sci} \\, \\text{{K}} $')
-    st.success(f'T = {T:.3f} K')
-    spacer()
-
-    # brzina isticanja pri zadanom i optimalnom stepenu sirenja
-    st.code("10. Brzina isticanja pri zadanom i optimalnom stepenu sirenja")
-    Vi = (2*kappa/(kappa-1) * R * T * (1 - 1/((P/pi)**((kappa-1)/kappa))))**0.5
-    st.markdown(r'''
-        $$ V_i = \sqrt{ \frac{2 \kappa}{\kappa - 1} \cdot R \cdot T \cdot \left[ 1 - \frac{1}{\left(\frac{P}{p_i}\right)^{\frac{\kappa - 1}{\kappa}}} \right] } $$
-    ''')
-    st.markdown(f'''
-        $ V_i = \sqrt{{ \\frac{{2 \cdot {kappa}}}{{ {kappa} - 1 }} \cdot {R} \cdot {T:.3f} \cdot \\left[ 1 - \\frac{{1}}{{\\left(\\frac{{ {P} }}{{ {pi:.3f} }}\\right)^{{\\frac{{ {kappa} - 1 }}{{ {kappa} }}}}}} \\right] }}  = {Vi:.3f} \\, \\text{{m/s}} $
-    ''')
-    Vi_sci = format_scientific_latex(Vi)
-    st.markdown(f'> $ V_{{i}} = {Vi_sci} \\, \\text{{m/s}} $')
-    spacer()
-
-    Vi_opt = (2*kappa/(kappa-1) * R * T * (1 - 1/((P/Pa)**((kappa-1)/kappa))))**0.5
-    st.markdown(r'''
-        $$ V_{iopt} = \sqrt{ \frac{2 \kappa}{\kappa - 1} \cdot R \cdot T \cdot \left[ 1 - \frac{1}{\left(\frac{P}{p_a}\right)^{\frac{\kappa - 1}{\kappa}}} \right] } $$
-    ''')
-    st.markdown(f'''
-        $ V_{{iopt}} = \sqrt{{ \\frac{{2 \cdot {kappa}}}{{ {kappa} - 1 }} \cdot {R} \cdot {T:.3f} \cdot \\left[ 1 - \\frac{{1}}{{\\left(\\frac{{ {P} }}{{ {Pa:.3f} }}\\right)^{{\\frac{{ {kappa} - 1 }}{{ {kappa} }}}}}} \\right] }}  = {Vi_opt:.3f} \\, \\text{{m/s}} $
-    ''')
-    Vi_opt_sci = format_scientific_latex(Vi_opt)
-    st.markdown(f'> $ V_{{iopt}} = {Vi_opt_sci} \\, \\text{{m/s}} $')
-    
-    # ===================== thrust ===================== #
-    # Thrust at given expansion ratio
-    st.code('11. Zadata sila potiska')
-    F = F * 1000 # kN to N    
-    st.markdown(f'$ F = {F:.2f} \\, \\text{{N}} $')
-    F_sci = format_scientific_latex(F)
-    st.markdown(f'> $ F = {F_sci} \\, \\text{{N}} $')
-    spacer()
-    
-    # F = (mox + mg) * Vi + Ai * (pi - Pa)
-    # st.markdown(f'''
-    #     $ F = ({mox:.3f} + {mg:.3f}) \cdot {Vi:.3f} + {Ai:.3f} \cdot ({pi:.3f} - {Pa:.3f}) = {F:.3f} \\, \\text{{N}} $
-    # ''')
-
-    # Thrust at optimal expansion ratio
-    Fopt = (mox + mg) * Vi_opt
-    st.markdown(r'''
-        $$ F_{opt} = (m_{ox} + m_{g}) \cdot V_{iopt} $$
-    ''')
+    derivation('10', '11')
+    F = result.F # kN to N
+    Fopt = result.Fopt
     st.code(Fopt)
-    st.markdown(f'''
-        $ F_{{opt}} = ({mox:.3f} + {mg:.3f}) \cdot {Vi_opt:.3f} = {Fopt:.3f} \\, \\text{{N}} $
-    ''')
-    Fopt_sci = format_scientific_latex(Fopt)
-    st.markdown(f'> $ F_{{opt}} = {Fopt_sci} \\, \\text{{N}} $')
-    spacer()
-
-    # Thrust Coefficient ============================================
-    st.code('12. Koeficijent potiska')
-    
-    Cf = F / (P * Akr)
-    st.markdown(r'''
-        $$ C_f = \frac{F}{P \cdot A_{kr}} $$
-    ''')
-    # st.markdown(f'''
-    #     $ C_f = \\frac{{ {F:.0f} }}{{ {P:.0f} \\cdot {Akr:.5f} }} = {Cf:.3f} $
-    # ''')
-    # scientific notation Cf variant
-    P_sci = format_scientific_latex(P)
-    st.markdown(f'''
-        $ C_f = \\frac{{ {F_sci} }}{{ {P_sci} \\cdot {Akr_sci} }} = {Cf:.3f} $
-    ''')
-    st.markdown(f'> $ C_f = {Cf:.3f} $')
-    spacer()
-
-    # Specific Impulse at Given Expansion Ratio =======================
-    st.code('13. Specifični impuls pri zadanom stepenu sirenja')
-    Isp = F / (mox + mg)
-    Isp_sec = Isp / 9.80665
-    st.markdown(r'''
-        $$ I_{sp} = \frac{F}{(m_{ox} + m_{g})} $$
-    ''')
-    st.markdown(f'''
-        $ I_{{sp}} = \\frac{{ {F:.3f} }}{{ ({mox:.3f} + {mg:.3f}) }} = {Isp:.2f} \\, \\text{{Ns/Kg}} = {Isp_sec:.2f} \\, \\text{{s}}$
-    ''')
-    st.markdown(f'> $ I_{{sp}} = {Isp:.2f} \\, \\text{{Ns/Kg}} $')
-    spacer()
 
-    # Specific Impulse at Optimal Expansion Ratio
-    st.code('Specifični impuls pri optimalnom stepenu sirenja:')
-    Isp_opt = Fopt / (mox + mg)
-    Isp_opt_sec = Isp_opt / 9.80665
-    st.markdown(r'''
-        $$ I_{sp_{opt}} = \frac{F_{opt}}{(m_{ox} + m_{g})} $$
-    ''')
-    st.markdown(f'''
-        $ I_{{sp_{{opt}}}} = \\frac{{ {Fopt:.3f} }}{{ ({mox:.3f} + {mg:.3f}) }} = {Isp_opt:.3f} \\, \\text{{Ns/kg}}  = {Isp_opt_sec:.2f} \\, \\text{{s}}$
-    ''', help='Isp/g = value in seconds')
-    st.markdown(f'> $ I_{{sp_{{opt}}}} = {Isp_opt:.2f} \\, \\text{{Ns/Kg}} $')
-    spacer()
+    derivation('12', '13', '13o')
+    Cf = result.Cf
+    Isp = result.Isp
+    Isp_opt = result.Isp_opt
     
     # ===================== COMPARISON TABLE ===================== #
+    mark('poređenje')
     st.subheader("Poređenje rezultata")
     
     st.code(kappa)
 
-    g = 9.80665
-    
-
-    st.markdown(f"""
-    | Parameter                          | RPA Value                     | Analytical Value     | Difference             | % Difference          |
-    |------------------------------------|-------------------------------|----------------------|------------------------|-----------------------|
-    | **Performanse**                    |                               |                      |                        |                       |
-    | Isp — Specifični impuls (Vac)      | `{isp_rpa*g:.2f} Ns/Kg` | `{Isp:.2f} Ns/Kg`    | `{(isp_rpa*g - Isp):.2f} Ns/Kg` | `{((isp_rpa*g - Isp) / Isp * 100):.2f}%` |
-    | Cf – Koeficijent potiska (Vac)     | `{cf_rpa}`                    | `{Cf:.4f}`           | `{(cf_rpa - Cf):.4f}` | `{((cf_rpa - Cf) / Cf * 100):.2f}%` |
-    | F - Potisak komore (Vac)           | `{thrust_vac_rpa} kN`         | `{F/1000:.3f} kN`    | `{(thrust_vac_rpa - F/1000):.2f} kN` | `{((thrust_vac_rpa - F/1000) / (F/1000) * 100):.2f}%` |
-    | Fopt - Potisak komore (Opt)        | `{thrust_opt_rpa} kN`         | `{Fopt/1000:.3f} kN` | `{(thrust_vac_rpa - Fopt/1000):.2f} kN` | `{((thrust_opt_rpa - Fopt/1000) / (Fopt/1000) * 100):.2f}%` |
-    | Isp_opt - Specifični impuls (Opt)  | `{isp_opt_rpa*g:.2f} Ns/Kg` | `{Isp_opt:.2f} Ns/Kg` | `{(isp_opt_rpa*g - Isp_opt):.2f} Ns/Kg` | `{((isp_opt_rpa*g - Isp_opt) / Isp_opt * 100):.2f}%` |
-    | OF - Odnos oksidator/gorivo (OF)   | `{of_rpa:.3f}`                | `{OF:.3f}`           | `{(of_rpa - OF):.3f}`   | `{((of_rpa - OF) / OF * 100):.2f}%`   |
-    | **Geometrija komore**              |                               |                      |                            |                       |
-    | Dc - Prečnik komore                | `{dc_rpa} mm`                 | `{dk*1000:.3f} mm`   | `{(dc_rpa-dk*1000):.3f}` | `{((dc_rpa - dk*1000) / (dk*1000) * 100):.2f}%` |
-    | Dt - Prečnik grla mlaznika         | `{dt_rpa} mm`                 | `{dkr*1000:.3f} mm`  | `{(dt_rpa-dkr*1000):.3f}`| `{((dt_rpa - dkr*1000) / (dkr*1000) * 100):.2f}%`|
-    | De - Izlazni prečnik (presek)      | `{de_rpa} mm`                 | `{diopt*1000:.3f} mm`   | `{(de_rpa-di*1000):.3f}` | `{((de_rpa - di*1000) / (di*1000) * 100):.2f}%` |
-    | Lc - Dužina komore                 | `{lc_rpa} mm`                 | `{lk*1000:.3f} mm`   | `{(lc_rpa-lk*1000):.3f}` | `{((lc_rpa - lk*1000) / (lk*1000) * 100):.2f}%` |
-    """, unsafe_allow_html=True)
+    # this run plus the runs added to the comparison, evaluated together (engine_comparison.py)
+    current = dict(P=P, Pa=Pa, F=F, epsilon_i=epsilon_i, d_dkdr=d_dkdr, Lstar=Lstar,
+                   Cstar=Cstar, R=R, kappa=kappa, OF=OF, dkr=dkr)
+    runs = st.session_state.setdefault('comparison_runs', [])
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button('➕ Dodaj proračun u poređenje', key='comparison_add', help='čuva RPA izlaz i ulazne podatke ovog proračuna'):
+            runs.append(dict(name=f'{len(runs) + 1}: P = {P_bar} bar, F = {F/1000:g} kN, ε = {epsilon_i:g}',
+                             rpa=parsed, inputs=current, M_i=M_i))
+    with col2:
+        if runs and st.button('Obriši poređenje', key='comparison_clear'):
+            runs.clear()
+
+    cases = [dict(name='trenutni', rpa=parsed, inputs=current, M_i=M_i)] + runs
+    if runs:
+        names = [case['name'] for case in cases]
+        selected = set(st.multiselect('Motori u poređenju', names, default=names))
+        cases = [case for case in cases if case['name'] in selected]
+    if cases:
+        comparison = compare([case['rpa'] for case in cases], names=[case['name'] for case in cases],
+                             M_i=[case['M_i'] for case in cases],
+                             **{key: [case['inputs'][key] for case in cases] for key in current})
+        number = st.column_config.NumberColumn(format='%.4f')
+        columns = {'RPA': number, 'Analitički': number, 'Razlika': number,
+                   '% Razlika': st.column_config.NumberColumn(format='%.2f%%')}
+        if not runs:
+            columns['Motor'] = None  # hidden for a single engine
+        st.dataframe(comparison.to_frame(), hide_index=True, column_config=columns)
+
+    # ===================== UNCERTAINTY ===================== #
+    mark('nesigurnost')
+    st.subheader("Analiza nesigurnosti")
+    st.markdown("Cstar, R, kappa, P, ε i L* su poznati samo približno (npr. Cstar = 2376 m/s i R = 700 J/kgK iz zadatka naspram RPA). Ulazi se uzorkuju oko zadatih vrednosti i propuštaju kroz ceo analitički proračun.")
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        n_samples = st.number_input('Broj uzoraka', value=100_000, min_value=1000, max_value=10**6, step=100_000)
+    with col2:
+        method = st.selectbox('Metod', ['lhs', 'mc'], format_func={'lhs': 'Latin hypercube', 'mc': 'Monte Carlo'}.get)
+    with col3:
+        spacer('1.7em')
+        run_uncertainty = st.button('Pokreni', key='uncertainty')
+    if run_uncertainty:
+        spec = {**DEFAULT_SPEC, 'kappa': ('normal', kappa, 0.01), 'P': ('normal', P, 0.02 * P),
+                'epsilon_i': ('normal', epsilon_i, 0.01 * epsilon_i), 'Lstar': ('uniform', 0.8 * Lstar, 1.2 * Lstar)}
+        uncertainty = propagate(spec, dict(Pa=Pa, F=F, d_dkdr=d_dkdr, OF=OF, dkr=dkr), n=int(n_samples), method=method)
+        st.dataframe(uncertainty.summary(), hide_index=True)
+        st.caption("p5/p50/p95 - percentili, S_* - udeo varijanse izlaza koji objašnjava pojedinačni ulaz (indeks prvog reda)")
+
+    # instrumentation: which nodes of the chain were recomputed in this rerun
+    with st.sidebar.expander("Preračunate veličine (poslednji rerun)"):
+        steps = sorted({ENGINE_SECTIONS[name] for name in graph.recomputed if name in ENGINE_SECTIONS})
+        st.write(", ".join(graph.recomputed) or "ništa, sve iz keša")
+        st.caption(f"koraci: {', '.join(map(str, steps)) or '-'}")
+        shared = result_cache.stats()
+        st.caption(f"deljeni keš: {shared['entries']} unosa, pogodaka {shared['hit_ratio']:.0%}, izbačeno {shared['evictions']}")
 
 
 if __name__ == "__main__":
-    main()
+    with profile_run(st):
+        main()
+    display_profiling()
+    # RPA_CACHE_STATS_FILE=/path/rpa_cache.prom exposes the artifact cache counters for scraping
+    if os.environ.get('RPA_CACHE_STATS_FILE'):
+        artifact_cache.write_stats(os.environ['RPA_CACHE_STATS_FILE'])
+    if os.environ.get('RESULT_CACHE_STATS_FILE'):
+        result_cache.write_stats(os.environ['RESULT_CACHE_STATS_FILE'])
 
@@ -0,0 +1,173 @@
+# monte_carlo.py
+# uncertainty propagation through the analytical chain: Monte Carlo or Latin hypercube
+# samples of uncertain inputs (Cstar, R, kappa, P, epsilon_i, Lstar), evaluated in chunks,
+# with percentiles and first-order sensitivity indices of the results
+from dataclasses import dataclass
+
+import numpy as np
+
+from engine_model import EngineModel
+
+# input -> (distribution, a, b); normal: mean, std / uniform: low, high / lognormal: median, sigma of ln.
+# Cstar and R span the RPA values (1892.5, 433.5) and the ones from the assignment (2376, 700)
+DEFAULT_SPEC = {
+    'Cstar': ('uniform', 1850.0, 2400.0),
+    'R': ('uniform', 420.0, 700.0),
+    'kappa': ('normal', 1.1716, 0.01),
+    'P': ('normal', 180e5, 180e5 * 0.02),
+    'epsilon_i': ('normal', 7.0, 0.07),
+    'Lstar': ('uniform', 0.8, 1.2),
+}
+
+# remaining EngineModel inputs, as in the sidebar of main.py
+DEFAULT_FIXED = dict(Pa=101325.0, F=22e3, d_dkdr=3.0, OF=0.848, dkr=0.03104)
+
+# EngineResult fields reported; F itself is an input of the chain, Fopt is the computed thrust
+DEFAULT_OUTPUTS = ('Isp', 'Isp_opt', 'Cf', 'Fopt', 'T', 'M_i', 'dk', 'lk', 'di', 'Vkom')
+
+
+def _ppf(distribution, a, b, u):
+    # inverse CDF of the distribution at probabilities u
+    if distribution == 'uniform':
+        return a + (b - a) * u
+    from scipy.special import ndtri  # scipy loaded only for normal/lognormal inputs
+    if distribution == 'normal':
+        return a + b * ndtri(u)
+    if distribution == 'lognormal':
+        return a * np.exp(b * ndtri(u))
+    raise ValueError(f"unknown distribution {distribution!r}")
+
+
+class _Sampler:
+    """Probabilities u in (0, 1) per input, drawn chunk by chunk."""
+
+    def __init__(self, names, n, method, rng):
+        if method not in ('lhs', 'mc'):
+            raise ValueError(f"method must be 'lhs' or 'mc', not {method!r}")
+        self.names, self.n, self.rng = names, n, rng
+        # Latin hypercube: one stratum of width 1/n per sample and input, shuffled per input
+        self.strata = ({name: rng.permutation(n).astype(np.int32) for name in names}
+                       if method == 'lhs' else None)
+
+    def __call__(self, start, stop):
+        u = {}
+        for name in self.names:
+            jitter = self.rng.random(stop - start)
+            u[name] = jitter if self.strata is None else (self.strata[name][start:stop] + jitter) / self.n
+        return u
+
+
+def sample(spec=None, n=1000, method='lhs', seed=0):
+    """
+    Draw input samples.
+
+    Args:
+    spec (dict, optional): Input -> (distribution, a, b), see `DEFAULT_SPEC`.
+    n (int): Number of samples.
+    method (str): 'lhs' (Latin hypercube) or 'mc' (plain Monte Carlo).
+    seed (int): Random seed.
+
+    Returns:
+    dict: Input -> array of n samples.
+    """
+    spec = DEFAULT_SPEC if spec is None else spec
+    u = _Sampler(list(spec), n, method, np.random.default_rng(seed))(0, n)
+    return {name: _ppf(*spec[name], u[name]) for name in spec}
+
+
+@dataclass
+class Uncertainty:
+    """Propagated samples and their statistics."""
+    n: int
+    method: str
+    samples: dict      # output -> float32 array (n,)
+    percentiles: dict  # output -> {percentile: value}
+    sensitivity: dict  # output -> {input: first-order index}
+
+    def summary(self):
+        """One row per output: mean, std, percentiles and the indices of each input."""
+        rows = []
+        for name, values in self.samples.items():
+            row = {'output': name, 'mean': float(values.mean(dtype=float)), 'std': float(values.std(dtype=float))}
+            row.update({f'p{q:g}': value for q, value in self.percentiles[name].items()})
+            row.update({f'S_{key}': value for key, value in self.sensitivity[name].items()})
+            rows.append(row)
+        return rows
+
+
+def propagate(spec=None, fixed=None, n=10**6, method='lhs', outputs=DEFAULT_OUTPUTS,
+              chunk_size=100_000, percentiles=(5, 50, 95), bins=50, seed=0):
+    """
+    Push sampled inputs through the analytical chain (exit-Mach solve included).
+
+    Inputs are evaluated `chunk_size` at a time, so the chain's temporaries stay bounded;
+    only the requested outputs are kept (float32). First-order sensitivity indices are
+    estimated as Var(E[Y | X_i]) / Var(Y) over `bins` equal-probability bins of each input.
+
+    Example:
+    result = propagate(n=10**6)
+    result.percentiles['Isp'], result.sensitivity['Isp']['Cstar']
+
+    Args:
+    spec (dict, optional): Uncertain input -> (distribution, a, b); `DEFAULT_SPEC` by default.
+    fixed (dict, optional): Values of the other `EngineModel` inputs; `DEFAULT_FIXED` by default.
+    n (int): Number of samples.
+    method (str): 'lhs' or 'mc'.
+    outputs (tuple): `EngineResult` fields to keep.
+    chunk_size (int): Samples per evaluation.
+    percentiles (tuple): Percentiles to report.
+    bins (int): Bins per input for the sensitivity indices.
+    seed (int): Random seed.
+
+    Returns:
+    Uncertainty: Samples, percentiles and sensitivity indices per output.
+    """
+    spec = DEFAULT_SPEC if spec is None else spec
+    fixed = {**DEFAULT_FIXED, **({} if fixed is None else fixed)}
+    names = list(spec)
+    sampler = _Sampler(names, n, method, np.random.default_rng(seed))
+
+    samples = {name: np.empty(n, dtype=np.float32) for name in outputs}
+    # per input, bin and output: count and sum of the output, for E[Y | X_i]
+    counts = {name: np.zeros(bins) for name in names}
+    sums = {(name, out): np.zeros(bins) for name in names for out in outputs}
+
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        u = sampler(start, stop)
+        inputs = {**fixed, **{name: _ppf(*spec[name], u[name]) for name in names}}
+        result = EngineModel(**inputs).evaluate()
+        values = {out: np.broadcast_to(getattr(result, out), (stop - start,)) for out in outputs}
+        for name in names:
+            index = np.minimum((u[name] * bins).astype(np.intp), bins - 1)
+            counts[name] += np.bincount(index, minlength=bins)
+            for out in outputs:
+                sums[name, out] += np.bincount(index, weights=values[out], minlength=bins)
+        for out in outputs:
+            samples[out][start:stop] = values[out]
+
+    levels = np.asarray(percentiles, dtype=float)
+    stats, sensitivity = {}, {}
+    for out in outputs:
+        values = samples[out]
+        stats[out] = dict(zip(percentiles, np.percentile(values, levels).tolist()))
+        mean, variance = values.mean(dtype=float), values.var(dtype=float)
+        sensitivity[out] = {}
+        for name in names:
+            filled = counts[name] > 0
+            conditional = sums[name, out][filled] / counts[name][filled]
+            explained = np.sum(counts[name][filled] * (conditional - mean)**2) / n
+            sensitivity[out][name] = float(explained / variance) if variance > 0 else 0.0
+    return Uncertainty(n, method, samples, stats, sensitivity)
+
+
+if __name__ == "__main__":
+    import time
+
+    for method in ('lhs', 'mc'):
+        t0 = time.perf_counter()
+        result = propagate(n=10**6, method=method)
+        print(f"{method}: {result.n} samples in {time.perf_counter() - t0:.2f} s")
+    for row in result.summary():
+        indices = ', '.join(f"{key[2:]} {value:.2f}" for key, value in row.items() if key.startswith('S_'))
+        print(f"{row['output']:8s} p5 {row['p5']:12.5g}  p50 {row['p50']:12.5g}  p95 {row['p95']:12.5g}  | {indices}")
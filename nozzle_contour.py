@@ -0,0 +1,173 @@
+# nozzle_contour.py
+# wall contour of a thrust chamber with parabolic (Rao) nozzle from the RPA geometry,
+# vectorized over many engines
+#
+#   x = 0 at the injector face, throat at x = Lc; radius r; same units as the inputs (mm from RPA)
+#
+#   cylinder (Lcyl) -> R2 arc -> cone at angle b -> R1 arc -> throat
+#   -> Rn arc to angle Tn -> quadratic Bezier to the exit (Le, De/2) at angle Te
+import numpy as np
+
+# segment kinds; straight segments are Bezier curves with the middle control point halfway
+_ARC, _BEZIER = 0, 1
+_KINDS = np.array([_BEZIER, _ARC, _BEZIER, _ARC, _ARC, _BEZIER])
+SEGMENTS = ('cylinder', 'R2', 'cone', 'R1', 'Rn', 'bell')
+
+
+def _segments(dc, dt, de, lc, lcyl, le, b, r1, r2, rn, tn, te):
+    # per engine and segment: arc (cx, cr, radius, sx, sr, phi0, phi1) or Bezier (P0, Q, P2);
+    # each array has shape (n, 6)
+    rc, rt, re = dc / 2, dt / 2, de / 2
+    b, tn, te = np.radians(b), np.radians(tn), np.radians(te)
+    zero = np.zeros_like(rc)
+
+    # end points of the arcs
+    x2, y2 = lcyl + r2 * np.sin(b), rc - r2 * (1 - np.cos(b))         # R2 -> cone
+    x3, y3 = lc - r1 * np.sin(b), rt + r1 * (1 - np.cos(b))           # cone -> R1
+    xn, yn = lc + rn * np.sin(tn), rt + rn * (1 - np.cos(tn))         # Rn -> bell
+    xe, ye = lc + le, re
+
+    # bell control point: intersection of the tangents at N (angle Tn) and E (angle Te)
+    xq = (ye - yn + xn * np.tan(tn) - xe * np.tan(te)) / (np.tan(tn) - np.tan(te))
+    yq = yn + (xq - xn) * np.tan(tn)
+
+    bezier = [  # (x0, y0, xq, yq, x2, y2); straight lines use the midpoint as control
+        (zero, rc, lcyl / 2, rc, lcyl, rc),
+        (x2, y2, (x2 + x3) / 2, (y2 + y3) / 2, x3, y3),
+        (xn, yn, xq, yq, xe, ye),
+    ]
+    arcs = [  # (cx, cr, radius, sx, sr, phi0, phi1): x = cx + sx R sin(phi), r = cr + sr R cos(phi)
+        (lcyl, rc - r2, r2, 1, 1, zero, b),
+        (lc, rt + r1, r1, -1, -1, b, zero),
+        (lc, rt + rn, rn, 1, -1, zero, tn),
+    ]
+    slots = {0: ('b', 0), 1: ('a', 0), 2: ('b', 1), 3: ('a', 1), 4: ('a', 2), 5: ('b', 2)}
+
+    params = np.zeros((len(rc), 6, 7))
+    lengths = np.zeros((len(rc), 6))
+    for k, (kind, i) in slots.items():
+        if kind == 'a':
+            cx, cr, radius, sx, sr, phi0, phi1 = arcs[i]
+            params[:, k] = np.stack(np.broadcast_arrays(cx, cr, radius, sx, sr, phi0, phi1), -1)
+            lengths[:, k] = radius * np.abs(phi1 - phi0)
+        else:
+            x0, y0, xq_, yq_, x2_, y2_ = bezier[i]
+            params[:, k, :6] = np.stack(np.broadcast_arrays(x0, y0, xq_, yq_, x2_, y2_), -1)
+            # mean of chord and control polygon, close enough for spacing the points
+            chord = np.hypot(x2_ - x0, y2_ - y0)
+            polygon = np.hypot(xq_ - x0, yq_ - y0) + np.hypot(x2_ - xq_, y2_ - yq_)
+            lengths[:, k] = (chord + polygon) / 2
+    return params, lengths
+
+
+def contour(dc, dt, de, lc, lcyl, le, b, r1, r2, rn, tn, te, points=1000, chunk_size=1024):
+    """
+    Wall contour points, spaced approximately evenly along the wall.
+
+    Args:
+    dc, dt, de (float or array): Chamber, throat and exit diameters.
+    lc, lcyl, le (float or array): Chamber length (injector to throat), cylindrical
+        length and nozzle length (throat to exit).
+    b (float or array): Contraction angle [deg].
+    r1, r2, rn (float or array): Throat upstream, chamber-to-cone and throat
+        downstream radii of curvature.
+    tn, te (float or array): Bell angles at the start of the parabola and at the exit [deg].
+    points (int): Points per contour.
+    chunk_size (int): Engines evaluated at once (bounds temporary memory).
+
+    Returns:
+    tuple: (x, r) arrays of shape (points,) for scalar inputs, else (n_engines, points).
+    """
+    inputs = np.broadcast_arrays(*(np.asarray(v, dtype=float)
+                                   for v in (dc, dt, de, lc, lcyl, le, b, r1, r2, rn, tn, te)))
+    scalar = inputs[0].ndim == 0
+    inputs = [v.ravel() for v in inputs]
+    n = len(inputs[0])
+    x, r = np.empty((n, points)), np.empty((n, points))
+    u = np.linspace(0.0, 1.0, points)
+
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        params, lengths = _segments(*(v[start:stop] for v in inputs))
+        bounds = np.cumsum(lengths, axis=1)
+        s = u * bounds[:, -1:]                                   # arc length of each point
+        k = np.minimum((s[:, :, None] > bounds[:, None, :]).sum(-1), 5)
+        begin = np.take_along_axis(bounds - lengths, k, 1)
+        t = np.where(np.take_along_axis(lengths, k, 1) > 0,
+                     (s - begin) / np.take_along_axis(np.maximum(lengths, 1e-300), k, 1), 0.0)
+        t = np.clip(t, 0.0, 1.0)
+        p = np.take_along_axis(params, k[:, :, None], 1)         # (engines, points, 7)
+        is_arc = _KINDS[k] == _ARC
+
+        phi = p[..., 5] + t * (p[..., 6] - p[..., 5])
+        arc_x = p[..., 0] + p[..., 3] * p[..., 2] * np.sin(phi)
+        arc_r = p[..., 1] + p[..., 4] * p[..., 2] * np.cos(phi)
+        w0, w1, w2 = (1 - t)**2, 2 * t * (1 - t), t**2
+        bez_x = w0 * p[..., 0] + w1 * p[..., 2] + w2 * p[..., 4]
+        bez_r = w0 * p[..., 1] + w1 * p[..., 3] + w2 * p[..., 5]
+        x[start:stop] = np.where(is_arc, arc_x, bez_x)
+        r[start:stop] = np.where(is_arc, arc_r, bez_r)
+
+    if scalar:
+        return x[0], r[0]
+    return x, r
+
+
+def contour_from_design(design, points=1000):
+    """Contour of a parsed `rpa_parser.RpaEngineDesign` (or a list of them)."""
+    designs = design if isinstance(design, (list, tuple)) else [design]
+    names = ('dc', 'dt', 'de', 'lc', 'lcyl', 'le', 'b', 'r1', 'r2', 'rn', 'tn', 'te')
+    columns = [np.array([getattr(d, name) for d in designs], dtype=float) for name in names]
+    x, r = contour(*columns, points=points)
+    if not isinstance(design, (list, tuple)):
+        return x[0], r[0]
+    return x, r
+
+
+#===================== export =====================#
+
+def write_csv(path, x, r, precision=4):
+    """Points as CSV: `x,r` for one contour, `engine,x,r` for a batch."""
+    x, r = np.atleast_2d(x), np.atleast_2d(r)
+    n, m = x.shape
+    batch = n > 1
+    row = (f'{{}},%.{precision}f,%.{precision}f\n' if batch else f'%.{precision}f,%.{precision}f\n')
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        file.write('engine,x,r\n' if batch else 'x,r\n')
+        for i in range(n):
+            template = (row.format(i) if batch else row) * m
+            file.write(template % tuple(np.column_stack([x[i], r[i]]).ravel()))
+
+
+def write_dxf(path, x, r, precision=4, layer='CONTOUR'):
+    """Points as an ASCII DXF (R12) file, one open POLYLINE per contour in the x-y plane."""
+    x, r = np.atleast_2d(x), np.atleast_2d(r)
+    vertex = f'0\nVERTEX\n8\n{layer}\n10\n%.{precision}f\n20\n%.{precision}f\n30\n0.0\n' * x.shape[1]
+    with open(path, 'w', encoding='ascii', newline='\n') as file:
+        file.write('0\nSECTION\n2\nENTITIES\n')
+        for i in range(x.shape[0]):
+            file.write(f'0\nPOLYLINE\n8\n{layer}\n66\n1\n70\n0\n')
+            file.write(vertex % tuple(np.column_stack([x[i], r[i]]).ravel()))
+            file.write(f'0\nSEQEND\n8\n{layer}\n')
+        file.write('0\nENDSEC\n0\nEOF\n')
+
+
+if __name__ == "__main__":
+    import time
+
+    # hail_hydra2 geometry from the RPA report in main.py [mm, deg]
+    hydra = dict(dc=80.32, dt=31.04, de=82.12, lc=177.26, lcyl=106.81, le=98.33,
+                 b=30.0, r1=23.28, r2=80.33, rn=5.93, tn=22.42, te=8.0)
+    x, r = contour(**hydra, points=1000)
+    i = int(np.argmin(r))
+    print(f"throat at x = {x[i]:.2f} mm, r = {r[i]:.3f} mm; exit x = {x[-1]:.2f} mm, r = {r[-1]:.3f} mm")
+    print(f"max step {np.max(np.hypot(np.diff(x), np.diff(r))):.3f} mm, "
+          f"max radius jump {np.max(np.abs(np.diff(r))):.3f} mm")
+
+    n = 10_000
+    rng = np.random.default_rng(0)
+    batch = {k: v * rng.uniform(0.95, 1.05, n) for k, v in hydra.items()}
+    t0 = time.perf_counter()
+    x, r = contour(**batch, points=1000)
+    elapsed = time.perf_counter() - t0
+    print(f"{n} contours x 1000 points in {elapsed:.2f} s")
@@ -0,0 +1,214 @@
+# of_optimizer.py
+# mixture ratio (O/F) that maximizes specific impulse, replacing RPA's ratio { unit = "optimal" }
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+import engine_model as em
+
+
+#===================== Isp(O/F) providers =====================#
+# a provider is any picklable callable: array of O/F -> array of Isp [s]
+
+def _cubic_spline(x, y):
+    from scipy.interpolate import CubicSpline  # scipy loaded only when a provider is used
+    return CubicSpline(x, y)
+
+
+class TableIspProvider:
+    """
+    Isp(O/F) interpolated over tabulated points, e.g. parsed RPA CSV runs.
+
+    Args:
+    of (array): Mixture ratios.
+    isp (array): Specific impulse at each mixture ratio [s].
+    """
+
+    def __init__(self, of, isp):
+        order = np.argsort(of)
+        self.of = np.asarray(of, dtype=float)[order]
+        self.isp = np.asarray(isp, dtype=float)[order]
+        self._spline = None
+
+    @classmethod
+    def from_store(cls, store, engine=None, table=3, station='vacuum',
+                   parameter='Specific impulse (by weight)'):
+        """Build from an `rpa_csv.RpaStore`, one point per run (Table 3 is ideal, 4 delivered)."""
+        of, isp = [], []
+        for run in store.runs(engine=engine):
+            mask = store.select(table=table, parameter=parameter, station=station)
+            mask &= store.columns['run'] == run
+            if mask.any():
+                of.append(store.run_of[run])
+                isp.append(store.columns['value'][mask][0])
+        return cls(of, isp)
+
+    def __call__(self, of):
+        if self._spline is None:
+            self._spline = _cubic_spline(self.of, self.isp)
+        of = np.clip(of, self.of[0], self.of[-1])
+        return self._spline(of)
+
+    @property
+    def bounds(self):
+        return float(self.of[0]), float(self.of[-1])
+
+
+class AnalyticalIspProvider:
+    """
+    Isp(O/F) from the analytical model of main.py, with gas properties tabulated per O/F.
+
+    Cstar, R and kappa are given on an O/F grid (e.g. from several RPA runs) and
+    interpolated with cubic splines; Isp includes the pressure thrust at ambient `Pa`.
+
+    Args:
+    of (array): O/F grid.
+    Cstar, R, kappa (array): Characteristic velocity [m/s], gas constant [J/kg K]
+        and ratio of specific heats on the grid.
+    P (float): Chamber pressure [Pa].
+    Pa (float): Ambient pressure [Pa], 0 for vacuum.
+    epsilon_i (float): Expansion ratio.
+    """
+
+    def __init__(self, of, Cstar, R, kappa, P, Pa, epsilon_i):
+        self.of = np.asarray(of, dtype=float)
+        self.Cstar = np.asarray(Cstar, dtype=float)
+        self.R = np.asarray(R, dtype=float)
+        self.kappa = np.asarray(kappa, dtype=float)
+        self.P, self.Pa, self.epsilon_i = P, Pa, epsilon_i
+        self._splines = None
+
+    def __call__(self, of):
+        if self._splines is None:
+            self._splines = [_cubic_spline(self.of, y) for y in (self.Cstar, self.R, self.kappa)]
+        of = np.clip(of, self.of[0], self.of[-1])
+        Cstar, R, kappa = (spline(of) for spline in self._splines)
+        M_i = em.exit_mach(kappa, self.epsilon_i)
+        p_i = em.exit_pressure(self.P, kappa, M_i)
+        T = em.chamber_temperature(Cstar, em.temperature_function(kappa), R)
+        Vi = em.exhaust_velocity(kappa, R, T, self.P, p_i)
+        # pressure thrust per unit mass flow: epsilon * Akr * (p_i - Pa) / m_dot
+        return (Vi + self.epsilon_i * Cstar * (p_i - self.Pa) / self.P) / em.g0
+
+    @property
+    def bounds(self):
+        return float(self.of[0]), float(self.of[-1])
+
+
+#===================== search =====================#
+
+@dataclass
+class OptimumResult:
+    of: float
+    isp: float
+    evaluations: int
+    converged: bool
+    history: list = field(default_factory=list)  # one dict per iteration
+
+
+def _evaluate(provider, points, executor):
+    # one task per candidate point so they run on separate workers
+    if executor is None:
+        return np.asarray(provider(np.asarray(points)), dtype=float)
+    futures = [executor.submit(provider, np.array([x])) for x in points]
+    return np.array([float(np.asarray(f.result()).ravel()[0]) for f in futures])
+
+
+def find_optimal_of(provider, bounds=None, points=4, tol=1e-4, max_iter=50, executor=None):
+    """
+    Maximize Isp(O/F) by a parallel section search with a final parabolic (Brent) step.
+
+    Each iteration evaluates `points` equally spaced interior points at once
+    (on `executor` if given) and shrinks the bracket to the neighbours of the
+    best one, a factor of 2 / (points + 1) per iteration. Golden-section search
+    reuses one point per step but can only evaluate one point at a time, so with
+    a pool it is cheaper in wall time to spend more evaluations per step.
+
+    Args:
+    provider (callable): Isp provider, O/F array -> Isp array.
+    bounds (tuple, optional): (low, high) O/F bracket; defaults to `provider.bounds`.
+    points (int): Candidate points per iteration (>= 2), ideally the worker count.
+    tol (float): Absolute tolerance on O/F.
+    max_iter (int): Maximum number of iterations.
+    executor (Executor, optional): e.g. a ProcessPoolExecutor; evaluated in-process if None.
+
+    Returns:
+    OptimumResult: Optimum O/F, its Isp and the convergence history.
+    """
+    low, high = bounds if bounds is not None else provider.bounds
+    points = max(int(points), 2)
+    history, evaluations, converged = [], 0, False
+    best_of, best_isp = None, -np.inf
+
+    for iteration in range(max_iter):
+        candidates = np.linspace(low, high, points + 2)[1:-1]
+        isp = _evaluate(provider, candidates, executor)
+        evaluations += len(candidates)
+        i = int(np.nanargmax(isp))
+        if isp[i] > best_isp:
+            best_of, best_isp = float(candidates[i]), float(isp[i])
+        grid = np.concatenate([[low], candidates, [high]])
+        low, high = float(grid[i]), float(grid[i + 2])
+        history.append({'iteration': iteration, 'of': candidates.tolist(), 'isp': isp.tolist(),
+                        'bracket': (low, high), 'best_of': best_of, 'best_isp': best_isp})
+        if high - low <= tol:
+            converged = True
+            break
+
+    # parabolic interpolation through the bracket and the best point (Brent's step)
+    a, b, c = low, best_of, high
+    if a < b < c:
+        fa, fc = _evaluate(provider, [a, c], executor)
+        fb = best_isp
+        evaluations += 2
+        denominator = (b - a) * (fb - fc) - (b - c) * (fb - fa)
+        if denominator != 0:
+            x = b - 0.5 * ((b - a)**2 * (fb - fc) - (b - c)**2 * (fb - fa)) / denominator
+            if a < x < c:
+                fx = float(_evaluate(provider, [x], executor)[0])
+                evaluations += 1
+                if fx > best_isp:
+                    best_of, best_isp = float(x), fx
+                history.append({'iteration': len(history), 'of': [float(x)], 'isp': [fx],
+                                'bracket': (a, c), 'best_of': best_of, 'best_isp': best_isp})
+    return OptimumResult(best_of, best_isp, evaluations, converged, history)
+
+
+def find_optimal_of_many(providers, bounds=None, points=4, tol=1e-4, max_iter=50, max_workers=None):
+    """
+    Run `find_optimal_of` for several propellant pairs concurrently on one process pool.
+
+    Args:
+    providers (dict): Propellant pair name -> Isp provider.
+    bounds (dict or tuple, optional): Per-pair or shared O/F bracket.
+    max_workers (int, optional): Process pool size.
+
+    Returns:
+    dict: Propellant pair name -> OptimumResult.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as processes, \
+            ThreadPoolExecutor(max_workers=len(providers) or 1) as threads:
+        futures = {
+            name: threads.submit(find_optimal_of, provider,
+                                 bounds.get(name) if isinstance(bounds, dict) else bounds,
+                                 points, tol, max_iter, processes)
+            for name, provider in providers.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+if __name__ == "__main__":
+    # hail_hydra2 gas properties vary with O/F; rough LOX/N2H4 trend around the RPA point
+    of_grid = np.linspace(0.5, 1.4, 10)
+    provider = AnalyticalIspProvider(
+        of_grid,
+        Cstar=1911.3 - 900 * (of_grid - 0.85)**2,
+        R=433.5 - 60 * (of_grid - 0.85),
+        kappa=1.1716 + 0.02 * (of_grid - 0.85),
+        P=180e5, Pa=101325, epsilon_i=7.0)
+    results = find_optimal_of_many({'LOX/N2H4': provider, 'LOX/N2H4 vac': AnalyticalIspProvider(
+        provider.of, provider.Cstar, provider.R, provider.kappa, provider.P, 0.0, 7.0)})
+    for name, result in results.items():
+        print(f"{name}: O/F = {result.of:.4f}, Isp = {result.isp:.2f} s "
+              f"({result.evaluations} evaluations, {len(result.history)} iterations)")
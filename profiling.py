@@ -0,0 +1,190 @@
+# profiling.py
+# opt-in timing of the page sections: wall time, elements and bytes sent per section,
+# rolling per-session history, optional cProfile capture and a metrics file export
+#
+#   RPA_PROFILE=1             time every rerun (or the sidebar toggle, per session)
+#   RPA_PROFILE=cprofile      also capture cProfile stats of each rerun
+#   RPA_PROFILE_FILE=path     write process-wide section metrics (Prometheus text format)
+#   RPA_PROFILE_DIR=dir       dump each cProfile capture as a .prof file
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# histogram bin edges [s], log spaced from 0.1 ms to 10 s
+BINS = np.logspace(-4, 1, 11)
+
+_active = threading.local()  # profiler of the rerun running on this thread
+
+
+def _count_deltas(ctx, run):
+    # shadow the session context's enqueue for this rerun: every element is a delta message,
+    # counted with its serialized size (what the browser receives); streamlit itself is untouched
+    enqueue = ctx.enqueue
+
+    def counted(msg):
+        if msg.HasField('delta'):
+            run.count(msg.ByteSize())
+        enqueue(msg)
+
+    ctx.enqueue = counted
+
+
+def mark(section):
+    """Start timing `section` (ends the previous one); a no-op unless profiling is on."""
+    run = getattr(_active, 'run', None)
+    if run is not None:
+        run.mark(section)
+
+
+class Run:
+    """Timings of one rerun: section -> [seconds, elements, bytes] in page order."""
+
+    def __init__(self):
+        self.sections = {}
+        self.current = None
+        self._t = time.perf_counter()
+        self.start = self._t
+        self.profile_text = None
+
+    def mark(self, section):
+        now = time.perf_counter()
+        if self.current is not None:
+            self.sections[self.current][0] += now - self._t
+        self.current, self._t = section, now
+        self.sections.setdefault(section, [0.0, 0, 0])
+
+    def count(self, nbytes):
+        if self.current is None:
+            self.mark('(pre)')
+        self.sections[self.current][1] += 1
+        self.sections[self.current][2] += nbytes
+
+    def finish(self):
+        now = time.perf_counter()
+        if self.current is not None:
+            self.sections[self.current][0] += now - self._t
+        self.current = None
+        self.total = now - self.start
+
+
+class Profiler:
+    """
+    Rolling section statistics over the last `window` reruns.
+
+    One per session (kept in st.session_state) for the sidebar panel, plus the
+    process-wide `process_profiler` aggregating all sessions for export.
+    """
+
+    def __init__(self, window=200):
+        self.window = window
+        self.history = {}  # section -> deque of (seconds, elements, bytes)
+        self.totals = deque(maxlen=window)
+        self.runs = 0
+        self.last = None
+        self._lock = threading.Lock()
+
+    def record(self, run):
+        with self._lock:
+            self.runs += 1
+            self.totals.append(run.total)
+            for section, values in run.sections.items():
+                self.history.setdefault(section, deque(maxlen=self.window)).append(tuple(values))
+            self.last = run
+
+    def stats(self):
+        """Per section: last/mean/p50/p95 time [ms], elements and bytes of the last run."""
+        with self._lock:
+            rows = []
+            for section, values in self.history.items():
+                seconds = np.array([v[0] for v in values])
+                rows.append({
+                    'section': section,
+                    'last_ms': seconds[-1] * 1e3,
+                    'mean_ms': seconds.mean() * 1e3,
+                    'p50_ms': np.percentile(seconds, 50) * 1e3,
+                    'p95_ms': np.percentile(seconds, 95) * 1e3,
+                    'elements': values[-1][1],
+                    'bytes': values[-1][2],
+                    'samples': len(values),
+                })
+            return rows
+
+    def histogram(self):
+        """Counts of total rerun times in `BINS`."""
+        with self._lock:
+            counts, _ = np.histogram(np.array(self.totals), bins=BINS)
+        labels = [f'{edge * 1e3:.3g} ms' for edge in BINS[:-1]]
+        return dict(zip(labels, counts.tolist()))
+
+    def write_metrics(self, path, prefix='rpa_app'):
+        """Section metrics in Prometheus text format, replaced atomically."""
+        lines = [f'{prefix}_reruns_total {self.runs}']
+        for row in self.stats():
+            label = row['section'].replace('\\', '\\\\').replace('"', '\\"')
+            for quantile, key in (('0.5', 'p50_ms'), ('0.95', 'p95_ms')):
+                lines.append(f'{prefix}_section_seconds{{section="{label}",quantile="{quantile}"}} {row[key] / 1e3:.6f}')
+            lines.append(f'{prefix}_section_elements{{section="{label}"}} {row["elements"]}')
+            lines.append(f'{prefix}_section_bytes{{section="{label}"}} {row["bytes"]}')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+
+
+process_profiler = Profiler()
+
+
+@contextmanager
+def profile_run(st):
+    """
+    Profile one rerun of the page if enabled by RPA_PROFILE or the session toggles.
+
+    Usage (main.py):
+    with profile_run(st):
+        main()
+    """
+    mode = os.environ.get('RPA_PROFILE', '').lower()
+    enabled = bool(mode) or st.session_state.get('profiling', False)
+    if not enabled:
+        yield None
+        return
+    capture = mode == 'cprofile' or st.session_state.get('profiling_cprofile', False)
+
+    profiler = st.session_state.setdefault('profiler', Profiler())
+    run = Run()
+    _active.run = run
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        _count_deltas(ctx, run)
+    profile = cProfile.Profile() if capture else None
+    if profile is not None:
+        profile.enable()
+    try:
+        yield profiler
+    finally:
+        if profile is not None:
+            profile.disable()
+        _active.run = None
+        if ctx is not None:
+            del ctx.enqueue  # back to the class method
+        run.finish()
+        if profile is not None:
+            out = io.StringIO()
+            pstats.Stats(profile, stream=out).sort_stats('cumulative').print_stats(25)
+            run.profile_text = out.getvalue()
+            if os.environ.get('RPA_PROFILE_DIR'):
+                os.makedirs(os.environ['RPA_PROFILE_DIR'], exist_ok=True)
+                profile.dump_stats(os.path.join(os.environ['RPA_PROFILE_DIR'],
+                                                f'rerun_{time.strftime("%Y%m%d-%H%M%S")}_{id(run):x}.prof'))
+        profiler.record(run)
+        process_profiler.record(run)
+        if os.environ.get('RPA_PROFILE_FILE'):
+            process_profiler.write_metrics(os.environ['RPA_PROFILE_FILE'])
@@ -0,0 +1,335 @@
+# report_export.py
+# static reports of the analytical derivation (sections 1-13 and the RPA comparison) for
+# many input sets, as HTML with KaTeX and/or Markdown, rendered on a process pool
+#
+#   python report_export.py --out reports --table inputs.csv          one report per CSV row
+#   python report_export.py --out reports --P 150:200:6 --epsilon 5,7,9 --format html,md
+#   KATEX_DIR=dir             local KaTeX dist (npm katex, dist/) inlined with its fonts, so the
+#                             pages render offline; the default for batch jobs (or --katex-dir),
+#                             without it the pages link KaTeX from the CDN
+import argparse
+import base64
+import csv
+import html
+import inspect
+import os
+import re
+import sys
+import textwrap
+import time
+from concurrent.futures import ProcessPoolExecutor
+from string import Template
+
+import numpy as np
+
+from derivation import SECTIONS
+from engine_comparison import QUANTITIES, compare, rpa_arrays, rpa_inputs
+from engine_model import EngineModel
+from rpa_parser import parse_rpa_output
+
+INPUTS = ('P', 'Pa', 'F', 'epsilon_i', 'd_dkdr', 'Lstar', 'Cstar', 'R', 'kappa', 'OF', 'dkr')
+
+# sidebar defaults of main.py, SI units
+DEFAULT_INPUTS = dict(P=180e5, Pa=101325.0, F=22e3, epsilon_i=7.0, d_dkdr=3.0, Lstar=1.0,
+                      Cstar=1892.5, R=433.5, kappa=1.1716, OF=0.848, dkr=0.03104)
+
+KATEX_VERSION = '0.16.9'
+KATEX_CDN = f'https://cdn.jsdelivr.net/npm/katex@{KATEX_VERSION}/dist'
+
+# builder -> argument names, resolved once (same wiring by name as compute_graph)
+_PARAMETERS = {key: tuple(inspect.signature(builder).parameters) for key, builder in SECTIONS.items()}
+
+HTML_PAGE = Template("""<!DOCTYPE html>
+<html lang="sr">
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+$katex
+<style>
+body { font-family: sans-serif; max-width: 60em; margin: 2em auto; padding: 0 1em; line-height: 1.5; }
+h2 { font-family: monospace; font-size: 1.05em; background: #f3f3f3; padding: .4em .6em; }
+blockquote { border-left: 4px solid #4a90d9; margin: .5em 0; padding: .2em .8em; }
+.help { color: #777; font-size: .85em; }
+table { border-collapse: collapse; font-size: .9em; }
+th, td { border: 1px solid #ccc; padding: .3em .6em; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+</style>
+</head>
+<body>
+<h1>$title</h1>
+$inputs
+$sections
+$comparison
+</body>
+</html>
+""")
+
+MARKDOWN_PAGE = Template("""# $title
+
+$inputs
+
+$sections
+
+$comparison
+""")
+
+# font formats of a KaTeX @font-face src list, smallest first, and their MIME types
+_FONT_TYPES = {'woff2': 'font/woff2', 'woff': 'font/woff', 'truetype': 'font/ttf'}
+_FONT_SRC = re.compile(r'src:([^;}]*)')
+_FONT_URL = re.compile(r'url\((fonts/[^)]+)\)\s*format\(["\']?(\w+)["\']?\)')
+
+# KaTeX auto-render: $$...$$ display and $...$ inline, as st.markdown
+_KATEX_RENDER = """renderMathInElement(document.body, {delimiters: [
+  {left: '$$', right: '$$', display: true}, {left: '$', right: '$', display: false}],
+  throwOnError: false});"""
+
+
+def katex_head(katex_dir=None):
+    """
+    KaTeX <head> block: CDN links, or the files of a local KaTeX dist inlined so the
+    page is self-contained, fonts included as data URIs (one format per font, woff2 first).
+
+    Args:
+    katex_dir (str, optional): Directory with katex.min.css, katex.min.js, contrib/auto-render.min.js
+        and fonts/.
+
+    Returns:
+    str: HTML for the page head.
+    """
+    if katex_dir is None:
+        return (f'<link rel="stylesheet" href="{KATEX_CDN}/katex.min.css">\n'
+                f'<script defer src="{KATEX_CDN}/katex.min.js"></script>\n'
+                f'<script defer src="{KATEX_CDN}/contrib/auto-render.min.js" '
+                f'onload="{html.escape(_KATEX_RENDER)}"></script>')
+
+    def read(name):
+        with open(os.path.join(katex_dir, name), encoding='utf-8') as file:
+            return file.read()
+    css = _FONT_SRC.sub(lambda match: f'src:{_inline_font(katex_dir, match.group(1))}', read('katex.min.css'))
+    return (f'<style>{css}</style>\n<script>{read("katex.min.js")}</script>\n'
+            f'<script>{read("contrib/auto-render.min.js")}</script>\n'
+            f'<script>document.addEventListener("DOMContentLoaded", function () {{ {_KATEX_RENDER} }});</script>')
+
+
+def _inline_font(katex_dir, sources):
+    # the smallest format present in the dist, as a data URI
+    found = {kind: path for path, kind in _FONT_URL.findall(sources)}
+    for kind, mime in _FONT_TYPES.items():
+        path = os.path.join(katex_dir, found[kind]) if kind in found else None
+        if path and os.path.exists(path):
+            with open(path, 'rb') as file:
+                data = base64.b64encode(file.read()).decode('ascii')
+            return f'url(data:{mime};base64,{data}) format("{kind}")'
+    raise FileNotFoundError(f"no font of {sources.strip()} in {katex_dir}")
+
+
+#===================== rendering =====================#
+
+def _lines(step):
+    # markdown lines of a step as on the page with all derivations shown
+    for line, help_text in ((step.formula, None), (step.substituted, step.help), (step.result, None)):
+        if line:
+            yield textwrap.dedent(line).strip(), help_text
+
+
+def _section_html(section):
+    parts = [f'<h2>{html.escape(section.title)}</h2>']
+    for step in section.steps:
+        for line, help_text in _lines(step):
+            if line.startswith('>'):
+                parts.append(f'<blockquote>{html.escape(line[1:].strip())}</blockquote>')
+            else:
+                parts.append(f'<p>{html.escape(line)}</p>')
+            if help_text:
+                parts.append(f'<p class="help">{html.escape(help_text)}</p>')
+    return '\n'.join(parts)
+
+
+def _section_markdown(section):
+    parts = [f'### {section.title}']
+    for step in section.steps:
+        for line, help_text in _lines(step):
+            parts.append(line)
+            if help_text:
+                parts.append(f'*{help_text}*')
+    return '\n\n'.join(parts)
+
+
+_INPUT_LABELS = (('P', 'P', 'Pa'), ('Pa', 'Pa', 'Pa'), ('F', 'F', 'N'), ('epsilon_i', 'ε', '-'),
+                 ('d_dkdr', 'Dk/dkr', '-'), ('Lstar', 'L*', 'm'), ('Cstar', 'C*', 'm/s'),
+                 ('R', 'R', 'J/kgK'), ('kappa', 'κ', '-'), ('OF', 'O/F', '-'), ('dkr', 'dkr', 'm'))
+
+
+def _table(header, rows, markdown):
+    if markdown:
+        lines = ['| ' + ' | '.join(header) + ' |', '|' + '---|' * len(header)]
+        lines += ['| ' + ' | '.join(row) + ' |' for row in rows]
+        return '\n'.join(lines)
+    head = ''.join(f'<th>{html.escape(cell)}</th>' for cell in header)
+    body = ''.join('<tr>' + ''.join(f'<td>{html.escape(cell)}</td>' for cell in row) + '</tr>' for row in rows)
+    return f'<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+
+
+def render(title, values, comparison=None, markdown=False, katex=''):
+    """
+    One report page.
+
+    Args:
+    title (str): Page title.
+    values (dict): Scalar inputs and `EngineResult` fields of one engine.
+    comparison (list, optional): (quantity key, RPA, analytical, difference, percent) rows.
+    markdown (bool): Markdown instead of HTML.
+    katex (str): HTML head block from `katex_head`.
+
+    Returns:
+    str: The page.
+    """
+    sections = [builder(**{name: values[name] for name in _PARAMETERS[key]})
+                for key, builder in SECTIONS.items()]
+    inputs = _table(['ulaz', 'vrednost', 'jedinica'],
+                    [[label, f'{values[key]:.6g}', unit] for key, label, unit in _INPUT_LABELS], markdown)
+    compared = ''
+    if comparison:
+        rows = [[QUANTITIES[key][0], QUANTITIES[key][1], f'{rpa:.4f}', f'{analytical:.4f}',
+                 f'{difference:.4f}', f'{percent:.2f}%']
+                for key, rpa, analytical, difference, percent in comparison]
+        table = _table(['Parametar', 'Jedinica', 'RPA', 'Analitički', 'Razlika', '% Razlika'], rows, markdown)
+        compared = f'### Poređenje rezultata\n\n{table}' if markdown else f'<h2>Poređenje rezultata</h2>\n{table}'
+    if markdown:
+        return MARKDOWN_PAGE.substitute(title=title, inputs=inputs, comparison=compared,
+                                        sections='\n\n'.join(map(_section_markdown, sections)))
+    return HTML_PAGE.substitute(title=html.escape(title), katex=katex, inputs=inputs, comparison=compared,
+                                sections='\n'.join(map(_section_html, sections)))
+
+
+def _complete(case):
+    # Cstar, OF and dkr from the RPA report where not given, as on the page
+    derived = {}
+    if case.get('rpa_response'):
+        rpa = parse_rpa_output(case['rpa_response'])
+        if rpa.missing:
+            raise ValueError(f"report {case['name']!r}: RPA output is missing {', '.join(rpa.missing)}")
+        derived = {name: float(value[0]) for name, value in rpa_inputs(rpa_arrays([rpa])).items()}
+    return {**DEFAULT_INPUTS, **derived, **case}
+
+
+def render_chunk(cases, out_dir, formats=('html',), katex=''):
+    """
+    Evaluate a chunk of input sets in one vectorized pass and write their reports.
+
+    Args:
+    cases (list): Complete input dicts (`INPUTS`, SI units) with 'name' and optional 'rpa_response'.
+    out_dir (str): Output directory.
+    formats (tuple): 'html' and/or 'md'.
+    katex (str): HTML head block from `katex_head`.
+
+    Returns:
+    list: Written paths.
+    """
+    arrays = {name: np.array([case[name] for case in cases], dtype=float) for name in INPUTS}
+    result = EngineModel(**arrays).evaluate().to_dict()
+    with_rpa = [i for i, case in enumerate(cases) if case.get('rpa_response')]
+    rows = {}
+    if with_rpa:
+        comparison = compare([cases[i]['rpa_response'] for i in with_rpa],
+                             **{name: arrays[name][with_rpa] for name in INPUTS})
+        for j, i in enumerate(with_rpa):
+            rows[i] = list(zip(comparison.quantities, comparison.rpa[j], comparison.analytical[j],
+                               comparison.difference[j], comparison.percent[j]))
+
+    paths = []
+    for i, case in enumerate(cases):
+        values = {**{name: float(arrays[name][i]) for name in INPUTS},
+                  **{name: float(value[i]) for name, value in result.items()}}
+        for extension in formats:
+            text = render(case['name'], values, rows.get(i), markdown=extension == 'md', katex=katex)
+            path = os.path.join(out_dir, f"{case['name']}.{extension}")
+            with open(path, 'w', encoding='utf-8', newline='\n') as file:
+                file.write(text)
+            paths.append(path)
+    return paths
+
+
+def export_reports(cases, out_dir, formats=('html',), workers=None, chunk_size=50,
+                   katex_dir=None, name_format='report_{index:05d}'):
+    """
+    Write one report per input set, plus an index.csv of the inputs.
+
+    Example:
+    export_reports([{'P': p * 1e5, 'rpa_response': text} for p in (150, 180, 200)], 'reports')
+
+    Args:
+    cases (list): Input dicts: `INPUTS` in SI units (`DEFAULT_INPUTS` where omitted),
+        optional 'name' and 'rpa_response' (RPA report text; gives Cstar, OF and dkr when
+        those are omitted, and adds the comparison table).
+    out_dir (str): Output directory.
+    formats (tuple): 'html' (KaTeX) and/or 'md'.
+    workers (int, optional): Processes; 1 renders in this process.
+    chunk_size (int): Reports per task.
+    katex_dir (str, optional): Local KaTeX dist to inline (see `katex_head`); CDN links otherwise.
+    name_format (str): File name for cases without 'name'.
+
+    Returns:
+    list: Written paths, in input order.
+    """
+    cases = [_complete({'name': name_format.format(index=index), **case}) for index, case in enumerate(cases)]
+    os.makedirs(out_dir, exist_ok=True)
+    katex = katex_head(katex_dir) if 'html' in formats else ''
+    chunks = [cases[i:i + chunk_size] for i in range(0, len(cases), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) == 1:
+        parts = [render_chunk(chunk, out_dir, formats, katex) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(render_chunk, chunks, [out_dir] * len(chunks),
+                                      [formats] * len(chunks), [katex] * len(chunks)))
+
+    with open(os.path.join(out_dir, 'index.csv'), 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['name', *INPUTS, 'rpa'])
+        for case in cases:
+            writer.writerow([case['name'], *(case[name] for name in INPUTS), bool(case.get('rpa_response'))])
+    return [path for part in parts for path in part]
+
+
+def main(argv=None):
+    from sweep import parse_axis
+
+    parser = argparse.ArgumentParser(description="Batch export of the analytical derivation as HTML/Markdown reports.")
+    parser.add_argument('--out', required=True, help="output directory")
+    parser.add_argument('--table', help="CSV with one input set per row (columns: name and INPUTS, SI units)")
+    parser.add_argument('--rpa', help="RPA report text file; gives Cstar, OF, dkr and the comparison table")
+    parser.add_argument('--P', default='180', help="chamber pressure [bar], 'a:b:n' or 'a,b,c'")
+    parser.add_argument('--epsilon', default='7', help="nozzle expansion ratio epsilon_i")
+    parser.add_argument('--F', default='22', help="thrust [kN]")
+    parser.add_argument('--format', default='html', help="html, md or html,md")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--katex-dir', default=os.environ.get('KATEX_DIR'),
+                        help="local KaTeX dist to inline with its fonts, so the pages render offline "
+                             "(default KATEX_DIR; CDN links without it)")
+    args = parser.parse_args(argv)
+
+    rpa = None
+    if args.rpa:
+        with open(args.rpa, encoding='utf-8') as file:
+            rpa = file.read()
+    if args.table:
+        with open(args.table, encoding='utf-8', newline='') as file:
+            cases = [{key: value if key == 'name' else float(value) for key, value in row.items() if value != ''}
+                     for row in csv.DictReader(file)]
+    else:
+        cases = [{'P': P * 1e5, 'epsilon_i': epsilon, 'F': F * 1e3}
+                 for P in parse_axis(args.P) for epsilon in parse_axis(args.epsilon) for F in parse_axis(args.F)]
+    if rpa:
+        cases = [{'rpa_response': rpa, **case} for case in cases]
+
+    if args.katex_dir is None and 'html' in args.format:
+        print("no --katex-dir/KATEX_DIR: HTML pages link KaTeX from the CDN and need network access to render math",
+              file=sys.stderr)
+    t0 = time.perf_counter()
+    paths = export_reports(cases, args.out, tuple(args.format.split(',')), args.workers, katex_dir=args.katex_dir)
+    print(f"{len(paths)} files for {len(cases)} reports in {args.out} ({time.perf_counter() - t0:.2f} s)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+# result_cache.py
+# process-wide cache of analytical results and derivation sections, shared by all sessions:
+# sessions with the same RPA text and sidebar inputs reuse one evaluation of the chain
+#
+#   RESULT_CACHE_DIR=dir      also keep entries on disk (shared across restarts and workers);
+#                             entries are pickles, so the directory must be private to the
+#                             user running the app (created 0700, refused if others can write)
+#   RESULT_CACHE_TTL=seconds  entry lifetime, default one day
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def result_key(values):
+    """
+    Canonical hash of named inputs: order independent, numbers by float value (so 180 and 180.0
+    are the same input), text by content.
+
+    Args:
+    values (dict): Input values by name (floats, strings, arrays).
+
+    Returns:
+    str: sha256 hex digest.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(values):
+        value = values[name]
+        if isinstance(value, (bool, int, float, np.number)):
+            text = f'f{float(value)!r}'
+        elif isinstance(value, str):
+            text = f's{value}'
+        elif isinstance(value, np.ndarray):
+            text = f'a{value.shape}{value.dtype.str}{value.tobytes().hex()}'
+        else:
+            text = f'r{value!r}'
+        digest.update(f'{name}\0{len(text)}\0{text}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    LRU cache of picklable values with a time-to-live, bounded by entry count and by
+    pickled size. Optionally backed by a directory of <key>.pkl files, read on a memory
+    miss, with its own byte budget (oldest files removed first). Unpickling runs code, so
+    the directory must belong to this user with no group/other write access (checked here),
+    and only files owned by this user are read.
+
+    One instance per process (`result_cache` below). Thread-safe; values are shared
+    between sessions and must not be mutated.
+
+    Args:
+    max_entries (int): Entries kept in memory.
+    max_bytes (int): Budget for pickled entry sizes in memory.
+    ttl (float): Seconds an entry stays valid, in memory and on disk.
+    directory (str, optional): On-disk store, private to the user running the app.
+    max_disk_bytes (int): Budget for the on-disk store.
+    """
+
+    def __init__(self, max_entries=4096, max_bytes=64 * 1024 * 1024, ttl=86400.0, directory=None,
+                 max_disk_bytes=512 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.directory = _private_directory(directory) if directory else None
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()  # key -> (expires, nbytes, value)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.nbytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+    def get(self, key):
+        """Cached value, or None when absent or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return entry[2]
+                self.expirations += 1
+                self._remove(key)
+        data = self._read(key, now)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        value = pickle.loads(data)
+        self._insert(key, value, len(data), now)
+        return value
+
+    def put(self, key, value):
+        """Store a value (replacing an entry with the same key)."""
+        now = time.time()
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._insert(key, value, len(data), now)
+        if self.directory:
+            self._write(key, data)
+
+    def _insert(self, key, value, nbytes, now):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (now + self.ttl, nbytes, value)
+            self.nbytes += nbytes
+            while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, nbytes, _ = self._entries.pop(key)
+        self.nbytes -= nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    #===================== disk =====================#
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.pkl')
+
+    def _read(self, key, now):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+            if not _owned(stat):
+                return None
+            if stat.st_mtime + self.ttl <= now:
+                os.remove(path)
+                with self._lock:
+                    self.expirations += 1
+                return None
+            with open(path, 'rb') as file:
+                return file.read()
+        except OSError:  # absent, or removed by another worker meanwhile
+            return None
+
+    def _write(self, key, data):
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % 32 == 0
+        if prune:
+            self.prune_disk()
+
+    def prune_disk(self):
+        """Remove expired files, then the oldest until the store fits `max_disk_bytes`."""
+        now = time.time()
+        files = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.pkl'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            if mtime + self.ttl > now and total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.disk_evictions += 1
+
+    #===================== metrics =====================#
+
+    def stats(self):
+        """Counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'expirations': self.expirations,
+                'evictions': self.evictions,
+                'disk_evictions': self.disk_evictions,
+                'entries': len(self._entries),
+                'bytes': self.nbytes,
+                'hit_ratio': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    def write_stats(self, path, prefix='result_cache'):
+        """Write counters in Prometheus text format."""
+        lines = [f'{prefix}_{name} {value}' for name, value in self.stats().items()]
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+
+
+def _owned(stat):
+    return not hasattr(os, 'getuid') or stat.st_uid == os.getuid()
+
+
+def _private_directory(directory):
+    # pickles are only safe to load from a directory no one else can write to
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    stat = os.stat(directory)
+    if not _owned(stat) or stat.st_mode & 0o022:
+        raise PermissionError(f"result cache directory {directory} must be owned by this user and not "
+                              f"writable by group or others (chmod 700)")
+    return directory
+
+
+result_cache = ResultCache(directory=os.environ.get('RESULT_CACHE_DIR'),
+                           ttl=float(os.environ.get('RESULT_CACHE_TTL', 86400.0)))
+
+
+def shared_evaluate(graph, inputs, targets, cache=None):
+    """
+    `graph.evaluate` through the shared cache: the values of `targets` and their ancestors
+    are looked up by the targets and the inputs they depend on, preloaded into the session
+    graph on a hit, and stored for other sessions on a miss.
+
+    Example:
+    values = shared_evaluate(graph, {'P': 180e5, ...}, targets=['lk', 'derivation_4'])
+
+    Args:
+    graph (ComputeGraph): Session graph (compute_graph.engine_graph).
+    inputs (dict): New input values, merged with those of earlier calls.
+    targets (list): Nodes to evaluate.
+    cache (ResultCache, optional): `result_cache` by default.
+
+    Returns:
+    dict: Current graph values, as `graph.evaluate`.
+    """
+    cache = cache or result_cache
+    values = {**graph.values, **inputs}
+    names = graph.inputs_of(targets)
+    # targets with the same inputs (e.g. derivation_8 and derivation_8d) get their own entries
+    key = result_key({**{name: values[name] for name in names if name in values},
+                      '(targets)': ','.join(sorted(targets))})
+    cached = cache.get(key)
+    if cached is not None:
+        graph.preload(cached)
+    values = graph.evaluate(inputs, targets)
+    if cached is None:
+        nodes = graph.upstream(targets)
+        cache.put(key, {name: values[name] for name in (*names, *nodes) if name in values})
+    return values
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    import engine_model as em
+    from compute_graph import ENGINE_NODES, engine_graph
+    from rpa_standin import design_report
+    from rpa_cfg import load
+
+    # sessions opening the page with the default inputs (or one of a few variants)
+    rpa_response = design_report(load(os.path.join('rpa', 'hail_hydra2.cfg')), 1892.5, 433.5, 1.1716, 0.848)
+    base = dict(P=180e5, Pa=101325.0, F_kN=22.0, epsilon_i=7.0, d_dkdr=3.0, Lstar=1.0,
+                Cstar=1892.5, R=433.5, kappa=1.1716, OF=0.848, dkr=0.03104,
+                M_i=float(em.exit_mach(1.1716, 7.0)))
+    targets = [*ENGINE_NODES, *(f'derivation_{key}' for key in ('1', '5', '11', '13'))]
+
+    def session(i, cache):
+        graph = engine_graph()
+        inputs = {**base, 'rpa_response': rpa_response, 'P': (150 + 10 * (i % 4)) * 1e5}
+        if cache is None:
+            graph.evaluate(inputs, targets)
+        else:
+            shared_evaluate(graph, inputs, targets, cache)
+        return len(graph.recomputed)
+
+    for label, cache in (('per session', None), ('shared', ResultCache())):
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(8) as executor:
+            recomputed = sum(executor.map(lambda i: session(i, cache), range(400)))
+        elapsed = time.perf_counter() - t0
+        print(f"{label:11s}: 400 sessions in {elapsed:.2f} s, {recomputed} node evaluations"
+              + (f", {cache.stats()}" if cache else ''))
@@ -0,0 +1,256 @@
+# rpa_cache.py
+# process-wide cache for RPA artifacts (rpa/*.html, assets/*.png), shared by all sessions
+import os
+import threading
+from collections import OrderedDict
+from html.parser import HTMLParser
+
+
+class _TableParser(HTMLParser):
+    # collects <table> contents, titled by the preceding <u> text as in RPA reports, and the
+    # paragraphs of text between tables (notes such as the optimum expansion altitude)
+    def __init__(self):
+        super().__init__()
+        self.tables = []
+        self.blocks = []  # ('table', table) or ('text', markdown) in document order
+        self._text = []
+        self.title = ''
+        self._in_title = False
+        self._table = None
+        self._row = None
+        self._header_row = False
+        self._cell = None
+        self._colspan = 1
+
+    def handle_starttag(self, tag, attrs):
+        if self._table is None and tag in ('p', 'div', 'br', 'table'):
+            self._flush_text()
+        if tag == 'u':
+            self._in_title, self.title = True, ''
+        elif tag == 'table':
+            self._table = {'title': self.title, 'header': [], 'rows': []}
+        elif tag == 'tr' and self._table is not None:
+            self._row, self._header_row = [], True
+        elif tag in ('td', 'th') and self._row is not None:
+            self._cell = []
+            self._colspan = int(dict(attrs).get('colspan') or 1)
+            self._header_row &= tag == 'th'
+        elif tag == 'br' and self._cell is not None:
+            self._cell.append(' ')
+        elif tag == 'b' and self._table is None:
+            self._text.append('**')
+
+    def handle_endtag(self, tag):
+        if tag == 'u':
+            self._in_title = False
+        elif tag in ('td', 'th') and self._cell is not None:
+            text = ' '.join(''.join(self._cell).split())
+            self._row.extend([text] + [''] * (self._colspan - 1))
+            self._cell = None
+        elif tag == 'tr' and self._row is not None:
+            if self._row:
+                key = 'header' if self._header_row and not self._table['rows'] else 'rows'
+                self._table[key].append(self._row)
+            self._row = None
+        elif tag == 'table' and self._table is not None:
+            self.tables.append(self._table)
+            self.blocks.append(('table', self._table))
+            self._table = None
+        elif tag == 'b' and self._table is None:
+            self._text.append('**')
+        elif tag in ('p', 'div', 'body') and self._table is None:
+            self._flush_text()
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+        elif self._in_title:
+            self.title += data
+        elif self._table is None:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+
+    def _flush_text(self):
+        # bold around a table title leaves an empty '****'
+        text = ' '.join(''.join(self._text).split()).replace('****', '').strip()
+        self._text = []
+        if text:
+            self.blocks.append(('text', text))
+
+
+def parse_html_tables(html):
+    """
+    Parse RPA HTML output into dataframes.
+
+    Args:
+    html (str): RPA HTML report (or one of its sections).
+
+    Returns:
+    list: (title, DataFrame) per table, numeric columns converted to floats (blank cells -> NaN).
+    """
+    return [block for block in parse_html_report(html) if isinstance(block, tuple)]
+
+
+def parse_html_report(html):
+    """
+    Parse RPA HTML output into its tables and the text outside them, in document order.
+
+    Args:
+    html (str): RPA HTML report (or one of its sections).
+
+    Returns:
+    list: (title, DataFrame) per table as `parse_html_tables`, and a markdown string
+    (bold kept) per paragraph of text outside the tables.
+    """
+    import pandas as pd  # ~0.4 s, loaded on the first table instead of at app start (warmup.py)
+
+    parser = _TableParser()
+    parser.feed(html)
+    parser.close()
+    blocks = []
+    for kind, block in parser.blocks:
+        blocks.append(_frame(block, pd) if kind == 'table' else block)
+    return blocks
+
+
+def _frame(table, pd):
+    width = max(len(row) for row in table['header'] + table['rows']) if table['rows'] else 0
+    rows = [row + [''] * (width - len(row)) for row in table['rows']]
+    columns = table['header'][-1] if table['header'] else [''] * width
+    columns = columns + [''] * (width - len(columns))
+    frame = pd.DataFrame(rows, columns=_unique(columns))
+    for column in frame.columns:
+        converted = pd.to_numeric(frame[column], errors='coerce')
+        filled = frame[column] != ''
+        if filled.any() and converted[filled].notna().all():
+            frame[column] = converted
+    return table['title'], frame
+
+
+def _unique(columns):
+    # dataframes need unique, non-empty column names
+    seen, names = {}, []
+    for column in columns:
+        column = column or ' '
+        seen[column] = seen.get(column, 0) + 1
+        names.append(column if seen[column] == 1 else column + ' ' * (seen[column] - 1))
+    return names
+
+
+class ArtifactCache:
+    """
+    Size-bounded LRU cache of file contents, invalidated when a file's mtime or size changes.
+    Entries are charged by file size.
+
+    One instance per process (`artifact_cache` below), so every Streamlit session
+    reuses the same parsed artifacts. Thread-safe.
+
+    Args:
+    max_bytes (int): Budget for cached contents; least recently used entries are evicted.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (path, kind) -> (stamp, nbytes, value)
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, path, kind, loader):
+        """Cached `loader(path)`, reloaded when the file changed since it was cached."""
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        key = (os.path.abspath(path), kind)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[2]
+            self.misses += 1
+            if entry is not None:
+                self.invalidations += 1
+                self._remove(key)
+
+        value = loader(path)
+        nbytes = stat.st_size
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if nbytes <= self.max_bytes:
+                self._entries[key] = (stamp, nbytes, value)
+                self.nbytes += nbytes
+                while self.nbytes > self.max_bytes:
+                    self._remove(next(iter(self._entries)))
+                    self.evictions += 1
+        return value
+
+    def _remove(self, key):
+        _, nbytes, _ = self._entries.pop(key)
+        self.nbytes -= nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """Counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.nbytes,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+    def write_stats(self, path, prefix='rpa_artifact_cache'):
+        """Write counters in Prometheus text format (e.g. for a node_exporter textfile collector)."""
+        lines = [f'{prefix}_{name} {value}' for name, value in self.stats().items()]
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+
+
+artifact_cache = ArtifactCache()
+
+
+def _read_text(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+def _read_bytes(path):
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+def read_text(path):
+    """File contents as text, cached."""
+    return artifact_cache.get(path, 'text', _read_text)
+
+
+def read_bytes(path):
+    """File contents as bytes (images), cached."""
+    return artifact_cache.get(path, 'bytes', _read_bytes)
+
+
+def read_report(path):
+    """Tables and text of an RPA HTML file (`parse_html_report`), cached."""
+    return artifact_cache.get(path, 'report', lambda p: parse_html_report(_read_text(p)))
+
+
+def read_tables(path):
+    """Tables of an RPA HTML file as (title, DataFrame) pairs, cached."""
+    return [block for block in read_report(path) if isinstance(block, tuple)]
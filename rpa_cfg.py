@@ -0,0 +1,331 @@
+# rpa_cfg.py
+# RPA engine definitions (.cfg, libconfig format): parser, writer and batch variant generation
+import csv
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# groups -> dict, lists ( ) -> list, arrays [ ] -> tuple, scalars -> bool/int/float/str
+_TOKENS = re.compile(r'''
+    (?P<skip>\s+|\#[^\n]*|//[^\n]*|/\*.*?\*/)
+  | (?P<string>"(?:[^"\\]|\\.)*")
+  | (?P<bool>(?i:true|false)\b)
+  | (?P<float>[-+]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)|[-+]?(?:\d+\.\d*|\.\d+))
+  | (?P<hex>0[xX][0-9a-fA-F]+L{0,2})
+  | (?P<int>[-+]?\d+L{0,2})
+  | (?P<name>[A-Za-z*][-A-Za-z0-9_*]*)
+  | (?P<punct>[=:;,{}()\[\]])
+''', re.VERBOSE | re.DOTALL)
+
+_ESCAPES = {'n': '\n', 'r': '\r', 't': '\t', 'f': '\f', '\\': '\\', '"': '"'}
+
+
+class CfgError(ValueError):
+    pass
+
+
+def _tokenize(text):
+    tokens = []
+    position, end = 0, len(text)
+    while position < end:
+        match = _TOKENS.match(text, position)
+        if match is None:
+            raise CfgError(f"unexpected character {text[position]!r} at offset {position}")
+        kind = match.lastgroup
+        if kind != 'skip':
+            tokens.append((kind, match.group()))
+        position = match.end()
+    tokens.append(('end', ''))
+    return tokens
+
+
+def _unescape(literal):
+    return re.sub(r'\\(x[0-9a-fA-F]{2}|.)',
+                  lambda m: chr(int(m.group(1)[1:], 16)) if m.group(1)[0] == 'x'
+                  else _ESCAPES.get(m.group(1), m.group(1)),
+                  literal[1:-1])
+
+
+class _Parser:
+    def __init__(self, text):
+        self.tokens = _tokenize(text)
+        self.i = 0
+
+    def expect(self, value):
+        kind, token = self.tokens[self.i]
+        if token != value:
+            raise CfgError(f"expected {value!r}, got {token or 'end of file'!r}")
+        self.i += 1
+
+    def settings(self, closing):
+        group = {}
+        while self.tokens[self.i][1] != closing:
+            kind, name = self.tokens[self.i]
+            if kind != 'name':
+                raise CfgError(f"expected a setting name, got {name or 'end of file'!r}")
+            self.i += 1
+            if self.tokens[self.i][1] not in ('=', ':'):
+                raise CfgError(f"expected '=' or ':' after {name!r}")
+            self.i += 1
+            group[name] = self.value()
+            if self.tokens[self.i][1] in (';', ','):
+                self.i += 1
+        return group
+
+    def value(self):
+        kind, token = self.tokens[self.i]
+        self.i += 1
+        if token == '{':
+            group = self.settings('}')
+            self.expect('}')
+            return group
+        if token in ('(', '['):
+            closing = ')' if token == '(' else ']'
+            items = []
+            while self.tokens[self.i][1] != closing:
+                items.append(self.value())
+                if self.tokens[self.i][1] == ',':
+                    self.i += 1
+            self.expect(closing)
+            return items if token == '(' else tuple(items)
+        if kind == 'string':
+            parts = [_unescape(token)]
+            while self.tokens[self.i][0] == 'string':  # adjacent literals concatenate
+                parts.append(_unescape(self.tokens[self.i][1]))
+                self.i += 1
+            return ''.join(parts)
+        if kind == 'bool':
+            return token.lower() == 'true'
+        if kind == 'float':
+            return float(token)
+        if kind == 'int':
+            return int(token.rstrip('L'))
+        if kind == 'hex':
+            return int(token.rstrip('L'), 16)
+        raise CfgError(f"unexpected {token or 'end of file'!r}")
+
+
+def loads(text):
+    """
+    Parse an RPA .cfg (libconfig) document.
+
+    Args:
+    text (str): File contents.
+
+    Returns:
+    dict: Top-level settings in file order; groups are dicts, lists ( ) are lists,
+    arrays [ ] are tuples.
+    """
+    parser = _Parser(text)
+    config = parser.settings('')
+    if parser.tokens[parser.i][0] != 'end':
+        raise CfgError(f"unexpected {parser.tokens[parser.i][1]!r}")
+    return config
+
+
+def load(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return loads(file.read())
+
+
+#===================== writer =====================#
+# same layout as RPA (libconfig's config_write), so RPA's own files round-trip byte for byte
+
+def _scalar(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        text = repr(value)
+        return text if ('.' in text or 'e' in text or 'n' in text) else text + '.0'
+    if isinstance(value, str):
+        escaped = (value.replace('\\', '\\\\').replace('"', '\\"')
+                   .replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t'))
+        return f'"{escaped}"'
+    raise TypeError(f"cannot write {type(value).__name__} to a .cfg file")
+
+
+def _write_value(out, value, depth):
+    if isinstance(value, dict):
+        if depth > 0:
+            out.append('\n' + '  ' * (depth - 1))
+        out.append('{\n')
+        _write_settings(out, value, depth)
+        out.append('  ' * (depth - 1) + '}' if depth > 0 else '}')
+    elif isinstance(value, (list, tuple)):
+        opening, closing = ('(', ')') if isinstance(value, list) else ('[', ']')
+        out.append(opening + ' ')
+        for n, item in enumerate(value):
+            _write_value(out, item, depth + 1)
+            out.append(', ' if n < len(value) - 1 else ' ')
+        out.append(closing)
+    else:
+        out.append(_scalar(value))
+
+
+def _write_settings(out, group, depth):
+    indent = '  ' * depth
+    for name, value in group.items():
+        if isinstance(value, dict):
+            out.append(f'{indent}{name} : \n{indent}{{\n')
+            _write_settings(out, value, depth + 1)
+            out.append(f'{indent}}};\n')
+        else:
+            out.append(f'{indent}{name} = ')
+            _write_value(out, value, depth + 1)
+            out.append(';\n')
+
+
+def dumps(config):
+    """Serialize settings parsed by `loads` (or built by hand) to .cfg text."""
+    out = []
+    _write_settings(out, config, 0)
+    return ''.join(out)
+
+
+def dump(config, path):
+    with open(path, 'w', encoding='utf-8', newline='\n') as file:
+        file.write(dumps(config))
+
+
+#===================== batch variants =====================#
+
+# parameter table columns -> setting paths (any other column is taken as a dotted path)
+PARAMETERS = {
+    'pressure': 'combustionChamberConditions.pressure.value',
+    'areaRatio': 'nozzleFlow.nozzleExitConditions.areaRatio',
+    'contractionAreaRatio': 'nozzleFlow.nozzleInletConditions.contractionAreaRatio',
+    'OF': 'propellant.components.ratio',
+    'ambient': 'engineSize.ambientConditions.value',
+    'thrust': 'engineSize.thrust.value',
+}
+
+
+def with_setting(config, path, value):
+    """Copy of `config` with the dotted `path` set to `value`; untouched groups are shared."""
+    head, _, rest = path.partition('.')
+    updated = dict(config)
+    updated[head] = with_setting(config.get(head, {}), rest, value) if rest else value
+    return updated
+
+
+def get_setting(config, path):
+    for name in path.split('.'):
+        config = config[name]
+    return config
+
+
+def variant(base, parameters, name=None):
+    """
+    Engine definition `base` with the given parameters applied.
+
+    Args:
+    base (dict): Parsed .cfg.
+    parameters (dict): `PARAMETERS` keys or dotted setting paths -> value. `OF` sets the
+        mixture ratio with unit "O/F" (replacing RPA's "optimal").
+    name (str, optional): New engine name.
+
+    Returns:
+    dict: The variant configuration.
+    """
+    config = base if name is None else with_setting(base, 'name', name)
+    for key, value in parameters.items():
+        if key == 'OF':
+            value = {'value': float(value), 'unit': 'O/F'}
+        elif isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)  # RPA reads these settings as floats
+        config = with_setting(config, PARAMETERS.get(key, key), value)
+    return config
+
+
+def _rows(table):
+    # dict of columns or iterable of row dicts -> list of row dicts
+    if isinstance(table, dict):
+        columns = {key: list(values) for key, values in table.items()}
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+    return [dict(row) for row in table]
+
+
+def _write_text(path, text):
+    with open(path, 'w', encoding='utf-8', newline='\n') as file:
+        file.write(text)
+
+
+def write_variants(base, table, out_dir, name_format='{name}_{index:05d}', max_workers=16):
+    """
+    Write one .cfg per row of a parameter table, plus an index.csv of the rows.
+
+    Serialization runs in the calling thread; files are written on a thread pool
+    so many small writes overlap.
+
+    Args:
+    base (dict or str): Parsed .cfg or its path.
+    table (dict or iterable): Columns (name -> sequence) or row dicts; see `variant`.
+    out_dir (str): Output directory.
+    name_format (str): Engine/file name, formatted with the base `name`, `index`
+        and the row values.
+    max_workers (int): Writer threads.
+
+    Returns:
+    list: Paths of the written files, in table order.
+    """
+    if isinstance(base, str):
+        base = load(base)
+    rows = _rows(table)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for index, row in enumerate(rows):
+            name = name_format.format(name=base.get('name', 'engine'), index=index, **row)
+            path = os.path.join(out_dir, f'{name}.cfg')
+            futures.append(executor.submit(_write_text, path, dumps(variant(base, row, name))))
+            paths.append(path)
+        for future in futures:
+            future.result()
+
+    with open(os.path.join(out_dir, 'index.csv'), 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        columns = list(rows[0]) if rows else []
+        writer.writerow(['file'] + columns)
+        for path, row in zip(paths, rows):
+            writer.writerow([os.path.basename(path)] + [row[c] for c in columns])
+    return paths
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    import numpy as np
+
+    for path in ('rpa/hail_hydra2.cfg', 'rpa/RD-0146.cfg'):
+        with open(path, encoding='utf-8') as file:
+            text = file.read()
+        t0 = time.perf_counter()
+        for _ in range(1000):
+            config = loads(text)
+        t1 = time.perf_counter()
+        for _ in range(1000):
+            written = dumps(config)
+        t2 = time.perf_counter()
+        print(f"{path}: round trip {'identical' if written == text else 'DIFFERS'}, "
+              f"parse {(t1 - t0) * 1e3:.0f} us, write {(t2 - t1) * 1e3:.0f} us")
+
+    n = 5000
+    rng = np.random.default_rng(0)
+    table = {
+        'pressure': np.round(rng.uniform(100, 250, n), 1).tolist(),
+        'areaRatio': np.round(rng.uniform(4, 20, n), 2).tolist(),
+        'contractionAreaRatio': np.round(rng.uniform(2, 5, n), 2).tolist(),
+        'OF': np.round(rng.uniform(0.6, 1.2, n), 3).tolist(),
+        'ambient': np.round(rng.uniform(0, 1, n), 3).tolist(),
+    }
+    with tempfile.TemporaryDirectory() as out_dir:
+        t0 = time.perf_counter()
+        paths = write_variants('rpa/hail_hydra2.cfg', table, out_dir)
+        elapsed = time.perf_counter() - t0
+        check = load(paths[-1])
+        assert get_setting(check, PARAMETERS['pressure']) == table['pressure'][-1]
+    print(f"{n} variants written in {elapsed:.2f} s ({n / elapsed:,.0f} files/s)")
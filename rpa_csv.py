@@ -0,0 +1,271 @@
+# rpa_csv.py
+# streaming reader for RPA CSV exports (rpa/hydra2_final.csv) and a columnar .npz store
+import zipfile
+from dataclasses import dataclass
+
+import numpy as np
+
+# RPA truncates column headers to 10 characters
+STATIONS = {
+    'Injector': 'injector',
+    'Nozzle inl': 'nozzle_inlet',
+    'Nozzle thr': 'throat',
+    'Nozzle exi': 'exit',
+    'Sea level': 'sea_level',
+    'Optimum ex': 'optimum',
+    'Vacuum': 'vacuum',
+}
+FRACTIONS = {'mass fract': 'mass', 'mole fract': 'mole'}
+
+
+@dataclass
+class RpaCsvRecord:
+    """
+    One value from an RPA CSV export.
+
+    `station` is the nozzle station for Tables 1-2 and the ambient condition
+    (sea_level, optimum, vacuum) for Tables 3-4; `fraction` is 'mass' or 'mole'
+    for Table 2 and empty otherwise. `propellant` joins the components of the
+    Propellant Specification, e.g. 'N2H4(L)/O2(L)'. `run` counts reports within one stream.
+    """
+    engine: str
+    propellant: str
+    of: float
+    run: int
+    table: int
+    parameter: str
+    station: str
+    fraction: str
+    value: float
+    unit: str
+
+
+def iter_records(lines):
+    """
+    Parse an RPA CSV export line by line.
+
+    Args:
+    lines (iterable of str): Open file or any line iterator; several exports may
+        follow each other in one stream.
+
+    Yields:
+    RpaCsvRecord: One record per table cell.
+    """
+    engine, of, run = None, float('nan'), -1
+    components, in_specification = [], False
+    table, stations, fractions, has_unit = None, [], [], False
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line.startswith('#'):
+            text = line[1:].strip()
+            if text.startswith('Engine name:'):
+                engine, of, run = text.split(':', 1)[1].strip(), float('nan'), run + 1
+                components, table = [], None
+            elif text == 'Propellant Specification':
+                in_specification = True
+            elif in_specification and '\t' in text:
+                # component rows: "N2H4(L)  298.1<TAB>mass<TAB>mole"
+                words = text.split('\t')[0].split()
+                if len(words) == 2 and _is_number(words[1]):
+                    components.append(words[0])
+                elif words and words[0] == 'Total:':
+                    in_specification = False
+            elif text.startswith('O/F:') and table is None:
+                of = float(text.split('\t')[-1] if '\t' in text else text[4:])
+            elif text.startswith('Table '):
+                number, _, _ = text[6:].partition('.')
+                table, stations, fractions, has_unit = int(number), [], [], False
+                in_specification = False
+            elif table is not None and '\t' in line:
+                cells = [c.strip() for c in line[1:].split('\t')]
+                if cells[0]:  # column titles
+                    has_unit = 'Unit' in cells
+                    stations = [STATIONS.get(c, c) for c in cells[1:] if c and c != 'Unit']
+                else:  # second title row of Table 2
+                    fractions = [FRACTIONS.get(c, c) for c in cells[1:] if c]
+            continue
+
+        if table is None or '\t' not in line:
+            continue
+        cells = line.split('\t')
+        parameter = cells[0].strip()
+        values = cells[1:len(cells) - 1 if cells[-1].strip() == '' else len(cells)]
+        unit = values.pop().strip() if has_unit else ''
+        if fractions:
+            columns = zip(stations, fractions)
+        else:
+            columns = ((s, '') for s in stations)
+        propellant = '/'.join(components)
+        for (station, fraction), cell in zip(columns, values):
+            yield RpaCsvRecord(engine, propellant, of, max(run, 0), table, parameter, station,
+                               fraction, float(cell), unit)
+
+
+def _is_number(text):
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def read_csv(path):
+    """Stream records from one RPA CSV export file."""
+    with open(path, 'r', encoding='utf-8') as file:
+        yield from iter_records(file)
+
+
+#===================== columnar store =====================#
+
+_record_columns = ('run', 'table', 'parameter', 'station', 'fraction', 'unit', 'value')
+
+
+class _Vocabulary:
+    # dictionary encoding for repeated strings
+    def __init__(self):
+        self.codes = {}
+
+    def __call__(self, text):
+        code = self.codes.get(text)
+        if code is None:
+            code = self.codes[text] = len(self.codes)
+        return code
+
+    def array(self):
+        return np.array(list(self.codes), dtype=str)
+
+
+def write_store(paths, store_path, chunk_size=200_000):
+    """
+    Stream many RPA CSV exports into one compressed columnar .npz file.
+
+    Records are buffered `chunk_size` at a time and each chunk is written
+    straight into the zip archive, so memory does not grow with input size.
+
+    Args:
+    paths (iterable of str): RPA CSV export files.
+    store_path (str): Output .npz path.
+    chunk_size (int): Records per chunk.
+
+    Returns:
+    int: Number of records written.
+    """
+    vocab = {name: _Vocabulary() for name in
+             ('engine', 'propellant', 'parameter', 'station', 'fraction', 'unit', 'source')}
+    runs = {'engine': [], 'propellant': [], 'of': [], 'source': []}
+    run_ids = {}
+    buffer = {name: [] for name in _record_columns}
+    total, chunk = 0, 0
+
+    def flush(archive):
+        nonlocal chunk
+        arrays = {
+            'run': np.array(buffer['run'], dtype=np.int32),
+            'table': np.array(buffer['table'], dtype=np.int8),
+            'parameter': np.array(buffer['parameter'], dtype=np.int16),
+            'station': np.array(buffer['station'], dtype=np.int8),
+            'fraction': np.array(buffer['fraction'], dtype=np.int8),
+            'unit': np.array(buffer['unit'], dtype=np.int16),
+            'value': np.array(buffer['value'], dtype=np.float64),
+        }
+        for name, array in arrays.items():
+            _write_array(archive, f'chunk{chunk}/{name}', array)
+            buffer[name].clear()
+        chunk += 1
+
+    with zipfile.ZipFile(store_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for path in paths:
+            source = vocab['source'](str(path))
+            for record in read_csv(path):
+                key = (source, record.run)
+                run = run_ids.get(key)
+                if run is None:
+                    run = run_ids[key] = len(run_ids)
+                    runs['engine'].append(vocab['engine'](record.engine or ''))
+                    runs['propellant'].append(vocab['propellant'](record.propellant))
+                    runs['of'].append(record.of)
+                    runs['source'].append(source)
+                buffer['run'].append(run)
+                buffer['table'].append(record.table)
+                buffer['parameter'].append(vocab['parameter'](record.parameter))
+                buffer['station'].append(vocab['station'](record.station))
+                buffer['fraction'].append(vocab['fraction'](record.fraction))
+                buffer['unit'].append(vocab['unit'](record.unit))
+                buffer['value'].append(record.value)
+                total += 1
+                if len(buffer['value']) >= chunk_size:
+                    flush(archive)
+        if buffer['value'] or chunk == 0:
+            flush(archive)
+
+        _write_array(archive, 'chunks', np.array(chunk))
+        _write_array(archive, 'run_engine', np.array(runs['engine'], dtype=np.int32))
+        _write_array(archive, 'run_propellant', np.array(runs['propellant'], dtype=np.int32))
+        _write_array(archive, 'run_of', np.array(runs['of'], dtype=np.float64))
+        _write_array(archive, 'run_source', np.array(runs['source'], dtype=np.int32))
+        for name, words in vocab.items():
+            _write_array(archive, f'vocab_{name}', words.array())
+    return total
+
+
+def _write_array(archive, name, array):
+    with archive.open(name + '.npy', 'w', force_zip64=True) as file:
+        np.lib.format.write_array(file, array, allow_pickle=False)
+
+
+class RpaStore:
+    """
+    Read side of `write_store()`: columns are decoded once, queries are numpy masks.
+
+    Example:
+    store = RpaStore('runs.npz')
+    store.values(table=1, parameter='Gamma', station='nozzle_inlet', engine='hail_hydra2')
+    """
+
+    def __init__(self, store_path):
+        with np.load(store_path, allow_pickle=False) as data:
+            chunks = int(data['chunks'])
+            self.columns = {
+                name: np.concatenate([data[f'chunk{i}/{name}'] for i in range(chunks)])
+                for name in _record_columns
+            }
+            self.vocab = {name[len('vocab_'):]: list(data[name])
+                          for name in data.files if name.startswith('vocab_')}
+            self.run_engine = data['run_engine']
+            self.run_propellant = data['run_propellant']
+            self.run_of = data['run_of']
+            self.run_source = data['run_source']
+
+    def __len__(self):
+        return len(self.columns['value'])
+
+    def runs(self, engine=None, of=None, of_tol=1e-6, propellant=None):
+        """Run ids, optionally filtered by engine name, O/F and propellant pair."""
+        mask = np.ones(len(self.run_of), dtype=bool)
+        if engine is not None:
+            mask &= self.run_engine == self._code('engine', engine)
+        if propellant is not None:
+            mask &= self.run_propellant == self._code('propellant', propellant)
+        if of is not None:
+            mask &= np.abs(self.run_of - of) <= of_tol
+        return np.flatnonzero(mask)
+
+    def select(self, table=None, parameter=None, station=None, fraction=None, engine=None, of=None):
+        """Boolean mask over records matching all given filters."""
+        mask = np.ones(len(self), dtype=bool)
+        if table is not None:
+            mask &= self.columns['table'] == table
+        for name, text in (('parameter', parameter), ('station', station), ('fraction', fraction)):
+            if text is not None:
+                mask &= self.columns[name] == self._code(name, text)
+        if engine is not None or of is not None:
+            mask &= np.isin(self.columns['run'], self.runs(engine, of))
+        return mask
+
+    def values(self, **filters):
+        """Values matching `select(**filters)`, in file order."""
+        return self.columns['value'][self.select(**filters)]
+
+    def _code(self, name, text):
+        words = self.vocab[name]
+        return words.index(text) if text in words else -1
@@ -0,0 +1,224 @@
+# rpa_parser.py
+# single-pass parser for the RPA "Engine Design" text output
+import re
+import time
+from dataclasses import dataclass, fields
+
+# RPA "Engine Design" output of the seminar engine (hail_hydra2.cfg), shown by main.py until replaced
+RPA_RESPONSE_DEFAULT = """Thrust and mass flow rates
+------------------------------------------
+   Chamber thrust (vac):   22.53665     kN
+ Specific impulse (vac):  320.80146      s
+   Chamber thrust (opt):   20.58303     kN
+ Specific impulse (opt):  292.99241      s
+   Total mass flow rate:    7.16362   kg/s
+Oxidizer mass flow rate:    3.28718   kg/s
+    Fuel mass flow rate:    3.87644   kg/s
+
+Geometry of thrust chamber with parabolic nozzle
+------------------------------------------
+    Dc =   80.32  mm       b =   30.00 deg
+    R2 =   80.33  mm      R1 =   23.28  mm
+    L* = 1000.00  mm
+    Lc =  177.26  mm    Lcyl =  106.81  mm
+    Dt =   31.04  mm
+    Rn =    5.93  mm      Tn =   22.42 deg
+    Le =   98.33  mm      Te =    8.00 deg
+    De =   82.12  mm
+ Ae/At =    7.00    
+ Le/Dt =    3.17    
+Le/c15  =  102.33 % (relative to length of cone nozzle with Te=15 deg)
+
+  Mass =    9.99  kg
+
+  Divergence efficiency:    0.99157       
+        Drag efficiency:    0.96223       
+     Thrust coefficient:    1.66234  (vac)
+"""
+
+# regex patterns for extracting values from RPA response (used by main.py)
+patterns = {
+    'isp': r"Specific impulse \(vac\):\s+([\d.]+)\s+s",
+    'cf': r"Thrust coefficient:\s+([\d.]+)\s+",
+    'thrust_vac': r"Chamber thrust \(vac\):\s+([\d.]+)\s+kN",
+    'thrust_opt': r"Chamber thrust \(opt\):\s+([\d.]+)\s+kN",
+    'isp_opt': r"Specific impulse \(opt\):\s+([\d.]+)\s+s",
+    'ox_flow_rate': r"Oxidizer mass flow rate:\s+([\d.]+)\s+kg/s",
+    'fuel_flow_rate': r"Fuel mass flow rate:\s+([\d.]+)\s+kg/s",
+    'dc': r"Dc =\s+([\d.]+)\s+mm",
+    'dt': r"Dt =\s+([\d.]+)\s+mm",
+    'de': r"De =\s+([\d.]+)\s+mm",
+    'lc': r"Lc =\s+([\d.]+)\s+mm",
+    'le': r"Le =\s+([\d.]+)\s+mm"
+}
+
+# values printed by RPA that the app did not use so far, optional when validating
+extra_patterns = {
+    'total_flow_rate': r"Total mass flow rate:\s+([\d.]+)\s+kg/s",
+    'b': r"b =\s+([\d.]+)\s+deg",
+    'r1': r"R1 =\s+([\d.]+)\s+mm",
+    'r2': r"R2 =\s+([\d.]+)\s+mm",
+    'lstar': r"L\* =\s+([\d.]+)\s+mm",
+    'lcyl': r"Lcyl =\s+([\d.]+)\s+mm",
+    'rn': r"Rn =\s+([\d.]+)\s+mm",
+    'tn': r"Tn =\s+([\d.]+)\s+deg",
+    'te': r"Te =\s+([\d.]+)\s+deg",
+    'ae_at': r"Ae/At =\s+([\d.]+)",
+    'le_dt': r"Le/Dt =\s+([\d.]+)",
+    'mass': r"Mass =\s+([\d.]+)\s+kg",
+    'divergence_efficiency': r"Divergence efficiency:\s+([\d.]+)",
+    'drag_efficiency': r"Drag efficiency:\s+([\d.]+)",
+}
+
+# one alternation with a named group per key, so the report is scanned once
+_combined = re.compile("|".join(
+    pattern.replace(r"([\d.]+)", rf"(?P<{key}>[\d.]+)", 1)
+    for key, pattern in {**extra_patterns, **patterns}.items()
+))
+
+
+@dataclass
+class RpaEngineDesign:
+    """Values from one RPA "Engine Design" report; lengths in mm, angles in deg, thrust in kN."""
+    # performance
+    isp: float = None
+    cf: float = None
+    thrust_vac: float = None
+    thrust_opt: float = None
+    isp_opt: float = None
+    ox_flow_rate: float = None
+    fuel_flow_rate: float = None
+    total_flow_rate: float = None
+    # geometry of thrust chamber with parabolic nozzle
+    dc: float = None
+    dt: float = None
+    de: float = None
+    lc: float = None
+    le: float = None
+    b: float = None
+    r1: float = None
+    r2: float = None
+    lstar: float = None
+    lcyl: float = None
+    rn: float = None
+    tn: float = None
+    te: float = None
+    ae_at: float = None
+    le_dt: float = None
+    mass: float = None
+    divergence_efficiency: float = None
+    drag_efficiency: float = None
+
+    @property
+    def missing(self):
+        """Required keys (see `patterns`) that were not found."""
+        return [key for key in patterns if getattr(self, key) is None]
+
+    @property
+    def valid(self):
+        return not self.missing
+
+    def validation(self):
+        """Same shape as `validate_rpa_output()` in main.py: key -> found."""
+        return {key: getattr(self, key) is not None for key in patterns}
+
+    def values(self):
+        """Required values as a dict, or None if any is missing."""
+        if not self.valid:
+            return None
+        return {key: getattr(self, key) for key in patterns}
+
+    def to_dict(self):
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+def parse_rpa_output(rpa_response):
+    """
+    Extract all known fields from an RPA report in a single regex pass.
+
+    Args:
+    rpa_response (str): RPA "Engine Design" text output.
+
+    Returns:
+    RpaEngineDesign: Parsed values, None for fields that were not found.
+    """
+    found = {}
+    for match in _combined.finditer(rpa_response):
+        key = match.lastgroup
+        if key not in found:  # first occurrence wins, like re.search
+            found[key] = float(match.group(key))
+    return RpaEngineDesign(**found)
+
+
+#===================== benchmark =====================#
+
+_report_template = """Thrust and mass flow rates
+------------------------------------------
+   Chamber thrust (vac):   {thrust_vac:.5f}     kN
+ Specific impulse (vac):  {isp:.5f}      s
+   Chamber thrust (opt):   {thrust_opt:.5f}     kN
+ Specific impulse (opt):  {isp_opt:.5f}      s
+   Total mass flow rate:    {total_flow_rate:.5f}   kg/s
+Oxidizer mass flow rate:    {ox_flow_rate:.5f}   kg/s
+    Fuel mass flow rate:    {fuel_flow_rate:.5f}   kg/s
+
+Geometry of thrust chamber with parabolic nozzle
+------------------------------------------
+    Dc =   {dc:.2f}  mm       b =   30.00 deg
+    R2 =   {r2:.2f}  mm      R1 =   {r1:.2f}  mm
+    L* = 1000.00  mm
+    Lc =  {lc:.2f}  mm    Lcyl =  {lcyl:.2f}  mm
+    Dt =   {dt:.2f}  mm
+    Rn =    {rn:.2f}  mm      Tn =   22.42 deg
+    Le =   {le:.2f}  mm      Te =    8.00 deg
+    De =   {de:.2f}  mm
+ Ae/At =    7.00
+ Le/Dt =    3.17
+Le/c15  =  102.33 % (relative to length of cone nozzle with Te=15 deg)
+
+  Mass =    {mass:.2f}  kg
+
+  Divergence efficiency:    0.99157
+        Drag efficiency:    0.96223
+     Thrust coefficient:    {cf:.5f}  (vac)
+"""
+
+
+def synthetic_reports(n, seed=0):
+    """Generate `n` RPA-like reports with randomized values around the hail_hydra2 run."""
+    import random
+    rng = random.Random(seed)
+    base = dict(thrust_vac=22.53665, isp=320.80146, thrust_opt=20.58303, isp_opt=292.99241,
+                total_flow_rate=7.16362, ox_flow_rate=3.28718, fuel_flow_rate=3.87644,
+                dc=80.32, r2=80.33, r1=23.28, lc=177.26, lcyl=106.81, dt=31.04, rn=5.93,
+                le=98.33, de=82.12, mass=9.99, cf=1.66234)
+    return [_report_template.format(**{k: v * rng.uniform(0.5, 1.5) for k, v in base.items()})
+            for _ in range(n)]
+
+
+if __name__ == "__main__":
+    corpus = synthetic_reports(20000)
+    megabytes = sum(map(len, corpus)) / 1e6
+
+    # previous approach: extract_values() + validate_rpa_output(), one re.search per key each
+    def per_key(keys):
+        t0 = time.perf_counter()
+        for report in corpus:
+            for _ in range(2):
+                for key in keys:
+                    re.search(all_patterns[key], report)
+        return len(corpus) / (time.perf_counter() - t0)
+
+    all_patterns = {**patterns, **extra_patterns}
+    rate_old = per_key(patterns)
+    rate_old_all = per_key(all_patterns)
+
+    t0 = time.perf_counter()
+    parsed = [parse_rpa_output(report) for report in corpus]
+    rate_new = len(corpus) / (time.perf_counter() - t0)
+
+    assert all(p.valid for p in parsed)
+    print(f"{len(corpus)} reports, {megabytes:.1f} MB")
+    print(f"per-key re.search, {len(patterns)} fields:     {rate_old:,.0f} reports/s")
+    print(f"per-key re.search, {len(all_patterns)} fields:     {rate_old_all:,.0f} reports/s")
+    print(f"single pass + validation, {len(all_patterns)} fields: {rate_new:,.0f} reports/s")
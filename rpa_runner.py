@@ -0,0 +1,330 @@
+# rpa_runner.py
+# asyncio job runner for RPA: engine definitions (.cfg) go to an RPA console executable
+# (or rpa_standin.py), reports come back parsed with rpa_parser; bounded concurrency,
+# timeouts, retries, and results cached by the hash of the command and config contents
+#
+#   RPA_COMMAND="/opt/rpa/rpa-console --input {cfg}"   command line, {cfg} is the config path
+#                                                      (default: python rpa_standin.py {cfg})
+#   RPA_RESULT_DIR=dir                                 also keep reports on disk across restarts
+import asyncio
+import hashlib
+import os
+import shlex
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from rpa_parser import parse_rpa_output
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_COMMAND = f'{shlex.quote(sys.executable)} {shlex.quote(os.path.join(HERE, "rpa_standin.py"))} {{cfg}}'
+
+
+def config_key(text, command=''):
+    """Cache key of an engine definition: sha256 of the command line and the config contents."""
+    return hashlib.sha256(f'{command}\0{text}'.encode('utf-8')).hexdigest()
+
+
+class RpaError(RuntimeError):
+    pass
+
+
+@dataclass
+class RpaJob:
+    """One submitted engine definition and, once finished, its parsed report."""
+    name: str
+    key: str
+    status: str = 'pending'  # pending, running, done, failed
+    cached: bool = False
+    attempts: int = 0
+    seconds: float = 0.0
+    report: str = None
+    result: object = None    # RpaEngineDesign
+    error: str = None
+
+    def row(self):
+        """Summary for a status table."""
+        return {'name': self.name, 'status': self.status, 'cached': self.cached,
+                'attempts': self.attempts, 'seconds': round(self.seconds, 3),
+                'error': self.error or '', 'key': self.key[:12]}
+
+
+class RpaRunner:
+    """
+    Runs RPA on engine definitions with at most `concurrency` processes at a time.
+
+    Identical configs (same contents) are run once: finished reports are cached by
+    `config_key` of the command and config (RPA and the stand-in never share results), and
+    a config submitted while the same one is running waits for that run.
+    The runner is shared by every session of the app; callers keep the jobs they submitted
+    (`submit` returns them), while `jobs` only holds the latest ones for monitoring.
+
+    Example:
+    runner = RpaRunner()
+    jobs = asyncio.run(runner.run_many({'hydra': open('rpa/hail_hydra2.cfg').read()}))
+    jobs[0].result.thrust_vac
+
+    Args:
+    command (str, optional): Command line with a `{cfg}` placeholder; RPA_COMMAND or the stand-in.
+    concurrency (int): Simultaneous RPA processes.
+    timeout (float): Seconds per attempt before the process is killed.
+    retries (int): Extra attempts after a timeout or non-zero exit.
+    backoff (float): Delay before retry n is backoff * 2**(n - 1) seconds.
+    result_dir (str, optional): Directory keeping reports as <key>.txt; RPA_RESULT_DIR if None.
+    max_reports (int): Reports kept in memory, least recently used dropped first.
+    max_jobs (int): Jobs kept in `jobs`, oldest finished dropped first.
+    """
+
+    def __init__(self, command=None, concurrency=4, timeout=60.0, retries=2, backoff=0.5,
+                 result_dir=None, max_reports=128, max_jobs=256):
+        self.command = command or os.environ.get('RPA_COMMAND') or DEFAULT_COMMAND
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.result_dir = result_dir or os.environ.get('RPA_RESULT_DIR')
+        self.max_reports = max_reports
+        self.max_jobs = max_jobs
+        self.jobs = []            # latest jobs submitted, in order
+        self._reports = OrderedDict()  # key -> report text, least recently used first
+        self._running = {}        # key -> future of the report
+        self._semaphore = None    # (loop, semaphore), bound to the loop that runs the jobs
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.runs = 0
+        self.retried = 0
+        self.failures = 0
+
+    #===================== cache =====================#
+
+    def _cached(self, key):
+        report = self._reports.get(key)
+        if report is not None:
+            self._reports.move_to_end(key)
+        elif self.result_dir:
+            path = os.path.join(self.result_dir, f'{key}.txt')
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as file:
+                    report = file.read()
+                self._remember(key, report)
+        return report
+
+    def _remember(self, key, report):
+        self._reports[key] = report
+        self._reports.move_to_end(key)
+        while len(self._reports) > self.max_reports:
+            self._reports.popitem(last=False)
+
+    def _store(self, key, report):
+        self._remember(key, report)
+        if self.result_dir:
+            os.makedirs(self.result_dir, exist_ok=True)
+            path = os.path.join(self.result_dir, f'{key}.txt')
+            with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+                file.write(report)
+            os.replace(f'{path}.tmp', path)
+
+    #===================== running =====================#
+
+    async def _execute(self, text):
+        # one RPA process on a temporary copy of the config; returns stdout
+        with tempfile.TemporaryDirectory(prefix='rpa_job_') as directory:
+            path = os.path.join(directory, 'engine.cfg')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(text)
+            args = [arg.replace('{cfg}', path) for arg in shlex.split(self.command)]
+            process = await asyncio.create_subprocess_exec(
+                *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, cwd=directory)
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), self.timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise RpaError(f"timed out after {self.timeout:g} s") from None
+            if process.returncode != 0:
+                message = stderr.decode('utf-8', 'replace').strip().splitlines()
+                raise RpaError(f"exit status {process.returncode}: {message[-1] if message else ''}")
+            return stdout.decode('utf-8', 'replace')
+
+    async def _run_with_retries(self, job, text):
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore[0] is not loop:
+            self._semaphore = (loop, asyncio.Semaphore(self.concurrency))
+        async with self._semaphore[1]:
+            job.status = 'running'
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    self.retried += 1
+                    await asyncio.sleep(self.backoff * 2**(attempt - 1))
+                job.attempts += 1
+                self.runs += 1
+                try:
+                    return await self._execute(text)
+                except (RpaError, OSError) as error:
+                    job.error = str(error)
+            raise RpaError(job.error)
+
+    def _queue(self, configs):
+        # jobs are registered (status 'pending') before any of them starts
+        items = configs.items() if isinstance(configs, dict) else ((None, text) for text in configs)
+        queued = []
+        for name, text in items:
+            key = config_key(text, self.command)
+            queued.append((RpaJob(name or key[:12], key), text))
+        with self._lock:
+            self.jobs.extend(job for job, _ in queued)
+            self._trim()
+        return queued
+
+    def _trim(self):
+        # drop the oldest finished jobs beyond max_jobs; pending and running ones stay
+        excess = len(self.jobs) - self.max_jobs
+        if excess > 0:
+            kept = []
+            for job in self.jobs:
+                if excess > 0 and job.status in ('done', 'failed'):
+                    excess -= 1
+                else:
+                    kept.append(job)
+            self.jobs = kept
+
+    async def run(self, text, name=None):
+        """
+        Run (or fetch from the cache) one engine definition.
+
+        Args:
+        text (str): Contents of the .cfg file.
+        name (str, optional): Label of the job; the key prefix by default.
+
+        Returns:
+        RpaJob: Finished job, status 'done' or 'failed'.
+        """
+        [(job, text)] = self._queue({name: text})
+        return await self._run_job(job, text)
+
+    async def _run_job(self, job, text):
+        key = job.key
+        t0 = time.perf_counter()
+        try:
+            report = self._cached(key)
+            if report is not None:
+                self.hits += 1
+                job.cached = True
+            elif key in self._running:
+                self.hits += 1
+                job.cached = True
+                report = await asyncio.shield(self._running[key])
+            else:
+                self.misses += 1
+                future = self._running[key] = asyncio.get_running_loop().create_future()
+                try:
+                    report = await self._run_with_retries(job, text)
+                except RpaError as error:
+                    future.set_exception(error)
+                    future.exception()  # retrieved here, waiting jobs re-raise it
+                    raise
+                finally:
+                    del self._running[key]
+                future.set_result(report)
+            job.result = parse_rpa_output(report)
+            missing = job.result.missing
+            if missing:
+                raise RpaError(f"report is missing {', '.join(missing)}")
+            if not job.cached:
+                self._store(key, report)
+            job.report, job.status, job.error = report, 'done', None
+        except RpaError as error:
+            self.failures += 1
+            job.status, job.error = 'failed', str(error)
+        job.seconds = time.perf_counter() - t0
+        return job
+
+    async def run_many(self, configs):
+        """
+        Run many engine definitions concurrently (at most `concurrency` processes).
+
+        Args:
+        configs (dict or list): name -> .cfg text, or a list of .cfg texts.
+
+        Returns:
+        list: RpaJob per config, in the given order.
+        """
+        return await self._gather(self._queue(configs))
+
+    async def _gather(self, queued):
+        return await asyncio.gather(*(self._run_job(job, text) for job, text in queued))
+
+    #===================== background =====================#
+
+    def submit(self, configs):
+        """
+        Queue configs on the background event loop and return immediately (for the UI).
+
+        Example:
+        st.session_state['rpa_jobs'] += rpa_runner.submit(configs)  # this session's jobs only
+
+        Returns:
+        list: RpaJob per config, status 'pending'; they update in place as the runs finish.
+        """
+        queued = self._queue(configs)
+        asyncio.run_coroutine_threadsafe(self._gather(queued), _background_loop())
+        return [job for job, _ in queued]
+
+    def stats(self):
+        status = [job.status for job in self.jobs]
+        return {'hits': self.hits, 'misses': self.misses, 'runs': self.runs, 'retries': self.retried,
+                'failures': self.failures, 'cached_reports': len(self._reports),
+                **{f'jobs_{name}': status.count(name) for name in ('pending', 'running', 'done', 'failed')}}
+
+    def write_stats(self, path, prefix='rpa_runner'):
+        """Write counters in Prometheus text format."""
+        lines = [f'{prefix}_{name} {value}' for name, value in self.stats().items()]
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop():
+    # one event loop per process on a daemon thread, shared by every session
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='rpa-runner', daemon=True).start()
+        return _loop
+
+
+rpa_runner = RpaRunner()
+
+
+if __name__ == "__main__":
+    from rpa_cfg import dumps, load, variant
+
+    base = load(os.path.join(HERE, 'rpa', 'hail_hydra2.cfg'))
+    configs = {f'P{p:.0f}_eps{e:.0f}': dumps(variant(base, {'pressure': p, 'areaRatio': e}))
+               for p in (100.0, 140.0, 180.0, 220.0) for e in range(4, 29)}
+    runner = RpaRunner(concurrency=os.cpu_count() or 4)
+    for label in ('first run', 'second run (cached)'):
+        t0 = time.perf_counter()
+        jobs = asyncio.run(runner.run_many(configs))
+        elapsed = time.perf_counter() - t0
+        done = [job for job in jobs if job.status == 'done']
+        print(f"{label}: {len(done)}/{len(jobs)} done in {elapsed:.2f} s, {runner.stats()}")
+    print(f"{jobs[0].name}: F vac = {jobs[0].result.thrust_vac} kN, Dt = {jobs[0].result.dt} mm")
+
+    failing = RpaRunner(command=f'{shlex.quote(sys.executable)} -c "import sys; sys.exit(3)"',
+                        retries=2, backoff=0.01)
+    job = asyncio.run(failing.run('name = "x";'))
+    print(f"failing command: {job.status} after {job.attempts} attempts ({job.error})")
+    slow = RpaRunner(command=f'{DEFAULT_COMMAND} --delay 5', timeout=0.5, retries=0)
+    job = asyncio.run(slow.run(configs['P180_eps7']))
+    print(f"slow command: {job.status} ({job.error})")
@@ -0,0 +1,131 @@
+# rpa_standin.py
+# local stand-in for the RPA console: reads an engine definition (.cfg) and prints an
+# "Engine Design" report in RPA's text layout, sized with the analytical model
+# (inverse_design.py) and a fixed gas model instead of RPA's equilibrium solver
+#
+#   python rpa_standin.py rpa/hail_hydra2.cfg
+#   python rpa_standin.py rpa/hail_hydra2.cfg --Cstar 1892.5 --R 433.5 --kappa 1.1716 --delay 0.5
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import engine_model as em
+from inverse_design import size_engine
+from rpa_cfg import CfgError, get_setting, load
+
+# unit -> SI factor for the quantities read from the config
+_UNITS = {
+    'Pa': 1.0, 'kPa': 1e3, 'MPa': 1e6, 'bar': 1e5, 'atm': 101325.0, 'psi': 6894.757,
+    'N': 1.0, 'kN': 1e3, 'lbf': 4.448222,
+    'm': 1.0, 'mm': 1e-3, 'cm': 1e-2, 'in': 0.0254,
+}
+
+# hydrazine / liquid oxygen at the hail_hydra2 point (nozzle inlet values from RPA)
+DEFAULT_GAS = dict(Cstar=1892.5, R=433.5, kappa=1.1716, OF=0.848)
+
+_REPORT = """Thrust and mass flow rates
+------------------------------------------
+   Chamber thrust (vac):   {thrust_vac:.5f}     kN
+ Specific impulse (vac):  {isp:.5f}      s
+   Chamber thrust (opt):   {thrust_opt:.5f}     kN
+ Specific impulse (opt):  {isp_opt:.5f}      s
+   Total mass flow rate:    {total_flow_rate:.5f}   kg/s
+Oxidizer mass flow rate:    {ox_flow_rate:.5f}   kg/s
+    Fuel mass flow rate:    {fuel_flow_rate:.5f}   kg/s
+
+Geometry of thrust chamber with parabolic nozzle
+------------------------------------------
+    Dc =   {dc:.2f}  mm       b =   {b:.2f} deg
+    R1 =   {r1:.2f}  mm
+    L* = {lstar:.2f}  mm
+    Lc =  {lc:.2f}  mm
+    Dt =   {dt:.2f}  mm
+    Rn =    {rn:.2f}  mm
+    Le =   {le:.2f}  mm
+    De =   {de:.2f}  mm
+ Ae/At =    {ae_at:.2f}
+ Le/Dt =    {le_dt:.2f}
+
+     Thrust coefficient:    {cf:.5f}  (vac)
+"""
+
+
+def _quantity(config, path, default=None):
+    # {value, unit} setting in SI units
+    try:
+        setting = get_setting(config, path)
+    except KeyError:
+        if default is None:
+            raise CfgError(f"missing setting {path}") from None
+        return default
+    unit = setting.get('unit', '')
+    if unit not in _UNITS:
+        raise CfgError(f"unsupported unit {unit!r} for {path}")
+    return float(setting['value']) * _UNITS[unit]
+
+
+def design_report(config, Cstar, R, kappa, OF):
+    """
+    RPA-style report of the engine described by a parsed .cfg.
+
+    Args:
+    config (dict): Parsed configuration (`rpa_cfg.load`).
+    Cstar, R, kappa (float): Gas model [m/s, J/kg K, -].
+    OF (float): Mixture ratio used when the config asks for the "optimal" one.
+
+    Returns:
+    str: Report text readable by `rpa_parser.parse_rpa_output`.
+    """
+    P = _quantity(config, 'combustionChamberConditions.pressure')
+    Pa = _quantity(config, 'engineSize.ambientConditions', 101325.0)
+    F = _quantity(config, 'engineSize.thrust')
+    epsilon_i = float(get_setting(config, 'nozzleFlow.nozzleExitConditions.areaRatio'))
+    contraction = float(get_setting(config, 'nozzleFlow.nozzleInletConditions.contractionAreaRatio'))
+    geometry = get_setting(config, 'engineSize.chamberGeometry')
+    Lstar = (_quantity(config, 'engineSize.chamberGeometry.length', 1.0)
+             if geometry.get('characteristicLength', True) else 1.0)
+    ratio = get_setting(config, 'propellant.components.ratio')
+    if ratio.get('unit') == 'O/F':
+        OF = float(ratio['value'])
+
+    design = size_engine(F, P, Pa, kappa, R, Cstar, OF=OF, d_dkdr=contraction**0.5,
+                         Lstar=Lstar, epsilon_i=epsilon_i)
+    thrust_vac = F + design.Ai * Pa
+    with np.errstate(divide='ignore'):  # Pa = 0 (vacuum): full expansion
+        Vi_opt = em.optimal_exhaust_velocity(kappa, R, design.T, np.float64(P), np.float64(Pa))
+    b = float(geometry.get('contractionAngle', 30.0))
+    rt = design.dkr / 2
+    le = 0.8 * (epsilon_i**0.5 - 1) * rt / np.tan(np.radians(15))  # 80 % bell
+    return _REPORT.format(
+        thrust_vac=thrust_vac / 1e3, isp=thrust_vac / design.m_dot / em.g0,
+        thrust_opt=design.m_dot * Vi_opt / 1e3, isp_opt=Vi_opt / em.g0,
+        total_flow_rate=design.m_dot, ox_flow_rate=design.mox, fuel_flow_rate=design.mg,
+        dc=design.dk * 1e3, b=b, r1=float(geometry.get('R1_to_Rt_ratio', 1.5)) * rt * 1e3,
+        lstar=Lstar * 1e3, lc=design.lk * 1e3, dt=design.dkr * 1e3,
+        rn=float(geometry.get('Rn_to_Rt_ratio', 0.382)) * rt * 1e3, le=le * 1e3,
+        de=design.di * 1e3, ae_at=epsilon_i, le_dt=le / design.dkr,
+        cf=thrust_vac / (P * design.Akr))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RPA stand-in: engine definition (.cfg) -> Engine Design report.")
+    parser.add_argument('config')
+    for name, value in DEFAULT_GAS.items():
+        parser.add_argument(f'--{name}', type=float, default=value)
+    parser.add_argument('--delay', type=float, default=0.0, help="seconds to wait, to mimic a solver run")
+    args = parser.parse_args(argv)
+
+    try:
+        report = design_report(load(args.config), args.Cstar, args.R, args.kappa, args.OF)
+    except (OSError, CfgError, KeyError, ValueError) as error:
+        print(f"rpa_standin: {args.config}: {error}", file=sys.stderr)
+        return 2
+    time.sleep(args.delay)
+    sys.stdout.write(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
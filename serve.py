@@ -0,0 +1,16 @@
+# serve.py
+# starts the Streamlit server for main.py with the warm-up (warmup.py) running in the same
+# process, so the first session after a (re)start finds imports and caches already loaded
+#
+#   python serve.py --server.headless=true          flags as for `streamlit run main.py`
+import os
+import sys
+
+from streamlit.web import cli
+
+import warmup
+
+if __name__ == "__main__":
+    warmup.warm_up_in_background()
+    sys.argv = ['streamlit', 'run', os.path.join(warmup.HERE, 'main.py'), *sys.argv[1:]]
+    sys.exit(cli.main())
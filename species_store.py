@@ -0,0 +1,308 @@
+# species_store.py
+# combustion products of many RPA runs (Table 2: mass and mole fractions per station) in
+# float32 arrays of shape (species, station, run), species names dictionary-encoded
+import re
+
+import numpy as np
+
+from rpa_csv import STATIONS, read_csv
+
+# Table 2 stations, in RPA's column order
+SPECIES_STATIONS = ('injector', 'nozzle_inlet', 'throat', 'exit')
+KINDS = ('mass', 'mole')
+
+# standard atomic weights [g/mol] of the elements in RPA's product lists
+ATOMIC_WEIGHTS = {
+    'H': 1.00794, 'C': 12.0107, 'N': 14.0067, 'O': 15.9994, 'F': 18.9984, 'Al': 26.9815,
+    'Cl': 35.453, 'Ar': 39.948, 'He': 4.002602, 'B': 10.811, 'S': 32.065, 'K': 39.0983,
+    'Na': 22.98977, 'Mg': 24.305, 'Si': 28.0855, 'Fe': 55.845, 'Cu': 63.546, 'Ti': 47.867,
+}
+_ELEMENT = re.compile(r'([A-Z][a-z]?)(\d*)')
+
+
+def molar_mass(species):
+    """
+    Molar mass [g/mol] from a formula such as 'H2O2' or 'N2H4(L)'; ions and phase suffixes are ignored.
+
+    Args:
+    species (str): Species formula as printed by RPA.
+
+    Returns:
+    float: Molar mass, NaN for unknown elements.
+    """
+    formula = species.split('(')[0].rstrip('+-')
+    total = 0.0
+    for element, count in _ELEMENT.findall(formula):
+        if element not in ATOMIC_WEIGHTS:
+            return float('nan')
+        total += ATOMIC_WEIGHTS[element] * int(count or 1)
+    return total
+
+
+class SpeciesStore:
+    """
+    Array-backed store of species fractions across RPA runs.
+
+    Fractions are held as float32 arrays of shape (species, station, run) per kind (mass,
+    mole), so a (species, station) query reads one contiguous row over all runs. Runs are
+    appended in blocks with amortized growth; the mean molecular weight of every run and
+    station is computed when runs are added, so queries never re-parse or re-reduce.
+
+    Example:
+    store = SpeciesStore.from_csv(['rpa/hydra2_final.csv'])
+    store.runs_where('OH', 'exit', above=1e-5)
+    store.mean_molecular_weight('exit')
+
+    Args:
+    capacity (int): Initial number of runs allocated.
+    """
+
+    def __init__(self, capacity=1024):
+        self.species = []        # code -> name
+        self._codes = {}         # name -> code
+        self.n_runs = 0
+        self._fractions = {kind: np.zeros((0, len(SPECIES_STATIONS), capacity), dtype=np.float32)
+                           for kind in KINDS}
+        self._molecular_weight = np.zeros((len(SPECIES_STATIONS), capacity), dtype=np.float32)
+        self._names = np.empty(capacity, dtype=object)
+        self._of = np.full(capacity, np.nan)
+
+    #===================== building =====================#
+
+    def _code(self, name):
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.species)
+            self.species.append(name)
+        return code
+
+    def _reserve(self, n_species, n_runs):
+        capacity = self._names.size
+        if n_runs > capacity:
+            capacity = max(n_runs, 2 * capacity)
+        for kind, array in self._fractions.items():
+            if array.shape[0] < n_species or array.shape[2] < capacity:
+                grown = np.zeros((n_species, len(SPECIES_STATIONS), capacity), dtype=np.float32)
+                grown[:array.shape[0], :, :self.n_runs] = array[:, :, :self.n_runs]
+                self._fractions[kind] = grown
+        if capacity > self._names.size:
+            self._molecular_weight = np.concatenate(
+                [self._molecular_weight, np.zeros((len(SPECIES_STATIONS), capacity - self._names.size), np.float32)], axis=1)
+            self._names = np.concatenate([self._names, np.empty(capacity - self._names.size, dtype=object)])
+            self._of = np.concatenate([self._of, np.full(capacity - self._of.size, np.nan)])
+
+    def add_runs(self, species, mass, mole, names=None, of=None):
+        """
+        Append a block of runs.
+
+        Args:
+        species (list): Species names of axis 1.
+        mass, mole (ndarray): Fractions, shape (runs, species, stations) with stations as
+            in `SPECIES_STATIONS`.
+        names (list, optional): Engine name per run.
+        of (ndarray, optional): O/F per run.
+
+        Returns:
+        ndarray: Run indices of the block.
+        """
+        mass, mole = np.asarray(mass, dtype=np.float32), np.asarray(mole, dtype=np.float32)
+        n = mass.shape[0]
+        codes = np.array([self._code(name) for name in species], dtype=np.intp)
+        start, stop = self.n_runs, self.n_runs + n
+        self._reserve(len(self.species), stop)
+        for kind, values in (('mass', mass), ('mole', mole)):
+            self._fractions[kind][codes, :, start:stop] = values.transpose(1, 2, 0)
+        # mean molecular weight: sum of x_i * M_i over species with a known molar mass
+        weights = np.array([molar_mass(name) for name in species])
+        known = ~np.isnan(weights)
+        self._molecular_weight[:, start:stop] = np.einsum(
+            'rks,k->sr', mole[:, known, :].astype(float), weights[known])
+        self._names[start:stop] = '' if names is None else list(names)
+        self._of[start:stop] = np.nan if of is None else of
+        self.n_runs = stop
+        return np.arange(start, stop)
+
+    def add_table(self, frame, name='', of=float('nan')):
+        """
+        Append one run from the Table 2 dataframe of an RPA HTML report (`rpa_cache.read_tables`).
+
+        Args:
+        frame (DataFrame): 'Species' column plus '<station> mass/mole fractions' columns.
+        name (str): Engine name.
+        of (float): O/F of the run.
+
+        Returns:
+        int: Run index.
+        """
+        columns = {}
+        for column in frame.columns[1:]:
+            station = next((v for k, v in STATIONS.items() if column.startswith(k)), None)
+            kind = 'mass' if 'mass' in column else 'mole' if 'mole' in column else None
+            if station in SPECIES_STATIONS and kind:
+                columns[kind, station] = frame[column].fillna(0.0).to_numpy(dtype=float)
+        values = {kind: np.stack([columns.get((kind, station), np.zeros(len(frame)))
+                                  for station in SPECIES_STATIONS], axis=1)[None]
+                  for kind in KINDS}
+        return int(self.add_runs(list(frame.iloc[:, 0]), values['mass'], values['mole'], [name], [of])[0])
+
+    @classmethod
+    def from_csv(cls, paths):
+        """
+        Store of the Table 2 values of RPA CSV exports (`rpa_csv.read_csv`), one run per report.
+
+        Args:
+        paths (iterable of str): RPA CSV export files.
+
+        Returns:
+        SpeciesStore: The runs in file order.
+        """
+        store = cls()
+        for path in paths:
+            runs = {}
+            for record in read_csv(path):
+                if record.table != 2 or record.station not in SPECIES_STATIONS:
+                    continue
+                run = runs.setdefault(record.run, {'name': record.engine, 'of': record.of, 'values': {}})
+                run['values'][record.parameter, record.station, record.fraction] = record.value
+            for run in runs.values():
+                species = list(dict.fromkeys(key[0] for key in run['values']))
+                values = {kind: np.array([[[run['values'].get((s, station, kind), 0.0)
+                                            for station in SPECIES_STATIONS] for s in species]])
+                          for kind in KINDS}
+                store.add_runs(species, values['mass'], values['mole'], [run['name']], [run['of']])
+        return store
+
+    #===================== persistence =====================#
+
+    def save(self, path):
+        """Write the store as .npz (no pickles), loaded again with `SpeciesStore.load`."""
+        n = self.n_runs
+        np.savez(path, species=np.array(self.species, dtype=str),
+                 mass=self.fractions('mass'), mole=self.fractions('mole'),
+                 names=np.array(list(self._names[:n]), dtype=str), of=self._of[:n])
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            store = cls(capacity=max(len(data['of']), 1))
+            store.add_runs(list(data['species']), data['mass'].transpose(2, 0, 1),
+                           data['mole'].transpose(2, 0, 1), list(data['names']), data['of'])
+        return store
+
+    #===================== queries =====================#
+
+    def __len__(self):
+        return self.n_runs
+
+    @property
+    def names(self):
+        return self._names[:self.n_runs]
+
+    @property
+    def of(self):
+        return self._of[:self.n_runs]
+
+    def fractions(self, kind='mole'):
+        """All fractions of one kind, view of shape (species, station, run)."""
+        return self._fractions[kind][:, :, :self.n_runs]
+
+    def fraction(self, species, station='exit', kind='mole'):
+        """
+        Fraction of one species at one station for every run.
+
+        Args:
+        species (str): Species name, e.g. 'OH'.
+        station (str): One of `SPECIES_STATIONS`.
+        kind (str): 'mass' or 'mole'.
+
+        Returns:
+        ndarray: float32 view over runs (zeros if the species never occurred).
+        """
+        code = self._codes.get(species)
+        if code is None:
+            return np.zeros(self.n_runs, dtype=np.float32)
+        return self._fractions[kind][code, SPECIES_STATIONS.index(station), :self.n_runs]
+
+    def runs_where(self, species, station='exit', kind='mole', above=None, below=None):
+        """
+        Runs whose fraction lies in the given bounds (exclusive).
+
+        Example:
+        store.runs_where('OH', 'exit', above=1e-4)  # exit OH mole fraction > 1e-4
+
+        Returns:
+        ndarray: Run indices.
+        """
+        values = self.fraction(species, station, kind)
+        mask = np.ones(values.shape, dtype=bool)
+        if above is not None:
+            mask &= values > above
+        if below is not None:
+            mask &= values < below
+        return np.flatnonzero(mask)
+
+    def mean_molecular_weight(self, station=None):
+        """
+        Mean molecular weight [g/mol] of the products, sum of x_i * M_i.
+
+        Args:
+        station (str, optional): One station; all stations if None.
+
+        Returns:
+        ndarray: float32 view, shape (run,) or (station, run).
+        """
+        if station is None:
+            return self._molecular_weight[:, :self.n_runs]
+        return self._molecular_weight[SPECIES_STATIONS.index(station), :self.n_runs]
+
+    def run_table(self, run):
+        """Species x (kind, station) fractions of one run as a dataframe."""
+        import pandas as pd
+        data = {f'{station} {kind}': self._fractions[kind][:, i, run]
+                for kind in KINDS for i, station in enumerate(SPECIES_STATIONS)}
+        return pd.DataFrame(data, index=pd.Index(self.species, name='species'))
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+
+    store = SpeciesStore.from_csv(['rpa/hydra2_final.csv'])
+    print(f"{len(store)} run(s), {len(store.species)} species")
+    print("mean molecular weight [g/mol]:",
+          dict(zip(SPECIES_STATIONS, store.mean_molecular_weight()[:, 0].round(3).tolist())))
+
+    # 100k runs: the hydra2 composition with perturbed minor species
+    n = 100_000
+    rng = np.random.default_rng(0)
+    base_mass, base_mole = store.fractions('mass')[:, :, 0], store.fractions('mole')[:, :, 0]
+    scale = rng.lognormal(0.0, 0.5, (n, len(store.species), 1))
+    big = SpeciesStore(capacity=16)
+    t0 = time.perf_counter()
+    for block in range(0, n, 10_000):  # appended in blocks, as runs arrive
+        s = scale[block:block + 10_000]
+        mole = base_mole * s
+        mass = base_mass * s
+        big.add_runs(store.species, mass / mass.sum(1, keepdims=True), mole / mole.sum(1, keepdims=True))
+    print(f"built {len(big)} runs in {time.perf_counter() - t0:.2f} s, "
+          f"{sum(a.nbytes for a in big._fractions.values()) / 1e6:.1f} MB of fractions")
+
+    threshold = float(np.median(big.fraction('OH', 'exit')))
+    for label, query in (("runs where exit OH mole fraction > median", lambda: big.runs_where('OH', 'exit', above=threshold)),
+                         ("mean molecular weight at the exit", lambda: big.mean_molecular_weight('exit')),
+                         ("mean molecular weight per station, mean over runs", lambda: big.mean_molecular_weight().mean(axis=1))):
+        query()
+        loops = 200
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            query()
+        print(f"{label}: {(time.perf_counter() - t0) / loops * 1e3:.3f} ms")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'species.npz')
+        big.save(path)
+        t0 = time.perf_counter()
+        loaded = SpeciesStore.load(path)
+        print(f"saved {os.path.getsize(path) / 1e6:.1f} MB, loaded in {time.perf_counter() - t0:.2f} s, "
+              f"identical: {np.array_equal(loaded.fractions(), big.fractions())}")
@@ -0,0 +1,204 @@
+# sweep.py
+# resumable design-space sweep over the sidebar inputs of main.py
+#
+#   python sweep.py --out runs/sweep1 --P 100:250:151 --epsilon 4:20:161 --d-dkdr 2:4:21 \
+#       --Lstar 0.8:1.5:15 --F 22 --workers 8
+#   python sweep.py --out runs/sweep1 ...      (same command again resumes)
+#   python sweep.py --bench-workers 8           (core scaling 1..8 workers)
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from engine_model import EngineModel, EngineResult
+
+AXES = ('P', 'epsilon_i', 'd_dkdr', 'Lstar', 'F')
+DEFAULT_FIELDS = ('Akr', 'm_dot', 'dk', 'lk', 'di', 'M_i', 'p_i', 'T', 'Vi', 'Fopt', 'Cf', 'Isp_sec', 'Isp_opt_sec')
+
+
+def parse_axis(text):
+    """'a:b:n' -> linspace(a, b, n), 'a,b,c' -> list, 'a' -> single value."""
+    if ':' in text:
+        start, stop, num = text.split(':')
+        return np.linspace(float(start), float(stop), int(num))
+    return np.array([float(v) for v in text.split(',')])
+
+
+def evaluate_shard(spec, shard, out_dir):
+    """Evaluate one contiguous slice of the flattened grid and write it to disk."""
+    start = shard * spec['shard_size']
+    stop = min(start + spec['shard_size'], spec['total'])
+    axes = [np.asarray(spec['axes'][name]) for name in AXES]
+    index = np.unravel_index(np.arange(start, stop), [len(a) for a in axes])
+    grid = {name: axis[i] for name, axis, i in zip(AXES, axes, index)}
+    fixed = spec['fixed']
+
+    result = EngineModel(
+        P=grid['P'] * 1e5, Pa=fixed['Pa_atm'] * 101325, F=grid['F'] * 1000,
+        epsilon_i=grid['epsilon_i'], d_dkdr=grid['d_dkdr'], Lstar=grid['Lstar'],
+        Cstar=fixed['Cstar'], R=fixed['R'], kappa=fixed['kappa'], OF=fixed['OF'],
+        dkr=fixed['dkr_mm'] / 1000,
+    ).evaluate()
+
+    arrays = {name: getattr(result, name).astype(np.float32) for name in spec['fields']}
+    path = _shard_path(out_dir, shard)
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, start=start, stop=stop, **arrays)
+    os.replace(tmp_path, path)  # a shard file exists only once it is complete
+    return shard, stop - start
+
+
+def _shard_path(out_dir, shard):
+    return os.path.join(out_dir, 'shards', f'shard_{shard:06d}.npz')
+
+
+def run_sweep(spec, out_dir, workers=None, progress=True):
+    """
+    Run (or resume) a sweep; shards already on disk are skipped, leftover temporary
+    files of unfinished shards removed.
+
+    Args:
+    spec (dict): Grid definition, see `make_spec`.
+    out_dir (str): Result directory (manifest.json, shards/, progress.log).
+    workers (int, optional): Process count.
+    progress (bool): Print live progress to stderr.
+
+    Returns:
+    float: Points per second for the shards evaluated in this call.
+    """
+    os.makedirs(os.path.join(out_dir, 'shards'), exist_ok=True)
+    manifest_path = os.path.join(out_dir, 'manifest.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as file:
+            if json.load(file) != spec:
+                raise ValueError(f"{out_dir} holds a different sweep, use another --out")
+    else:
+        with open(manifest_path, 'w', encoding='utf-8') as file:
+            json.dump(spec, file)
+
+    # temporary files of shards a crashed run did not finish; those shards are pending again
+    for name in os.listdir(os.path.join(out_dir, 'shards')):
+        if '.tmp' in name:
+            os.remove(os.path.join(out_dir, 'shards', name))
+
+    n_shards = -(-spec['total'] // spec['shard_size'])
+    pending = [s for s in range(n_shards) if not os.path.exists(_shard_path(out_dir, s))]
+    done_points = spec['total'] - sum(
+        min(spec['shard_size'], spec['total'] - s * spec['shard_size']) for s in pending)
+    if progress and done_points:
+        print(f"resuming: {done_points:,} of {spec['total']:,} points already done", file=sys.stderr)
+
+    t0, new_points = time.perf_counter(), 0
+    with ProcessPoolExecutor(max_workers=workers) as executor, \
+            open(os.path.join(out_dir, 'progress.log'), 'a', encoding='utf-8') as log:
+        futures = [executor.submit(evaluate_shard, spec, shard, out_dir) for shard in pending]
+        for future in as_completed(futures):
+            shard, points = future.result()
+            new_points += points
+            log.write(f"{shard}\n")
+            log.flush()
+            if progress:
+                elapsed = time.perf_counter() - t0
+                rate = new_points / elapsed if elapsed else 0.0
+                done = done_points + new_points
+                eta = (spec['total'] - done) / rate if rate else float('inf')
+                print(f"\r{done:,}/{spec['total']:,} points  {rate:,.0f} points/s  ETA {eta:,.0f} s   ",
+                      end='', file=sys.stderr, flush=True)
+    if progress:
+        print(file=sys.stderr)
+    elapsed = time.perf_counter() - t0
+    return new_points / elapsed if elapsed and new_points else 0.0
+
+
+def make_spec(axes, fixed, fields=DEFAULT_FIELDS, shard_size=250_000):
+    """Sweep definition: axis values, fixed inputs, stored result fields and shard size."""
+    axes = {name: [float(v) for v in np.atleast_1d(axes[name])] for name in AXES}
+    unknown = set(fields) - set(EngineResult.__dataclass_fields__)
+    if unknown:
+        raise ValueError(f"unknown result fields: {sorted(unknown)}")
+    return {
+        'axes': axes,
+        'fixed': fixed,
+        'fields': list(fields),
+        'shard_size': int(shard_size),
+        'total': int(np.prod([len(v) for v in axes.values()])),
+    }
+
+
+def load_results(out_dir, fields=None):
+    """Completed shards concatenated in grid order, plus the grid index of each point."""
+    with open(os.path.join(out_dir, 'manifest.json'), encoding='utf-8') as file:
+        spec = json.load(file)
+    fields = fields or spec['fields']
+    parts = {name: [] for name in fields}
+    index = []
+    for name in sorted(os.listdir(os.path.join(out_dir, 'shards'))):
+        if not name.endswith('.npz') or '.tmp' in name:
+            continue
+        with np.load(os.path.join(out_dir, 'shards', name)) as shard:
+            index.append(np.arange(int(shard['start']), int(shard['stop'])))
+            for field in fields:
+                parts[field].append(shard[field])
+    results = {name: np.concatenate(arrays) if arrays else np.empty(0) for name, arrays in parts.items()}
+    results['index'] = np.concatenate(index) if index else np.empty(0, dtype=int)
+    return results
+
+
+def benchmark_workers(max_workers, axes, fixed, shard_size=100_000):
+    """Points/second for 1, 2, 4, ... max_workers processes on the same sweep."""
+    spec = make_spec(axes, fixed, shard_size=shard_size)
+    counts = sorted({min(2**k, max_workers) for k in range(max_workers.bit_length() + 1)})
+    rates = {}
+    for workers in counts:
+        with tempfile.TemporaryDirectory() as out_dir:
+            rates[workers] = run_sweep(spec, out_dir, workers=workers, progress=False)
+        print(f"{workers:3d} workers: {rates[workers]:>12,.0f} points/s "
+              f"(x{rates[workers] / rates[counts[0]]:.2f})")
+    return rates
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Design-space sweep of the analytical engine model.")
+    parser.add_argument('--out', help="result directory; rerun the same command to resume")
+    parser.add_argument('--P', default='180', help="chamber pressure [bar], 'a:b:n' or 'a,b,c'")
+    parser.add_argument('--epsilon', default='7', help="nozzle expansion ratio epsilon_i")
+    parser.add_argument('--d-dkdr', default='3', help="chamber / throat diameter ratio")
+    parser.add_argument('--Lstar', default='1', help="characteristic length [m]")
+    parser.add_argument('--F', default='22', help="thrust [kN]")
+    parser.add_argument('--Pa', type=float, default=1.0, help="ambient pressure [atm]")
+    parser.add_argument('--Cstar', type=float, default=1892.5, help="characteristic velocity [m/s]")
+    parser.add_argument('--R', type=float, default=433.5, help="gas constant [J/kg K]")
+    parser.add_argument('--kappa', type=float, default=1.1716)
+    parser.add_argument('--OF', type=float, default=0.848)
+    parser.add_argument('--dkr', type=float, default=31.04, help="throat diameter [mm]")
+    parser.add_argument('--fields', default=','.join(DEFAULT_FIELDS), help="stored EngineResult fields")
+    parser.add_argument('--shard-size', type=int, default=250_000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--bench-workers', type=int, metavar='N', help="benchmark scaling from 1 to N workers")
+    args = parser.parse_args(argv)
+
+    axes = {'P': parse_axis(args.P), 'epsilon_i': parse_axis(args.epsilon),
+            'd_dkdr': parse_axis(args.d_dkdr), 'Lstar': parse_axis(args.Lstar), 'F': parse_axis(args.F)}
+    fixed = {'Pa_atm': args.Pa, 'Cstar': args.Cstar, 'R': args.R, 'kappa': args.kappa,
+             'OF': args.OF, 'dkr_mm': args.dkr}
+
+    if args.bench_workers:
+        if np.prod([len(a) for a in axes.values()]) == 1:  # default benchmark grid, 4M points
+            axes.update(P=np.linspace(100, 250, 100), epsilon_i=np.linspace(4, 20, 100),
+                        d_dkdr=np.linspace(2, 4, 20), Lstar=np.linspace(0.8, 1.5, 20))
+        benchmark_workers(args.bench_workers, axes, fixed)
+        return
+    if not args.out:
+        parser.error("--out is required")
+    spec = make_spec(axes, fixed, args.fields.split(','), args.shard_size)
+    rate = run_sweep(spec, args.out, workers=args.workers)
+    print(f"{spec['total']:,} points in {args.out} ({rate:,.0f} points/s this run)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+# tests/test_chamber_sizing.py
+#   python -m pytest tests
+import numpy as np
+
+from chamber_sizing import size_chamber
+
+
+def test_matches_rpa_chamber():
+    chamber = size_chamber(0.03104, 1.0, contraction=6.7, P=180e5)
+    assert chamber.feasible
+    np.testing.assert_allclose([chamber.Lc, chamber.Lcyl], [0.17726, 0.10681], atol=2e-4)
+
+
+def test_contraction_too_small_for_the_arcs_is_infeasible():
+    chamber = size_chamber(0.03104, 1.0, contraction=[1.0, 1.3, 1.5, 6.7])
+    np.testing.assert_array_equal(chamber.feasible, [False, False, True, True])
+    assert np.all(chamber.r2[chamber.feasible] > 0)
+    assert not size_chamber(0.03104, 1.0, contraction=1.0).feasible
@@ -0,0 +1,37 @@
+# tests/test_inverse_design.py
+#   python -m pytest tests
+import numpy as np
+
+from inverse_design import size_engine
+
+GAS = dict(Pa=101325.0, kappa=1.1716, R=433.5, Cstar=1892.5)
+
+
+def test_expansion_input_broadcasts_with_scalar_thrust():
+    design = size_engine(22e3, 180e5, epsilon_i=[5.0, 7.0], **GAS)
+    assert design.dkr.shape == (2,)
+    np.testing.assert_allclose(design.epsilon_i, [5.0, 7.0])
+    np.testing.assert_allclose(design.dkr[1], size_engine(22e3, 180e5, epsilon_i=7.0, **GAS).dkr)
+
+    reference = size_engine(22e3, 180e5, epsilon_i=7.0, **GAS)
+    fixed_exit = size_engine(22e3, 180e5, de=[reference.di, reference.di], **GAS)
+    np.testing.assert_allclose(fixed_exit.epsilon_i, 7.0, rtol=1e-9)
+
+
+def test_exit_smaller_than_throat_is_infeasible():
+    design = size_engine(22e3, 180e5, de=0.02, **GAS)
+    assert not design.converged
+    assert np.isnan(design.di)
+
+    mixed = size_engine(22e3, 180e5, de=[0.02, 0.0808], **GAS)
+    np.testing.assert_array_equal(mixed.converged, [False, True])
+    np.testing.assert_allclose(mixed.di[1], 0.0808, rtol=1e-9)
+
+
+def test_max_iter_keeps_the_last_iterate():
+    design = size_engine(22e3, 180e5, de=[0.0808, 0.0808], max_iter=1, **GAS)
+    np.testing.assert_array_equal(design.converged, [False, False])
+    assert np.all(np.isfinite(design.di))
+    converged = size_engine(22e3, 180e5, de=0.0808, **GAS)
+    np.testing.assert_allclose(design.epsilon_i, converged.epsilon_i, rtol=0.05)
+    assert not np.allclose(design.epsilon_i, converged.epsilon_i, rtol=1e-9, atol=0)
@@ -0,0 +1,35 @@
+# tests/test_mach_solver.py
+#   python -m pytest tests
+import numpy as np
+from scipy.optimize import brentq
+
+from mach_solver import area_ratio, refine_exit_mach, solve_exit_mach
+
+
+def test_matches_a_bracketed_reference_solve():
+    kappa, epsilon = np.meshgrid([1.1, 1.1716, 1.25, 1.4], [1.01, 1.5, 7.0, 40.0, 200.0])
+    M_sup, M_sub = solve_exit_mach(kappa, epsilon, subsonic=True)
+    for k, e, sup, sub in zip(kappa.ravel(), epsilon.ravel(), M_sup.ravel(), M_sub.ravel()):
+        f = lambda M: area_ratio(M, k) - e
+        assert np.isclose(sup, brentq(f, 1.0, 100.0, xtol=1e-14), rtol=1e-10)
+        assert np.isclose(sub, brentq(f, 1e-8, 1.0, xtol=1e-16), rtol=1e-10)
+
+
+def test_area_ratio_below_one_is_nan_and_one_is_sonic():
+    M_sup, M_sub = solve_exit_mach(1.2, [0.5, 1.0, 7.0], subsonic=True)
+    assert np.isnan(M_sup[0]) and np.isnan(M_sub[0])
+    assert M_sup[1] == 1.0 and M_sub[1] == 1.0
+    assert np.isnan(refine_exit_mach(1.2, 0.5, 2.0))
+    assert refine_exit_mach(1.2, 1.0, 2.0) == 1.0
+
+
+def test_sonic_point_does_not_hold_back_the_others():
+    epsilon = np.linspace(1.0, 50.0, 1000)
+    M = solve_exit_mach(1.2, epsilon, max_iter=20)
+    np.testing.assert_allclose(area_ratio(M, 1.2), epsilon, rtol=1e-12)
+
+
+def test_warm_start_refines_a_nearby_solution():
+    M_previous = solve_exit_mach(1.2, 7.0)
+    np.testing.assert_allclose(refine_exit_mach(1.2, 7.5, M_previous, max_iter=5), solve_exit_mach(1.2, 7.5),
+                               rtol=1e-12)
@@ -0,0 +1,56 @@
+# tests/test_result_cache.py
+#   python -m pytest tests
+import os
+
+import numpy as np
+import pytest
+
+from compute_graph import engine_graph
+from result_cache import ResultCache, result_key, shared_evaluate
+
+INPUTS = dict(P=180e5, Pa=101325.0, dkr=0.03104, kappa=1.1716)
+
+
+def test_result_key_is_order_and_number_type_independent():
+    assert result_key({'P': 180, 'kappa': 1.2}) == result_key({'kappa': 1.2, 'P': 180.0})
+    assert result_key({'P': 180}) != result_key({'P': 181})
+    assert result_key({'a': np.arange(3)}) != result_key({'a': np.arange(4)})
+
+
+def test_targets_with_the_same_inputs_are_shared_across_sessions():
+    cache = ResultCache()
+    first = engine_graph()
+    for targets in (['derivation_8'], ['derivation_8d']):
+        shared_evaluate(first, INPUTS, targets, cache)
+
+    second = engine_graph()
+    second.begin_run()
+    values = {}
+    for targets in (['derivation_8'], ['derivation_8d']):
+        values = shared_evaluate(second, INPUTS, targets, cache)
+    assert second.recomputed == []
+    assert values['derivation_8d'].title == first.values['derivation_8d'].title
+
+
+def test_expired_and_evicted_entries(monkeypatch):
+    cache = ResultCache(max_entries=2, ttl=10.0)
+    now = [1000.0]
+    monkeypatch.setattr('result_cache.time.time', lambda: now[0])
+    for key in 'abc':
+        cache.put(key, {'value': key})
+    assert cache.get('a') is None and cache.get('c') == {'value': 'c'}
+    now[0] += 11
+    assert cache.get('c') is None
+    assert cache.stats()['evictions'] == 1 and cache.stats()['expirations'] == 1
+
+
+def test_disk_store_is_shared_and_must_be_private(tmp_path):
+    directory = str(tmp_path / 'store')
+    ResultCache(directory=directory).put('k', {'value': 1})
+    assert ResultCache(directory=directory).get('k') == {'value': 1}
+
+    shared = tmp_path / 'shared'
+    shared.mkdir()
+    os.chmod(shared, 0o777)
+    with pytest.raises(PermissionError):
+        ResultCache(directory=str(shared))
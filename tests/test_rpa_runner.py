@@ -0,0 +1,83 @@
+# tests/test_rpa_runner.py
+#   python -m pytest tests
+import asyncio
+import os
+import shlex
+import sys
+import time
+
+import pytest
+
+from rpa_cfg import load
+from rpa_runner import RpaRunner, config_key
+from rpa_standin import DEFAULT_GAS, design_report
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PYTHON = shlex.quote(sys.executable)
+
+
+def _command(code):
+    # trivial stand-in for RPA: python -c <code> <cfg path>
+    return f'{PYTHON} -c {shlex.quote(code)} {{cfg}}'
+
+
+# prints the "config" back, so a report passed as config text comes back as the report
+ECHO = _command('import sys, time; time.sleep(float(sys.argv[2]) if len(sys.argv) > 2 else 0); '
+                'sys.stdout.write(open(sys.argv[1]).read())')
+FAIL = _command('import sys; sys.exit(3)')
+SLOW = _command('import time; time.sleep(5)')
+
+
+@pytest.fixture(scope='module')
+def report():
+    return design_report(load(os.path.join(HERE, 'rpa', 'hail_hydra2.cfg')), **DEFAULT_GAS)
+
+
+def test_same_config_is_run_once(report):
+    runner = RpaRunner(command=ECHO)
+    first = asyncio.run(runner.run(report))
+    second = asyncio.run(runner.run(report))
+    assert first.status == second.status == 'done'
+    assert not first.cached and second.cached
+    assert second.result.thrust_vac == first.result.thrust_vac
+    assert runner.runs == 1 and runner.hits == 1 and runner.misses == 1
+
+
+def test_config_already_running_is_awaited(report):
+    runner = RpaRunner(command=ECHO.replace('{cfg}', '{cfg} 0.3'))
+    jobs = asyncio.run(runner.run_many([report, report, report]))
+    assert [job.status for job in jobs] == ['done'] * 3
+    assert runner.runs == 1 and sum(job.cached for job in jobs) == 2
+
+
+def test_result_dir_is_keyed_by_command(report, tmp_path):
+    asyncio.run(RpaRunner(command=ECHO, result_dir=str(tmp_path)).run(report))
+    restarted = RpaRunner(command=ECHO, result_dir=str(tmp_path))
+    assert asyncio.run(restarted.run(report)).cached and restarted.runs == 0
+    other = RpaRunner(command=ECHO + ' ', result_dir=str(tmp_path))
+    assert not asyncio.run(other.run(report)).cached and other.runs == 1
+    assert config_key(report, ECHO) != config_key(report, ECHO + ' ')
+
+
+def test_failing_command_is_retried_with_backoff():
+    runner = RpaRunner(command=FAIL, retries=2, backoff=0.1)
+    t0 = time.perf_counter()
+    job = asyncio.run(runner.run('name = "x";'))
+    assert job.status == 'failed' and 'exit status 3' in job.error
+    assert job.attempts == 3 and runner.retried == 2 and runner.failures == 1
+    assert time.perf_counter() - t0 >= 0.1 + 0.2  # backoff * 2**(n - 1) before retry n
+
+
+def test_timeout_kills_the_process():
+    runner = RpaRunner(command=SLOW, timeout=0.3, retries=0)
+    t0 = time.perf_counter()
+    job = asyncio.run(runner.run('name = "x";'))
+    assert job.status == 'failed' and 'timed out' in job.error
+    assert time.perf_counter() - t0 < 3
+
+
+def test_report_missing_fields_fails_and_is_not_cached(tmp_path):
+    runner = RpaRunner(command=ECHO, result_dir=str(tmp_path))
+    job = asyncio.run(runner.run('Thrust and mass flow rates\n'))
+    assert job.status == 'failed' and job.error.startswith('report is missing')
+    assert os.listdir(tmp_path) == [] and runner.stats()['cached_reports'] == 0
@@ -0,0 +1,32 @@
+# tests/test_sweep.py
+#   python -m pytest tests
+import os
+
+import numpy as np
+
+from sweep import load_results, make_spec, run_sweep
+
+AXES = dict(P=np.linspace(100, 250, 7), epsilon_i=[5.0, 7.0, 9.0], d_dkdr=[3.0], Lstar=[1.0, 1.2], F=[22.0])
+FIXED = dict(Pa_atm=1.0, Cstar=1892.5, R=433.5, kappa=1.1716, OF=0.848, dkr_mm=31.04)
+
+
+def test_resume_reruns_missing_shards_and_drops_temporary_files(tmp_path):
+    out_dir = str(tmp_path / 'sweep')
+    spec = make_spec(AXES, FIXED, fields=('dk', 'lk', 'Isp_sec'), shard_size=10)
+    run_sweep(spec, out_dir, workers=1, progress=False)
+    complete = load_results(out_dir)
+    np.testing.assert_array_equal(complete['index'], np.arange(spec['total']))
+
+    # a crash: one shard lost, another left half-written
+    shards = os.path.join(out_dir, 'shards')
+    os.remove(os.path.join(shards, 'shard_000001.npz'))
+    with open(os.path.join(shards, 'shard_000002.npz.tmp.npz'), 'wb') as file:
+        file.write(b'partial')
+    assert len(load_results(out_dir)['index']) == spec['total'] - 10
+
+    run_sweep(spec, out_dir, workers=1, progress=False)
+    resumed = load_results(out_dir)
+    assert not any('.tmp' in name for name in os.listdir(shards))
+    np.testing.assert_array_equal(resumed['index'], np.arange(spec['total']))
+    for field in spec['fields']:
+        np.testing.assert_array_equal(resumed[field], complete[field])
@@ -0,0 +1,146 @@
+# thermo_table.py
+# gas properties (Cstar, R, kappa, Tc, M) over (propellant pair, chamber pressure, O/F),
+# built once from RPA CSV exports and memory-mapped for interpolation in sweeps
+import json
+import os
+
+import numpy as np
+
+from rpa_csv import read_csv
+
+PROPERTIES = ('Cstar', 'R', 'kappa', 'Tc', 'M')
+
+# (table, parameter, station or None for the given gas station, unit factor to SI)
+_SOURCES = {
+    'Cstar': (3, 'Characteristic velocity', 'optimum', 1.0),
+    'R': (1, 'Gas constant', None, 1000.0),  # kJ/(kg K) -> J/(kg K)
+    'kappa': (1, 'Gamma', None, 1.0),
+    'Tc': (1, 'Temperature', None, 1.0),
+    'M': (1, 'Molecular weight (M)', None, 1.0),
+}
+
+
+def collect_runs(csv_paths, station='injector'):
+    """
+    Gas properties of every run in the given RPA CSV exports.
+
+    Args:
+    csv_paths (iterable of str): RPA CSV export files.
+    station (str): Station the gas properties are taken at; main.py uses the
+        chamber values (R = 433.5, kappa = 1.1716), i.e. 'injector'.
+
+    Returns:
+    list: One dict per run with propellant, P [Pa], OF and `PROPERTIES`.
+    """
+    runs = []
+    for path in csv_paths:
+        current, key = None, None
+        for record in read_csv(path):
+            if (record.run, record.engine) != key:
+                key = (record.run, record.engine)
+                current = {'propellant': record.propellant, 'OF': record.of}
+                runs.append(current)
+            if record.table == 1 and record.parameter == 'Pressure' and record.station == 'injector':
+                current['P'] = record.value * 1e6  # MPa -> Pa
+            for name, (table, parameter, source_station, factor) in _SOURCES.items():
+                if (record.table == table and record.parameter == parameter
+                        and record.station == (source_station or station)):
+                    current[name] = record.value * factor
+    return [run for run in runs if all(k in run for k in ('P',) + PROPERTIES)]
+
+
+def build_table(csv_paths, table_dir, station='injector'):
+    """
+    Build the lookup table: one (n_P, n_OF, len(PROPERTIES)) .npy array per propellant pair.
+
+    Runs are placed on the rectilinear grid of their distinct chamber pressures and
+    O/F values; grid points without a run are NaN.
+
+    Args:
+    csv_paths (iterable of str): RPA CSV export files.
+    table_dir (str): Output directory.
+    station (str): See `collect_runs`.
+
+    Returns:
+    dict: The index written to `table_dir/index.json`.
+    """
+    runs = collect_runs(csv_paths, station)
+    os.makedirs(table_dir, exist_ok=True)
+    index = {'properties': list(PROPERTIES), 'station': station, 'pairs': {}}
+    for i, pair in enumerate(sorted({run['propellant'] for run in runs})):
+        pair_runs = [run for run in runs if run['propellant'] == pair]
+        P_axis = sorted({run['P'] for run in pair_runs})
+        OF_axis = sorted({run['OF'] for run in pair_runs})
+        values = np.full((len(P_axis), len(OF_axis), len(PROPERTIES)), np.nan)
+        for run in pair_runs:
+            values[P_axis.index(run['P']), OF_axis.index(run['OF'])] = [run[p] for p in PROPERTIES]
+        file_name = f'pair_{i}.npy'
+        np.save(os.path.join(table_dir, file_name), values)
+        index['pairs'][pair] = {'file': file_name, 'P': P_axis, 'OF': OF_axis}
+    with open(os.path.join(table_dir, 'index.json'), 'w', encoding='utf-8') as file:
+        json.dump(index, file, indent=2)
+    return index
+
+
+def _cell(axis, x):
+    # lower grid index and weight per point, clamped to the axis (no extrapolation)
+    if len(axis) == 1:
+        return np.zeros(np.shape(x), dtype=int), np.zeros(np.shape(x))
+    i = np.clip(np.searchsorted(axis, x, side='right') - 1, 0, len(axis) - 2)
+    t = np.clip((x - axis[i]) / (axis[i + 1] - axis[i]), 0.0, 1.0)
+    return i, t
+
+
+class ThermoTable:
+    """
+    Memory-mapped gas property table written by `build_table`.
+
+    Example:
+    table = ThermoTable('thermo')
+    gas = table.lookup('N2H4(L)/O2(L)', P=np.linspace(100e5, 200e5, 1000), OF=0.85)
+    gas['Cstar'], gas['R'], gas['kappa']
+    """
+
+    def __init__(self, table_dir):
+        with open(os.path.join(table_dir, 'index.json'), encoding='utf-8') as file:
+            self.index = json.load(file)
+        self.properties = self.index['properties']
+        self._grids = {}
+        for pair, entry in self.index['pairs'].items():
+            values = np.load(os.path.join(table_dir, entry['file']), mmap_mode='r')
+            self._grids[pair] = (np.array(entry['P']), np.array(entry['OF']), values)
+
+    @property
+    def pairs(self):
+        return list(self._grids)
+
+    def lookup(self, pair, P, OF, method='linear'):
+        """
+        Interpolate gas properties at chamber pressure(s) P [Pa] and mixture ratio(s) OF.
+
+        Args:
+        pair (str): Propellant pair, e.g. 'N2H4(L)/O2(L)'.
+        P, OF (float or ndarray): Broadcast against each other.
+        method (str): 'linear' (bilinear) or 'cubic' (scipy, needs 4+ points per axis).
+
+        Returns:
+        dict: Property name -> array with the broadcast shape of P and OF.
+        """
+        P_axis, OF_axis, values = self._grids[pair]
+        P, OF = np.broadcast_arrays(np.asarray(P, dtype=float), np.asarray(OF, dtype=float))
+        if method == 'cubic':
+            from scipy.interpolate import RegularGridInterpolator
+            interpolator = RegularGridInterpolator((P_axis, OF_axis), np.asarray(values),
+                                                   method='cubic', bounds_error=False, fill_value=None)
+            points = np.stack([np.clip(P, P_axis[0], P_axis[-1]),
+                               np.clip(OF, OF_axis[0], OF_axis[-1])], axis=-1)
+            result = interpolator(points)
+        else:
+            i, s = _cell(P_axis, P)
+            j, t = _cell(OF_axis, OF)
+            i1 = np.minimum(i + 1, len(P_axis) - 1)
+            j1 = np.minimum(j + 1, len(OF_axis) - 1)
+            s, t = s[..., None], t[..., None]
+            result = ((1 - s) * (1 - t) * values[i, j] + (1 - s) * t * values[i, j1]
+                      + s * (1 - t) * values[i1, j] + s * t * values[i1, j1])
+        return {name: result[..., k] for k, name in enumerate(self.properties)}
@@ -1,5 +1,6 @@
 # utils.py
 import streamlit as st
+from rpa_cache import read_report
 
 def spacer(height='2em'):
     """Inserts vertical space in the layout."""
@@ -50,3 +51,55 @@ def display_generic_table(data):
     # Combine all the rows into a single table string
     table = header_row + separator_row + data_rows
     return table
+
+
+def display_rpa_tables(html_file_path):
+    """Renders the tables of an RPA HTML file as dataframes, and the text between them (parsed once per process)."""
+    for block in read_report(html_file_path):
+        if isinstance(block, str):
+            st.markdown(block)
+            continue
+        title, frame = block
+        if title:
+            st.markdown(f"**{title}**")
+        st.dataframe(frame, hide_index=True)
+
+
+def display_derivation(section, expanded=None):
+    """
+    Renders a `derivation.Section`, with a toggle unless `expanded` is given. Collapsed
+    sections show only the result lines, so the formulas are neither sent to the
+    browser nor typeset.
+    """
+    st.code(section.title)
+    if expanded is None:
+        expanded = st.toggle('Prikaži izvođenje', key=f'derivation_{section.key}')
+    for step in section.steps:
+        if expanded:
+            if step.formula:
+                st.markdown(step.formula)
+            if step.substituted:
+                st.markdown(step.substituted, help=step.help)
+            if step.result:
+                st.markdown(step.result)
+        else:
+            st.markdown(step.result or step.substituted, help=step.help)
+
+
+def display_profiling():
+    """Sidebar toggles for section timing (profiling.py) and the stats of this session."""
+    with st.sidebar.expander("⏱️ Profilisanje"):
+        st.toggle('Meri vreme po sekcijama', key='profiling')
+        st.toggle('cProfile', key='profiling_cprofile', disabled=not st.session_state.get('profiling'))
+        profiler = st.session_state.get('profiler')
+        if profiler is None or profiler.last is None:
+            st.caption('uključiti pa pokrenuti ponovo (rerun)')
+            return
+        import pandas as pd
+        st.caption(f'poslednji rerun: {profiler.last.total * 1e3:.1f} ms, ukupno {profiler.runs} rerun-a')
+        st.dataframe(pd.DataFrame(profiler.stats()).round(2), hide_index=True)
+        histogram = profiler.histogram()
+        st.dataframe(pd.DataFrame({'trajanje od': list(histogram), 'rerun-ovi': list(histogram.values())}),
+                     hide_index=True)
+        if profiler.last.profile_text:
+            st.code(profiler.last.profile_text)
@@ -0,0 +1,218 @@
+# warmup.py
+# cold start of the app: heavy dependencies stay out of `import main` (import-time budget),
+# and a warm-up at server start loads them, the RPA artifacts and the default page values
+# into the process-wide caches before the first session arrives (serve.py)
+#
+#   python warmup.py              startup benchmark: first run after a restart, cold vs warm
+#   python warmup.py --budget     check the import-time budget of main.py (exit 1 when over)
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# loaded on first use (tables, dataframes, uncertainty and O/F fits), never by `import main`
+LAZY_MODULES = ('pandas', 'scipy', 'pyarrow')
+
+# seconds `import main` may add on top of streamlit (which the server has already imported)
+IMPORT_BUDGET = 0.3
+
+# files the page reads through rpa_cache, by loader
+ARTIFACTS = {
+    'bytes': ('assets/Logo_masinski_fakultet.jpg', 'assets/engine_definition.png',
+              'assets/propellant_specification.png', 'assets/geometry.png'),
+    'text': ('rpa/hail_hydra2.cfg',),
+    'tables': ('rpa/1_propellant_specification.html', 'rpa/2_thermodynamic_properties.html',
+               'rpa/3_fractions_combustion.html', 'rpa/4_performance.html'),
+}
+
+
+#===================== import budget =====================#
+
+def import_times(module='main', preload=('streamlit',)):
+    """
+    Import profile of `module` in a fresh interpreter (python -X importtime).
+
+    Args:
+    module (str): Module to import.
+    preload (tuple): Modules imported first and not counted (the server's own imports).
+
+    Returns:
+    tuple: (seconds for `module`, {module it imports directly: cumulative seconds}).
+    """
+    code = ''.join(f'import {name}; ' for name in preload) + f'import {module}'
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=HERE,
+                             capture_output=True, text=True, check=True)
+    total, children = 0.0, {}
+    for line in process.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        seconds = int(parts[1]) / 1e6
+        if depth == 1:
+            children[name.strip()] = seconds  # nested lines come before their parent
+        elif depth == 0:
+            if name.strip() == module:
+                total = seconds
+                break
+            children = {}
+    return total, children
+
+
+def check_import_budget(module='main', budget=IMPORT_BUDGET):
+    """
+    Problems with the import of `module`: over the time budget, or a lazy module loaded.
+
+    Returns:
+    list: Messages, empty when within budget.
+    """
+    total, times = import_times(module)
+    problems = []
+    if total > budget:
+        slowest = ', '.join(f'{name} {seconds * 1e3:.0f} ms' for name, seconds in
+                            sorted(times.items(), key=lambda item: -item[1])[:5])
+        problems.append(f"import {module}: {total * 1e3:.0f} ms > {budget * 1e3:.0f} ms ({slowest})")
+    loaded = subprocess.run(
+        [sys.executable, '-c', f'import sys, {module}; print(" ".join(sys.modules))'],
+        cwd=HERE, capture_output=True, text=True, check=True).stdout.split()
+    for name in LAZY_MODULES:
+        if name in loaded:
+            problems.append(f"import {module} loads {name}, which should be imported on first use")
+    return problems
+
+
+#===================== warm-up =====================#
+
+def preload_artifacts():
+    """Read the page's images, configs and RPA tables into `artifact_cache`."""
+    from rpa_cache import read_bytes, read_tables, read_text
+    loaders = {'bytes': read_bytes, 'text': read_text, 'tables': read_tables}
+    for kind, paths in ARTIFACTS.items():
+        for path in paths:
+            loaders[kind](os.path.join(HERE, path))
+
+
+def presolve_default():
+    """Evaluate the page for the default RPA output and sidebar into `result_cache`."""
+    from compute_graph import ENGINE_NODES, engine_graph
+    from derivation import SECTIONS
+    from main import RPA_RESPONSE_DEFAULT, SIDEBAR_DEFAULTS
+    from result_cache import shared_evaluate
+
+    # same inputs and targets as main(), so the first session's lookups are hits
+    graph = engine_graph()
+    rpa = shared_evaluate(graph, {'rpa_response': RPA_RESPONSE_DEFAULT}, targets=['rpa'])['rpa'].values()
+    defaults = SIDEBAR_DEFAULTS
+    inputs = dict(P=defaults['P_bar'] * 100000, Pa=defaults['Pa_atm'] * 101325, F_kN=defaults['F'],
+                  epsilon_i=defaults['epsilon_i'], d_dkdr=defaults['d_dkdr'], Lstar=defaults['Lstar'],
+                  Cstar=(rpa['thrust_vac'] * 1000) / ((rpa['ox_flow_rate'] + rpa['fuel_flow_rate']) * rpa['cf']),
+                  R=defaults['R'], kappa=defaults['kappa'], OF=rpa['ox_flow_rate'] / rpa['fuel_flow_rate'],
+                  dkr=rpa['dt'] / 1000)
+    values = shared_evaluate(graph, inputs, targets=['lk', 'mox', 'di', 'Mi_solution'])
+    shared_evaluate(graph, {'M_i': values['Mi_solution']}, targets=list(ENGINE_NODES))
+    for key in SECTIONS:
+        shared_evaluate(graph, {}, targets=[f'derivation_{key}'])
+
+
+def warm_up(imports=('pandas',), artifacts=True, presolve=True):
+    """
+    Load what the first page run would otherwise load.
+
+    Args:
+    imports (tuple): Lazy modules to import now.
+    artifacts (bool): Fill the artifact cache (`preload_artifacts`).
+    presolve (bool): Evaluate the default page (`presolve_default`).
+
+    Returns:
+    dict: Step -> seconds.
+    """
+    import importlib
+
+    steps = {'imports': lambda: [importlib.import_module(name) for name in imports],
+             'artifacts': preload_artifacts if artifacts else None,
+             'presolve': presolve_default if presolve else None}
+    timings = {}
+    for name, step in steps.items():
+        if step is not None:
+            t0 = time.perf_counter()
+            step()
+            timings[name] = time.perf_counter() - t0
+    return timings
+
+
+_started = None
+_started_lock = threading.Lock()
+
+
+def warm_up_in_background(**kwargs):
+    """Run `warm_up` once per process on a daemon thread; returns the thread."""
+    global _started
+    with _started_lock:
+        if _started is None:
+            _started = threading.Thread(target=warm_up, kwargs=kwargs, name='warm-up', daemon=True)
+            _started.start()
+        return _started
+
+
+#===================== startup benchmark =====================#
+
+_FIRST_RUN = """
+import sys, time
+import streamlit
+from streamlit.testing.v1 import AppTest
+warm = {warm}
+if warm:
+    import warmup
+    warmup.warm_up()
+t0 = time.perf_counter()
+at = AppTest.from_file('main.py', default_timeout=120).run()
+assert not at.exception, at.exception
+print(time.perf_counter() - t0)
+"""
+
+
+def first_run(warm, repeat=3):
+    """
+    Seconds of the first page run in fresh processes (the cost after every restart);
+    the server's streamlit import and, when `warm`, the warm-up happen before timing.
+
+    Returns:
+    list: Seconds per process.
+    """
+    code = _FIRST_RUN.format(warm=bool(warm))
+    return [float(subprocess.run([sys.executable, '-c', code], cwd=HERE, capture_output=True,
+                                 text=True, check=True).stdout.split()[-1]) for _ in range(repeat)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time budget and startup benchmark of main.py.")
+    parser.add_argument('--budget', action='store_true', help="only check the import-time budget")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    total, times = import_times()
+    print(f"import main (after streamlit): {total * 1e3:.0f} ms, budget {IMPORT_BUDGET * 1e3:.0f} ms")
+    for name, seconds in sorted(times.items(), key=lambda item: -item[1])[:5]:
+        print(f"  {name:20s} {seconds * 1e3:8.1f} ms")
+    problems = check_import_budget()
+    for problem in problems:
+        print(f"OVER BUDGET {problem}")
+    if args.budget:
+        return 1 if problems else 0
+
+    print(f"warm-up steps: {', '.join(f'{k} {v * 1e3:.0f} ms' for k, v in warm_up().items())}")
+    for label, warm in (('cold', False), ('warm', True)):
+        runs = first_run(warm, args.repeat)
+        print(f"first run after restart, {label}: median {statistics.median(runs):.3f} s "
+              f"({', '.join(f'{s:.3f}' for s in runs)})")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())